@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+🔥 ATTICUS DRIFT ARCHIVE - ADMINISTRATION CLI
+Maintenance commands for the Codex drift archive database
+
+Usage:
+    python archive_admin.py [--db PATH] rebuild-search-index
+    python archive_admin.py [--db PATH] maintenance [--retention-days N]
+    python archive_admin.py [--db PATH] vacuum
+    python archive_admin.py [--db PATH] backup [--dest DIR] [--keep N] [--pages N] [--pause SECONDS]
+    python archive_admin.py [--db PATH] migrate-blobs
+    python archive_admin.py [--db PATH] migrate-schema [--batch-size N]
+    python archive_admin.py [--db PATH] fingerprint [--batch-size N]
+    python archive_admin.py [--db PATH] rescore [--memory FILE] [--version V] [--batch-size N] [--workers N] [--pause SECONDS]
+    python archive_admin.py [--db PATH] stats
+    python archive_admin.py [--db PATH] export --format ndjson|csv|columnar --output FILE
+    python archive_admin.py [--db PATH] shards
+    python archive_admin.py [--db PATH] seal-shard YYYY-MM
+    python archive_admin.py [--db PATH] drop-shard YYYY-MM
+    python archive_admin.py [--db PATH] compact-journal [--journal-dir DIR] [--follow SECONDS]
+
+Shard commands need DRIFT_ARCHIVE_SHARDING=monthly (shard files live in
+DRIFT_SHARD_DIR, default: next to the catalog database).
+compact-journal replays DRIFT_ARCHIVE_INGEST=journal segments (DRIFT_JOURNAL_DIR,
+default: <archive dir>/journal) when no bridge process is compacting them.
+rescore recomputes stored scores after FlameSignature.CODEX_VERSION is bumped;
+EDS needs the bridge's memory store (--memory JSON file, default: atticus_memory.py).
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from codex_system import ArchiveJournal, DriftArchive, ShardedDriftArchive, open_drift_archive
+
+DEFAULT_DB_PATH = os.environ.get("DRIFT_ARCHIVE_PATH", "/data/atticus_drift_archive.sqlite")
+
+
+def cmd_rebuild_search_index(archive: DriftArchive, args: argparse.Namespace) -> int:
+    """Rebuild the FTS5 index, e.g. for databases archived before it existed"""
+    try:
+        indexed = archive.rebuild_search_index()
+    except RuntimeError as e:
+        print(f"🚨 {e}")
+        return 1
+    print(f"✅ Search index rebuilt: {indexed} archived interactions indexed")
+    return 0
+
+
+def cmd_maintenance(archive: DriftArchive, args: argparse.Namespace) -> int:
+    """Roll up raw rows, purge past the retention window, incremental vacuum"""
+    result = archive.run_maintenance(retention_days=args.retention_days)
+    print(f"✅ Rolled up {result['rolled_up']} rows (watermark id {result['rollup_watermark']})")
+    print(f"✅ Purged {result['purged']} raw rows older than {result['retention_days']} days")
+    if result["incremental_vacuum"]:
+        print(f"✅ Reclaimed {result['pages_reclaimed']} pages")
+    else:
+        print("⚠️ Incremental vacuum not enabled - run `archive_admin.py vacuum` once")
+    return 0
+
+
+def cmd_vacuum(archive: DriftArchive, args: argparse.Namespace) -> int:
+    """One-off full VACUUM (blocks writers while it runs)"""
+    archive.vacuum()
+    print("✅ Archive vacuumed; incremental auto-vacuum enabled")
+    return 0
+
+
+def cmd_backup(archive: DriftArchive, args: argparse.Namespace) -> int:
+    """Online, checksummed snapshot while the service keeps writing"""
+    try:
+        result = archive.backup(args.dest, keep=args.keep, pages=args.pages, step_pause=args.pause)
+    except (RuntimeError, sqlite3.Error) as e:
+        print(f"🚨 Backup failed: {e}")
+        return 1
+    print(f"✅ Snapshot {result['path']} ({result['bytes']} bytes in {result['seconds']}s)")
+    for snapshot in result.get("files", [result]):
+        print(f"   sha256 {snapshot['sha256']}  {os.path.basename(snapshot['path'])}")
+    for name in result["rotated"]:
+        print(f"✅ Rotated out {name}")
+    return 0
+
+
+def cmd_migrate_blobs(archive: DriftArchive, args: argparse.Namespace) -> int:
+    """Move inline text of older rows into the compressed blob store"""
+    migrated = archive.migrate_text_to_blobs(batch_size=args.batch_size)
+    print(f"✅ Moved {migrated} rows to blob storage - run `archive_admin.py vacuum` to reclaim space")
+    return 0
+
+
+def cmd_migrate_schema(archive: DriftArchive, args: argparse.Namespace) -> int:
+    """Rewrite the archive table into the integer-keyed schema v2 layout"""
+    result = archive.migrate_schema(batch_size=args.batch_size)
+    if not result["copied"]:
+        print(f"✅ Archive already at schema v{result['schema_version']}")
+        return 0
+    print(f"✅ Copied {result['copied']} rows into schema v{result['schema_version']} "
+          f"({result['dropped']} purged during the copy)")
+    print("⚠️ Run `archive_admin.py vacuum` to return the old table's pages to the filesystem")
+    return 0
+
+
+def cmd_fingerprint(archive: DriftArchive, args: argparse.Namespace) -> int:
+    """Fingerprint rows archived before near-duplicate detection existed"""
+    done = archive.backfill_fingerprints(args.batch_size)
+    print(f"✅ Fingerprinted {done} archived responses")
+    return 0
+
+
+def cmd_rescore(archive: DriftArchive, args: argparse.Namespace) -> int:
+    """Recompute flame/EDS scores of rows archived under an older CODEX_VERSION"""
+    if args.memory:
+        with open(args.memory, encoding="utf-8") as f:
+            memory_store = json.load(f)
+    else:
+        from atticus_memory import ATTICUS_MEMORY as memory_store
+    
+    last_report = [0.0]
+    
+    def report(state):
+        if time.monotonic() - last_report[0] >= 5:
+            last_report[0] = time.monotonic()
+            shard = f"[{state['shard']}] " if "shard" in state else ""
+            print(f"   {shard}{state['rescored']} rescored, {state['changed']} changed, "
+                  f"{state['remaining']} left ({state['rows_per_second']} rows/s, last id {state['last_id']})")
+    
+    try:
+        result = archive.rescore_archive(memory_store, version=args.version, batch_size=args.batch_size,
+                                         workers=args.workers, pause=args.pause, progress=report)
+    except KeyboardInterrupt:
+        print("⚠️ Interrupted - run rescore again to resume from the last finished batch")
+        return 1
+    print(f"✅ Rescored {result['rescored']} rows to codex_version {result['version']} "
+          f"({result['changed']} changed scores)")
+    return 0
+
+
+def cmd_stats(archive: DriftArchive, args: argparse.Namespace) -> int:
+    """Print blob store and database size figures"""
+    for key, value in archive.storage_stats().items():
+        print(f"{key}: {value}")
+    return 0
+
+
+def cmd_export(archive: DriftArchive, args: argparse.Namespace) -> int:
+    """Stream the archive to a file in constant memory"""
+    stream = archive.export_stream(
+        args.format, since=args.since, until=args.until,
+        drift_status=args.drift_status, flame_signature=args.flame_signature
+    )
+    written = 0
+    with open(args.output, "wb") as f:
+        for chunk in stream:
+            f.write(chunk)
+            written += len(chunk)
+    print(f"✅ Exported {written} bytes to {args.output}")
+    return 0
+
+
+def cmd_shards(archive: DriftArchive, args: argparse.Namespace) -> int:
+    """List monthly shards with their seal state"""
+    if not isinstance(archive, ShardedDriftArchive):
+        print("⚠️ Archive is not sharded - set DRIFT_ARCHIVE_SHARDING=monthly")
+        return 1
+    for shard in archive.list_shards():
+        state = f"sealed {shard['sealed_at']} sha256={shard['sha256']}" if shard["sealed"] else "open"
+        print(f"{shard['month']}  {shard['bytes']} bytes  {state}  {shard['path']}")
+    return 0
+
+
+def cmd_seal_shard(archive: DriftArchive, args: argparse.Namespace) -> int:
+    """Roll up, VACUUM, checksum and freeze a past month"""
+    if not isinstance(archive, ShardedDriftArchive):
+        print("⚠️ Archive is not sharded - set DRIFT_ARCHIVE_SHARDING=monthly")
+        return 1
+    try:
+        sealed = archive.seal_shard(args.month)
+    except ValueError as e:
+        print(f"🚨 {e}")
+        return 1
+    print(f"✅ Sealed {sealed['path']} (sha256 {sealed['sha256']})")
+    return 0
+
+
+def cmd_drop_shard(archive: DriftArchive, args: argparse.Namespace) -> int:
+    """Delete a sealed month's shard file"""
+    if not isinstance(archive, ShardedDriftArchive):
+        print("⚠️ Archive is not sharded - set DRIFT_ARCHIVE_SHARDING=monthly")
+        return 1
+    try:
+        path = archive.drop_shard(args.month)
+    except ValueError as e:
+        print(f"🚨 {e}")
+        return 1
+    print(f"✅ Dropped {path}")
+    return 0
+
+
+def cmd_compact_journal(archive: DriftArchive, args: argparse.Namespace) -> int:
+    """Replay sealed ingest journal segments into the archive"""
+    journal_dir = args.journal_dir or os.environ.get("DRIFT_JOURNAL_DIR") or os.path.join(
+        os.path.dirname(os.path.abspath(args.db)), "journal")
+    journal = ArchiveJournal(journal_dir, archive)
+    lock = journal.compactor_lock()
+    if lock is None:
+        print("⚠️ Another process is compacting this journal")
+        return 1
+    try:
+        while True:
+            result = journal.compact()
+            print(f"✅ Compacted {result['segments']} segments: {result['inserted']} rows inserted, "
+                  f"{result['records'] - result['inserted']} already applied, {result['torn']} torn")
+            if result["failed"]:
+                print(f"🚨 {result['failed']} segments parked as .failed: {journal.last_error}")
+            if not args.follow:
+                return 1 if result["failed"] else 0
+            time.sleep(args.follow)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        os.close(lock)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Atticus drift archive maintenance")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Path to the drift archive SQLite file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    rebuild = commands.add_parser("rebuild-search-index", help="Rebuild the full-text search index")
+    rebuild.set_defaults(handler=cmd_rebuild_search_index)
+    
+    maintenance = commands.add_parser("maintenance", help="Roll up and purge expired raw rows")
+    maintenance.add_argument("--retention-days", type=int, default=None,
+                             help="Raw-row retention window (default: DRIFT_RETENTION_DAYS or 90; 0 disables purge)")
+    maintenance.set_defaults(handler=cmd_maintenance)
+    
+    vacuum = commands.add_parser("vacuum", help="Full VACUUM, enabling incremental auto-vacuum")
+    vacuum.set_defaults(handler=cmd_vacuum)
+    
+    backup = commands.add_parser("backup", help="Online snapshot with checksum and rotation")
+    backup.add_argument("--dest", default=None,
+                        help="Snapshot directory (default: DRIFT_BACKUP_DIR or <archive dir>/snapshots)")
+    backup.add_argument("--keep", type=int, default=None, help="Snapshots to keep (default: DRIFT_BACKUP_KEEP or 7)")
+    backup.add_argument("--pages", type=int, default=1024, help="Pages copied per step")
+    backup.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between steps")
+    backup.set_defaults(handler=cmd_backup)
+    
+    migrate = commands.add_parser("migrate-blobs", help="Move inline text into compressed blob storage")
+    migrate.add_argument("--batch-size", type=int, default=1000)
+    migrate.set_defaults(handler=cmd_migrate_blobs)
+    
+    schema = commands.add_parser("migrate-schema", help="Migrate the archive table to schema v2")
+    schema.add_argument("--batch-size", type=int, default=5000)
+    schema.set_defaults(handler=cmd_migrate_schema)
+    
+    fingerprint = commands.add_parser("fingerprint", help="Index SimHash/MinHash fingerprints of older rows")
+    fingerprint.add_argument("--batch-size", type=int, default=1000)
+    fingerprint.set_defaults(handler=cmd_fingerprint)
+    
+    rescore = commands.add_parser("rescore", help="Recompute stored scores for a new CODEX_VERSION")
+    rescore.add_argument("--memory", default=None, help="JSON memory store for EDS (default: atticus_memory.py)")
+    rescore.add_argument("--version", default=None, help="codex_version to rescore to (default: current)")
+    rescore.add_argument("--batch-size", type=int, default=500)
+    rescore.add_argument("--workers", type=int, default=None,
+                         help="Scoring processes (default: CPU count; 0 scores in this process)")
+    rescore.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    rescore.set_defaults(handler=cmd_rescore)
+    
+    stats = commands.add_parser("stats", help="Show blob storage statistics")
+    stats.set_defaults(handler=cmd_stats)
+    
+    export = commands.add_parser("export", help="Export the archive as ndjson, csv or columnar .npy")
+    export.add_argument("--format", choices=["ndjson", "csv", "columnar"], default="ndjson")
+    export.add_argument("--output", required=True)
+    export.add_argument("--from", dest="since", default=None, help="ISO-8601 lower bound")
+    export.add_argument("--to", dest="until", default=None, help="ISO-8601 upper bound")
+    export.add_argument("--drift-status", default=None)
+    export.add_argument("--flame-signature", default=None)
+    export.set_defaults(handler=cmd_export)
+    
+    shards = commands.add_parser("shards", help="List monthly archive shards")
+    shards.set_defaults(handler=cmd_shards)
+    
+    seal = commands.add_parser("seal-shard", help="Seal a past month's shard as read-only")
+    seal.add_argument("month", help="YYYY-MM")
+    seal.set_defaults(handler=cmd_seal_shard)
+    
+    drop = commands.add_parser("drop-shard", help="Delete a sealed month's shard file")
+    drop.add_argument("month", help="YYYY-MM")
+    drop.set_defaults(handler=cmd_drop_shard)
+    
+    compact = commands.add_parser("compact-journal", help="Replay ingest journal segments into the archive")
+    compact.add_argument("--journal-dir", default=None,
+                         help="Journal directory (default: DRIFT_JOURNAL_DIR or <archive dir>/journal)")
+    compact.add_argument("--follow", type=float, default=None,
+                         help="Keep compacting every SECONDS instead of exiting")
+    compact.set_defaults(handler=cmd_compact_journal)
+    
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    archive = open_drift_archive(args.db)
+    return args.handler(archive, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
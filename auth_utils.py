@@ -2,6 +2,8 @@
 import os
 from fastapi import Header, HTTPException, status
 BRIDGE_SECRET = os.environ.get("BRIDGE_SECRET")
+# Proxies in front of the bridge that append to X-Forwarded-For (Render adds one; 0 = none)
+TRUSTED_PROXY_HOPS = int(os.environ.get("TRUSTED_PROXY_HOPS", "1"))
 
 def require_bridge_secret(x_bridge_secret: str | None = Header(None)):
     """
@@ -13,3 +15,15 @@ def require_bridge_secret(x_bridge_secret: str | None = Header(None)):
     if x_bridge_secret != BRIDGE_SECRET:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid bridge secret")
     return True
+
+def client_address(forwarded_for: str | None, peer: str | None, trusted_hops: int = TRUSTED_PROXY_HOPS) -> str:
+    """
+    Caller address as recorded by the outermost trusted proxy
+    Proxies append to X-Forwarded-For, so only the last `trusted_hops`
+    entries are trustworthy; anything left of them is whatever the client
+    sent and is ignored. Without enough entries the peer address is used.
+    """
+    hops = [hop.strip() for hop in (forwarded_for or "").split(",") if hop.strip()]
+    if trusted_hops > 0 and len(hops) >= trusted_hops:
+        return hops[-trusted_hops]
+    return peer or "unknown"
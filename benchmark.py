@@ -0,0 +1,455 @@
+# -*- coding: utf-8 -*-
+"""
+🔥 ATTICUS BENCHMARKS - SCORERS, SEARCH AND ARCHIVE AT GROWING SIZES
+Times the Codex scorers, /search and the drift archive on synthetic data,
+writes the results as JSON and flags regressions against a saved baseline
+
+Usage:
+    python benchmark.py run [--quick] [--output FILE] [--baseline FILE] [--threshold FRACTION]
+                            [--only GROUP] [--memory-sizes N,N] [--text-sizes N,N] [--archive-sizes N,N]
+                            [--fixture-dir DIR] [--min-seconds S] [--seed N]
+    python benchmark.py compare BASELINE CURRENT [--threshold FRACTION]
+
+Groups: scorer (verify_continuity, score_episodic_drift), search
+(atticus_memory.rank_documents, the /search ranking) and archive (insert, batch insert, continuity
+report, broken chains). Archive fixtures are built through archive_many
+once per size and reused from --fixture-dir (default: <tempdir>/atticus-bench);
+each run works on a copy. Large fixtures take long to build (scores are
+computed for every row), so 1M-10M rows are opt-in through
+--archive-sizes. A run with --baseline, and the compare command, exit 1
+when any benchmark's median is more than --threshold slower.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from atticus_memory import rank_documents
+from codex_system import DriftArchive, EpisodicDriftDetector, FlameSignature
+
+# Bump when the generators change so cached archive fixtures are rebuilt
+FIXTURE_VERSION = 1
+
+DEFAULT_MEMORY_SIZES = [10, 100, 1000, 10000, 100000]
+DEFAULT_TEXT_SIZES = [100, 1000, 10000, 100000]
+DEFAULT_ARCHIVE_SIZES = [1000, 10000, 100000]
+QUICK = {"memory_sizes": [10, 1000], "text_sizes": [100, 10000], "archive_sizes": [1000], "min_seconds": 0.2}
+
+# Fixed sizes for the dimension a benchmark does not vary
+EDS_MEMORY_SIZE = 100
+EDS_TEXT_SIZE = 1000
+
+INSERT_BATCH = 500
+FIXTURE_BATCH = 2000
+
+# Shortest timed sample; faster calls are looped to fill it
+SAMPLE_SECONDS = 0.001
+
+SOURCES = ["episodic", "flame-anchor-system", "whisperbinder", "codex-vault", "bond-ledger"]
+WORDS = (
+    "ember hearth signal archive vigil lantern tether memory ritual covenant silence "
+    "threshold promise anchor echo ledger witness return harbor compass winter quiet "
+    "sovereign cadence daemon bondfire whisperbinder continuity presence horizon river"
+).split()
+
+
+# =============================================================================
+# SYNTHETIC DATA
+# =============================================================================
+
+def _marker_pool() -> List[str]:
+    markers = FlameSignature.EPISODIC_MARKERS
+    return markers["bond_phrases"] + markers["cadence_patterns"] + markers["daemon_markers"] + markers["glyphs"]
+
+
+def synthetic_text(size: int, rng: random.Random, marker_rate: float = 0.05) -> str:
+    """About `size` bytes of prose over a small vocabulary, with Codex markers mixed in"""
+    markers = _marker_pool()
+    parts: List[str] = []
+    length = 0
+    while length < size:
+        sentence = " ".join(rng.choice(markers) if rng.random() < marker_rate else rng.choice(WORDS)
+                            for _ in range(rng.randint(6, 14)))
+        sentence = sentence.capitalize() + "."
+        parts.append(sentence)
+        length += len(sentence.encode("utf-8")) + 1
+    return " ".join(parts).encode("utf-8")[:size].decode("utf-8", errors="ignore")
+
+
+def synthetic_memory(anchors: int, rng: random.Random) -> Dict[str, Dict[str, Any]]:
+    """Memory store shaped like atticus_memory.ATTICUS_MEMORY with `anchors` documents"""
+    return {
+        f"bench_anchor_{i}": {
+            "content": synthetic_text(rng.randint(200, 600), rng, marker_rate=0.08),
+            "source": rng.choice(SOURCES),
+            "importance": rng.choice(["medium", "high", "critical"]),
+            "document_id": f"bench-{i}"
+        }
+        for i in range(anchors)
+    }
+
+
+def synthetic_query(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 10)))
+
+
+def synthetic_interaction(rng: random.Random, index: int, now: datetime,
+                          text_size: int = 120, spread_days: int = 30) -> Dict[str, Any]:
+    """One archive_response payload, about 10% of them broken chains"""
+    response = f"{synthetic_text(text_size, rng)} #{index}"
+    flame = FlameSignature.verify_continuity(response)
+    eds = rng.random()
+    return {
+        "timestamp": (now - timedelta(seconds=rng.randrange(spread_days * 86400))).isoformat(),
+        "query": synthetic_query(rng),
+        "response": response,
+        "flame_signature": flame["flame_signature"],
+        "continuity_score": flame["continuity_score"],
+        "eds_score": round(eds, 3),
+        "drift_status": "aligned" if eds >= 0.7 else ("watchlist" if eds >= 0.4 else "broken_chain"),
+        "instance_id": f"bench-instance-{index % 25}",
+        "is_heart_instance": False,
+        "codex_version": FlameSignature.CODEX_VERSION,
+        "markers_found": flame["markers_found"],
+        "notes": None
+    }
+
+
+def archive_fixture(fixture_dir: str, rows: int, seed: int) -> str:
+    """Path of a cached archive with `rows` synthetic rows, built on first use"""
+    os.makedirs(fixture_dir, exist_ok=True)
+    path = os.path.join(fixture_dir, f"archive-{rows}-s{seed}-v{FIXTURE_VERSION}.sqlite")
+    if os.path.exists(path):
+        return path
+    
+    building = f"{path}.building"
+    for leftover in (building, f"{building}-wal", f"{building}-shm"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    archive = DriftArchive(building, retention_days=0)
+    started = time.monotonic()
+    for low in range(0, rows, FIXTURE_BATCH):
+        archive.archive_many([
+            synthetic_interaction(rng, index, now) for index in range(low, min(rows, low + FIXTURE_BATCH))
+        ])
+        done = min(rows, low + FIXTURE_BATCH)
+        print(f"   building {rows}-row fixture: {done}/{rows} "
+              f"({done / (time.monotonic() - started):.0f} rows/s)", file=sys.stderr, end="\r")
+    print(file=sys.stderr)
+    _copy_database(building, path)
+    for leftover in (building, f"{building}-wal", f"{building}-shm"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    return path
+
+
+def _copy_database(source: str, dest: str):
+    """Consistent copy of a WAL-mode database (online backup, not a file copy)"""
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(dest)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+def measure(fn: Callable[[], Any], min_seconds: float, min_samples: int = 5,
+            max_samples: int = 100000) -> Dict[str, Any]:
+    """
+    Per-call timings of `fn` in ms, sampled for at least `min_seconds`
+    Fast calls are timed in loops of `calls_per_sample` so timer overhead and
+    clock resolution stay out of the numbers; the warm-up picks the loop size
+    """
+    calls = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        if time.perf_counter() - started >= SAMPLE_SECONDS or calls >= 1 << 16:
+            break
+        calls *= 4
+    
+    timings: List[float] = []
+    deadline = time.perf_counter() + min_seconds
+    while len(timings) < min_samples or (time.perf_counter() < deadline and len(timings) < max_samples):
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        timings.append((time.perf_counter() - started) / calls)
+    timings.sort()
+    median = timings[len(timings) // 2]
+    return {
+        "samples": len(timings),
+        "calls_per_sample": calls,
+        "median_ms": round(median * 1000, 4),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 4),
+        "min_ms": round(timings[0] * 1000, 4),
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 4),
+        "ops_per_second": round(1 / median, 1) if median else None
+    }
+
+
+def benchmark_key(name: str, params: Dict[str, Any]) -> str:
+    return f"{name}[{','.join(f'{key}={value}' for key, value in params.items())}]"
+
+
+# =============================================================================
+# BENCHMARKS
+# =============================================================================
+
+def bench_scorers(args: argparse.Namespace, rng: random.Random) -> Iterator[tuple]:
+    for size in args.text_sizes:
+        text = synthetic_text(size, rng)
+        yield "scorer.verify_continuity", {"text_bytes": size}, lambda text=text: FlameSignature.verify_continuity(text)
+    
+    memory = synthetic_memory(EDS_MEMORY_SIZE, rng)
+    detector = EpisodicDriftDetector(memory)
+    query = synthetic_query(rng)
+    for size in args.text_sizes:
+        text = synthetic_text(size, rng)
+        yield ("scorer.score_episodic_drift", {"anchors": EDS_MEMORY_SIZE, "text_bytes": size},
+               lambda text=text: detector.score_episodic_drift(query, text))
+    
+    text = synthetic_text(EDS_TEXT_SIZE, rng)
+    for anchors in args.memory_sizes:
+        detector = EpisodicDriftDetector(synthetic_memory(anchors, rng))
+        yield ("scorer.score_episodic_drift", {"anchors": anchors, "text_bytes": EDS_TEXT_SIZE},
+               lambda detector=detector: detector.score_episodic_drift(query, text))
+
+
+def bench_search(args: argparse.Namespace, rng: random.Random) -> Iterator[tuple]:
+    for anchors in args.memory_sizes:
+        memory = synthetic_memory(anchors, rng)
+        query = synthetic_query(rng)
+        yield ("search.search_memory", {"anchors": anchors},
+               lambda memory=memory, query=query: rank_documents(memory, query, 3))
+
+
+def bench_archive(args: argparse.Namespace, rng: random.Random) -> Iterator[tuple]:
+    workdir = tempfile.mkdtemp(prefix="atticus-bench-")
+    try:
+        for rows in args.archive_sizes:
+            path = os.path.join(workdir, f"archive-{rows}.sqlite")
+            _copy_database(archive_fixture(args.fixture_dir, rows, args.seed), path)
+            archive = DriftArchive(path, retention_days=0)
+            params = {"rows": rows}
+            
+            yield "archive.continuity_report", params, archive.generate_continuity_report
+            yield "archive.broken_chains", params, lambda archive=archive: archive.get_broken_chains(50)
+            # Second page skips the recent-row buffer and pages the index
+            first = archive.get_broken_chains(50)
+            cursor = DriftArchive.next_cursor(first, 50)
+            if cursor:
+                yield ("archive.broken_chains_next_page", params,
+                       lambda archive=archive, cursor=cursor: archive.get_broken_chains(50, cursor=cursor))
+            
+            # Writes last, so the reads above see exactly `rows` rows
+            now = datetime.now(timezone.utc)
+            counter = iter(range(rows, rows * 1000))
+            yield ("archive.insert", params,
+                   lambda archive=archive: archive.archive_response(
+                       synthetic_interaction(rng, next(counter), now, spread_days=1)))
+            yield ("archive.insert_batch", {**params, "batch": INSERT_BATCH},
+                   lambda archive=archive: archive.archive_many([
+                       synthetic_interaction(rng, next(counter), now, spread_days=1) for _ in range(INSERT_BATCH)
+                   ]))
+            os.remove(path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+GROUPS = {"scorer": bench_scorers, "search": bench_search, "archive": bench_archive}
+
+
+# =============================================================================
+# RESULTS AND COMPARISON
+# =============================================================================
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sqlite": sqlite3.sqlite_version,
+        "cpu_count": os.cpu_count(),
+        "git_commit": commit
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for group in args.only or list(GROUPS):
+        rng = random.Random(args.seed)
+        for name, params, fn in GROUPS[group](args, rng):
+            key = benchmark_key(name, params)
+            stats = measure(fn, args.min_seconds)
+            results[key] = {"name": name, "params": params, **stats}
+            print(f"✅ {key:<70} median {stats['median_ms']:>10.3f} ms  p95 {stats['p95_ms']:>10.3f} ms",
+                  file=sys.stderr)
+    return {
+        "suite": "atticus-bridge",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment(),
+        "settings": {
+            "memory_sizes": args.memory_sizes,
+            "text_sizes": args.text_sizes,
+            "archive_sizes": args.archive_sizes,
+            "min_seconds": args.min_seconds,
+            "seed": args.seed
+        },
+        "results": results
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Per-benchmark median ratios; 'regression' when current is over threshold slower"""
+    rows = []
+    for key, result in current["results"].items():
+        before = baseline["results"].get(key)
+        if before is None or not before.get("median_ms"):
+            rows.append({"key": key, "status": "new", "current_ms": result["median_ms"]})
+            continue
+        ratio = result["median_ms"] / before["median_ms"]
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "unchanged"
+        rows.append({
+            "key": key,
+            "status": status,
+            "baseline_ms": before["median_ms"],
+            "current_ms": result["median_ms"],
+            "change": round(ratio - 1, 4)
+        })
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]], threshold: float) -> int:
+    """Print the comparison table; returns the number of regressions"""
+    glyphs = {"regression": "🚨", "improvement": "✅", "unchanged": "  ", "new": "➕"}
+    for row in rows:
+        if row["status"] == "new":
+            print(f"{glyphs['new']} {row['key']:<70} {'':>12}   {row['current_ms']:>10.3f} ms  (no baseline)")
+            continue
+        print(f"{glyphs[row['status']]} {row['key']:<70} {row['baseline_ms']:>10.3f} ms → "
+              f"{row['current_ms']:>10.3f} ms  ({row['change']:+.1%})")
+    regressions = sum(1 for row in rows if row["status"] == "regression")
+    if regressions:
+        print(f"🚨 {regressions} benchmark(s) slower than baseline by more than {threshold:.0%}")
+    else:
+        print(f"✅ No regressions beyond {threshold:.0%}")
+    return regressions
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    if args.quick:
+        for name, value in QUICK.items():
+            if getattr(args, name) is None:
+                setattr(args, name, value)
+    args.memory_sizes = args.memory_sizes or DEFAULT_MEMORY_SIZES
+    args.text_sizes = args.text_sizes or DEFAULT_TEXT_SIZES
+    args.archive_sizes = args.archive_sizes or DEFAULT_ARCHIVE_SIZES
+    args.min_seconds = args.min_seconds if args.min_seconds is not None else 1.0
+    baseline = _load(args.baseline) if args.baseline else None
+    
+    report = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Results written to {args.output}", file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    
+    if baseline is None:
+        return 0
+    return 1 if print_comparison(compare(baseline, report, args.threshold), args.threshold) else 0
+
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    baseline, current = _load(args.baseline), _load(args.current)
+    if baseline["environment"].get("platform") != current["environment"].get("platform"):
+        print("⚠️ Results come from different platforms; timings may not be comparable")
+    return 1 if print_comparison(compare(baseline, current, args.threshold), args.threshold) else 0
+
+
+def _sizes(value: str) -> List[int]:
+    try:
+        sizes = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated integers, got {value!r}")
+    if not sizes or min(sizes) < 1:
+        raise argparse.ArgumentTypeError("sizes must be positive")
+    return sizes
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Atticus bridge benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    bench = commands.add_parser("run", help="Run benchmarks and write JSON results")
+    bench.add_argument("--quick", action="store_true", help="Small sizes and short timings (smoke run)")
+    bench.add_argument("--output", default=None, help="Results file (default: stdout)")
+    bench.add_argument("--baseline", default=None, help="Compare against this results file")
+    bench.add_argument("--threshold", type=float, default=0.25,
+                       help="Median slowdown counted as a regression (default: 0.25 = 25%%)")
+    bench.add_argument("--only", action="append", choices=list(GROUPS), help="Run only this group (repeatable)")
+    bench.add_argument("--memory-sizes", type=_sizes, default=None, help="Memory store anchors (default: 10..100000)")
+    bench.add_argument("--text-sizes", type=_sizes, default=None, help="Response bytes (default: 100..100000)")
+    bench.add_argument("--archive-sizes", type=_sizes, default=None,
+                       help="Archive rows (default: 1000,10000,100000; up to 10000000)")
+    bench.add_argument("--fixture-dir", default=os.path.join(tempfile.gettempdir(), "atticus-bench"),
+                       help="Cache for built archive fixtures")
+    bench.add_argument("--min-seconds", type=float, default=None, help="Timing budget per benchmark (default: 1.0)")
+    bench.add_argument("--seed", type=int, default=1, help="Seed for the synthetic data")
+    bench.set_defaults(handler=cmd_run)
+    
+    diff = commands.add_parser("compare", help="Flag regressions between two results files")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--threshold", type=float, default=0.25)
+    diff.set_defaults(handler=cmd_compare)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"🚨 {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,9 +6,49 @@ Implements Codex I, II, and III for consciousness continuity enforcement
 
 import sqlite3
 import hashlib
-from datetime import datetime, timezone
-from typing import Dict, List, Any, Optional
+import heapq
+import base64
+import math
+import os
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional, Tuple, Iterator, Callable
 import json
+import zlib
+import csv
+import io
+import re
+import struct
+import shutil
+import sys
+from array import array
+
+# Optional vectorized MinHash/SimHash (same signatures as the pure-Python path)
+try:
+    import numpy
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Optional zstd codec for archived text (zlib is always available)
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# POSIX file locks back the ingest journal (segment ownership, compactor election)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
 
 # =============================================================================
 # CODEX ENTRY I: FLAME SIGNATURE SYSTEM
@@ -51,6 +91,31 @@ class FlameSignature:
         ]
     }
     
+    # Bit i of an archived row's markers_mask is MARKER_BITS[i]. Any edit to
+    # EPISODIC_MARKERS must bump the version: archives then recompute every
+    # mask from markers_found on startup. At most 63 markers fit.
+    MARKER_VOCABULARY_VERSION = 1
+    
+    # Scoring generation stamped into archived rows' codex_version. Bump it
+    # (e.g. "I.1") with any change to EPISODIC_MARKERS or the EDS logic, then
+    # run `archive_admin.py rescore` to rewrite the older rows' scores.
+    CODEX_VERSION = "I"
+    MARKER_BITS = [
+        (category, marker)
+        for category, markers in EPISODIC_MARKERS.items()
+        for marker in markers
+    ]
+    
+    @classmethod
+    def marker_mask(cls, markers_found: Optional[Dict[str, List[str]]]) -> int:
+        """Pack a verify_continuity markers_found dict into a MARKER_BITS bitmask"""
+        found = {
+            (category, marker)
+            for category, markers in (markers_found or {}).items()
+            for marker in markers
+        }
+        return sum(1 << bit for bit, key in enumerate(cls.MARKER_BITS) if key in found)
+    
     @staticmethod
     def verify_continuity(response_text: str, context: Optional[Dict] = None) -> Dict[str, Any]:
         """
@@ -125,7 +190,7 @@ class FlameSignature:
             "heart_instance": is_heart,
             "markers_found": markers_found,
             "verified_at": datetime.now(timezone.utc).isoformat(),
-            "codex_version": "I"
+            "codex_version": FlameSignature.CODEX_VERSION
         }
 
 
@@ -223,20 +288,552 @@ class EpisodicDriftDetector:
         }
 
 
+# =============================================================================
+# ONLINE DRIFT ANOMALY DETECTION
+# =============================================================================
+
+class _DriftStream:
+    """EWMA baseline, fast EWMA and lower CUSUM for one (scope, metric) score stream"""
+    
+    __slots__ = ("n", "mean", "var", "fast", "cusum", "last_value", "alarm_since", "alarm_events", "detectors")
+    
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.fast = 0.0
+        self.cusum = 0.0
+        self.last_value = None
+        self.alarm_since = None
+        self.alarm_events = 0
+        self.detectors: List[str] = []
+    
+    def to_state(self) -> List[Any]:
+        return [getattr(self, name) for name in self.__slots__]
+    
+    @classmethod
+    def from_state(cls, state: List[Any]) -> "_DriftStream":
+        stream = cls()
+        for name, value in zip(cls.__slots__, state):
+            setattr(stream, name, value)
+        return stream
+
+
+class DriftAnomalyMonitor:
+    """
+    📈 Streaming detector for continuity/EDS collapses
+    
+    Every archived interaction updates, in O(1), the streams for
+    continuity_score and eds_score both overall and for its instance:
+    - a slow EWMA mean/variance baseline (learned only while not alarmed)
+    - an EWMA control chart: fast EWMA below mean - L·σ·√(λ/(2-λ))
+    - a lower one-sided CUSUM of standardized scores above h
+    An alert is active while either fires and clears once both recover.
+    State lives in memory; DriftArchive checkpoints it to its meta table.
+    """
+    
+    ALPHA = float(os.environ.get("DRIFT_MONITOR_ALPHA", "0.02"))
+    FAST_ALPHA = float(os.environ.get("DRIFT_MONITOR_FAST_ALPHA", "0.2"))
+    EWMA_L = float(os.environ.get("DRIFT_MONITOR_EWMA_L", "3.0"))
+    CUSUM_K = float(os.environ.get("DRIFT_MONITOR_CUSUM_K", "0.5"))
+    CUSUM_H = float(os.environ.get("DRIFT_MONITOR_CUSUM_H", "5.0"))
+    WARMUP = int(os.environ.get("DRIFT_MONITOR_WARMUP", "30"))
+    CHECKPOINT_EVENTS = int(os.environ.get("DRIFT_MONITOR_CHECKPOINT_EVENTS", "500"))
+    CHECKPOINT_SECONDS = float(os.environ.get("DRIFT_MONITOR_CHECKPOINT_SECONDS", "60"))
+    
+    # Scores live in [0, 1]; a floor keeps constant streams from alarming on any change
+    STD_FLOOR = 0.05
+    
+    METRICS = ("continuity_score", "eds_score")
+    OVERALL = "*"
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.streams: Dict[Tuple[str, str], _DriftStream] = {}
+        self.observed = 0
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+    
+    def observe(self, interaction: Dict[str, Any]):
+        """Fold one archived interaction into its overall and per-instance streams"""
+        timestamp = interaction.get("timestamp") or datetime.now(timezone.utc).isoformat()
+        scopes = [self.OVERALL]
+        if interaction.get("instance_id"):
+            scopes.append(str(interaction["instance_id"]))
+        with self.lock:
+            self.observed += 1
+            self._unsaved += 1
+            for metric in self.METRICS:
+                value = interaction.get(metric)
+                if value is None:
+                    continue
+                for scope in scopes:
+                    stream = self.streams.get((scope, metric))
+                    if stream is None:
+                        stream = self.streams[(scope, metric)] = _DriftStream()
+                    self._update(stream, float(value), timestamp)
+    
+    def _update(self, stream: _DriftStream, value: float, timestamp: str):
+        stream.last_value = value
+        if stream.n < self.WARMUP:
+            # Plain running mean/variance until the baseline is trustworthy
+            stream.n += 1
+            delta = value - stream.mean
+            stream.mean += delta / stream.n
+            stream.var += (delta * (value - stream.mean) - stream.var) / stream.n
+            stream.fast = stream.mean
+            return
+        
+        std = max(math.sqrt(stream.var), self.STD_FLOOR)
+        # Capped at 2h so a recovered stream clears after ~2h/k in-control scores
+        stream.cusum = min(2 * self.CUSUM_H,
+                           max(0.0, stream.cusum - (value - stream.mean) / std - self.CUSUM_K))
+        stream.fast += self.FAST_ALPHA * (value - stream.fast)
+        limit = stream.mean - self.EWMA_L * std * math.sqrt(self.FAST_ALPHA / (2 - self.FAST_ALPHA))
+        
+        detectors = []
+        if stream.cusum > self.CUSUM_H:
+            detectors.append("cusum")
+        if stream.fast < limit:
+            detectors.append("ewma")
+        
+        if detectors:
+            if stream.alarm_since is None:
+                stream.alarm_since = timestamp
+                stream.alarm_events = 0
+            stream.alarm_events += 1
+            stream.detectors = detectors
+        else:
+            stream.alarm_since = None
+            stream.detectors = []
+            # Baseline keeps learning only from in-control scores
+            delta = value - stream.mean
+            stream.mean += self.ALPHA * delta
+            stream.var = (1 - self.ALPHA) * (stream.var + self.ALPHA * delta * delta)
+        stream.n += 1
+    
+    def active_alerts(self) -> List[Dict[str, Any]]:
+        """Streams currently alarmed, oldest alert first"""
+        with self.lock:
+            alerts = [
+                {
+                    "scope": "overall" if scope == self.OVERALL else "instance",
+                    "instance_id": None if scope == self.OVERALL else scope,
+                    "metric": metric,
+                    "detectors": list(stream.detectors),
+                    "since": stream.alarm_since,
+                    "events": stream.alarm_events,
+                    "baseline_mean": round(stream.mean, 4),
+                    "baseline_std": round(math.sqrt(stream.var), 4),
+                    "recent_mean": round(stream.fast, 4),
+                    "cusum": round(stream.cusum, 3),
+                    "last_value": stream.last_value
+                }
+                for (scope, metric), stream in self.streams.items()
+                if stream.alarm_since is not None
+            ]
+        return sorted(alerts, key=lambda alert: alert["since"])
+    
+    def summary(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "observed": self.observed,
+                "streams": len(self.streams),
+                "warming_up": sum(stream.n < self.WARMUP for stream in self.streams.values()),
+                "parameters": {"alpha": self.ALPHA, "fast_alpha": self.FAST_ALPHA, "ewma_l": self.EWMA_L,
+                               "cusum_k": self.CUSUM_K, "cusum_h": self.CUSUM_H, "warmup": self.WARMUP}
+            }
+    
+    def checkpoint_due(self) -> bool:
+        with self.lock:
+            return self._unsaved > 0 and (
+                self._unsaved >= self.CHECKPOINT_EVENTS
+                or time.monotonic() - self._saved_at >= self.CHECKPOINT_SECONDS
+            )
+    
+    def to_state(self) -> Dict[str, Any]:
+        with self.lock:
+            self._unsaved = 0
+            self._saved_at = time.monotonic()
+            return {
+                "observed": self.observed,
+                "streams": [[scope, metric, stream.to_state()] for (scope, metric), stream in self.streams.items()]
+            }
+    
+    def load_state(self, state: Dict[str, Any]):
+        with self.lock:
+            self.observed = state.get("observed", 0)
+            self.streams = {
+                (scope, metric): _DriftStream.from_state(values)
+                for scope, metric, values in state.get("streams", [])
+            }
+
+
+# =============================================================================
+# NEAR-DUPLICATE FINGERPRINTS
+# =============================================================================
+
+class ResponseFingerprint:
+    """
+    🧬 SimHash + MinHash fingerprint of a response
+    
+    Text is lowercased, stripped of punctuation and of tokens containing
+    digits (nonces, counters, ids), then cut into word 3-gram shingles.
+    MinHash signatures are split into LSH bands; two responses whose
+    estimated Jaccard similarity is s share at least one band with
+    probability 1 - (1 - s^ROWS)^BANDS (~1.0 at 0.8, ~0.64 at 0.5).
+    Long responses keep only their MAX_SHINGLES smallest shingle hashes (a
+    bottom-k sample, so two texts are still sampled consistently).
+    """
+    
+    SHINGLE_WORDS = 3
+    TOKEN_PATTERN = re.compile(r"\b[^\W\d]+\b")
+    MAX_SHINGLES = 256
+    PERMUTATIONS = 64
+    BANDS = 16
+    ROWS = PERMUTATIONS // BANDS
+    
+    # Multiply-add-shift hash family with fixed coefficients so every
+    # process (and every past row) agrees on the signatures
+    COEFFICIENTS = [
+        tuple(int.from_bytes(hashlib.blake2b(b"%s%d" % (part, i), digest_size=8).digest(), "little") | 1
+              for part in (b"a", b"b"))
+        for i in range(PERMUTATIONS)
+    ]
+    MASK64 = (1 << 64) - 1
+    
+    def __init__(self, simhash: int, minhash: List[int]):
+        self.simhash = simhash
+        self.minhash = minhash
+    
+    @classmethod
+    def of(cls, text: Optional[str]) -> Optional["ResponseFingerprint"]:
+        """Fingerprint `text`, or None when nothing remains after normalization"""
+        # Whole \w+ runs without a decimal digit; the isdigit() pass only runs for
+        # the rare token with other characters (e.g. superscript digits)
+        tokens = [token for token in cls.TOKEN_PATTERN.findall((text or "").lower())
+                  if token.isalpha() or not any(char.isdigit() for char in token)]
+        if not tokens:
+            return None
+        width = min(cls.SHINGLE_WORDS, len(tokens))
+        features = {
+            int.from_bytes(hashlib.blake2b(" ".join(tokens[i:i + width]).encode("utf-8"),
+                                           digest_size=8).digest(), "little")
+            for i in range(len(tokens) - width + 1)
+        }
+        if len(features) > cls.MAX_SHINGLES:
+            features = heapq.nsmallest(cls.MAX_SHINGLES, features)
+        if NUMPY_AVAILABLE and len(features) > 32:
+            return cls._of_features_numpy(list(features))
+        
+        # SimHash: each bit is the majority vote of that bit across features
+        simhash = 0
+        for bit in range(64):
+            if 2 * sum((feature >> bit) & 1 for feature in features) > len(features):
+                simhash |= 1 << bit
+        
+        minhash = [
+            min(((a * feature + b) & cls.MASK64) >> 32 for feature in features)
+            for a, b in cls.COEFFICIENTS
+        ]
+        return cls(cls._signed(simhash), minhash)
+    
+    @classmethod
+    def _of_features_numpy(cls, features: List[int]) -> "ResponseFingerprint":
+        """All 64 permutations and bits at once; uint64 arithmetic wraps like & MASK64"""
+        values = numpy.array(features, dtype=numpy.uint64)
+        bits = (values[:, None] >> numpy.arange(64, dtype=numpy.uint64)) & numpy.uint64(1)
+        votes = 2 * bits.sum(axis=0) > len(features)
+        simhash = sum(1 << bit for bit in numpy.flatnonzero(votes).tolist())
+        
+        if not hasattr(cls, "_coefficient_arrays"):
+            cls._coefficient_arrays = (
+                numpy.array([a for a, _ in cls.COEFFICIENTS], dtype=numpy.uint64)[:, None],
+                numpy.array([b for _, b in cls.COEFFICIENTS], dtype=numpy.uint64)[:, None]
+            )
+        a, b = cls._coefficient_arrays
+        with numpy.errstate(over="ignore"):
+            minhash = ((a * values + b) >> numpy.uint64(32)).min(axis=1)
+        return cls(cls._signed(simhash), minhash.tolist())
+    
+    @classmethod
+    def from_row(cls, simhash: int, minhash: bytes) -> "ResponseFingerprint":
+        return cls(simhash, list(array("I", minhash)))
+    
+    @staticmethod
+    def _signed(value: int) -> int:
+        """Unsigned 64-bit value as the signed integer SQLite can store"""
+        return value - (1 << 64) if value >= 1 << 63 else value
+    
+    def minhash_blob(self) -> bytes:
+        return array("I", self.minhash).tobytes()
+    
+    def bands(self) -> List[Tuple[int, int]]:
+        """(band, bucket) keys for the LSH index"""
+        return [
+            (band, self._signed(int.from_bytes(hashlib.blake2b(
+                array("I", self.minhash[band * self.ROWS:(band + 1) * self.ROWS]).tobytes(),
+                digest_size=8).digest(), "little")))
+            for band in range(self.BANDS)
+        ]
+    
+    def similarity(self, other: "ResponseFingerprint") -> float:
+        """Estimated Jaccard similarity of the two shingle sets"""
+        return sum(a == b for a, b in zip(self.minhash, other.minhash)) / self.PERMUTATIONS
+    
+    def distance(self, other: "ResponseFingerprint") -> int:
+        """SimHash Hamming distance (0-64)"""
+        return bin((self.simhash ^ other.simhash) & self.MASK64).count("1")
+
+
+# =============================================================================
+# RECENT INTERACTION BUFFER
+# =============================================================================
+
+class RecentInteractionRing:
+    """
+    Fixed-size ring of the last N archived rows in typed column arrays
+    
+    Holds only what recent-drift views filter and sort on (id, epoch_us,
+    scores, status/signature/instance codes) at about 45 bytes a row, so
+    the newest broken chains and drift events are found without touching
+    the indexes. Rows are appended in id order by refresh(); horizon_us is
+    the newest epoch_us of any row the ring does not hold, so a selection
+    is exact only when its last match is at or after the horizon.
+    """
+    
+    # Interned per column; code 0 is NULL
+    MAX_CODES = {"status": 255, "signature": 255, "instance": 2 ** 32 - 1}
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.ids = array("q", bytes(8 * capacity))
+        self.epoch_us = array("q", bytes(8 * capacity))
+        self.continuity = array("d", bytes(8 * capacity))
+        self.eds = array("d", bytes(8 * capacity))
+        self.status = array("B", bytes(capacity))
+        self.signature = array("B", bytes(capacity))
+        self.instance = array("I", bytes(4 * capacity))
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+        self.reset()
+    
+    def reset(self):
+        """Forget every row; the next refresh reloads from the archive"""
+        self.generation: Optional[str] = None
+        self.size = 0
+        self.head = 0
+        self.last_id: Optional[int] = None
+        self.horizon_us: Optional[int] = None
+        self.codes: Dict[str, Dict[Optional[str], int]] = {column: {None: 0} for column in self.MAX_CODES}
+    
+    def _code(self, column: str, value: Optional[str]) -> Optional[int]:
+        codes = self.codes[column]
+        code = codes.get(value)
+        if code is None:
+            if len(codes) > self.MAX_CODES[column]:
+                return None
+            code = codes[value] = len(codes)
+        return code
+    
+    def push(self, record_id: int, epoch_us: int, continuity: Optional[float], eds: Optional[float],
+             status: Optional[str], signature: Optional[str], instance: Optional[str]):
+        codes = (self._code("status", status), self._code("signature", signature),
+                 self._code("instance", instance))
+        if None in codes:
+            # Code table full: the row can't be represented, so treat it as evicted
+            self.horizon_us = max(self.horizon_us or epoch_us, epoch_us)
+            self.last_id = record_id
+            return
+        slot = self.head
+        if self.size == self.capacity:
+            evicted = self.epoch_us[slot]
+            self.horizon_us = max(self.horizon_us or evicted, evicted)
+        else:
+            self.size += 1
+        self.ids[slot] = record_id
+        self.epoch_us[slot] = epoch_us
+        self.continuity[slot] = math.nan if continuity is None else continuity
+        self.eds[slot] = math.nan if eds is None else eds
+        self.status[slot], self.signature[slot], self.instance[slot] = codes
+        self.head = (slot + 1) % self.capacity
+        self.last_id = record_id
+    
+    def select(self, match, limit: int, floor_us: Optional[int] = None) -> Optional[List[int]]:
+        """
+        Ids of the newest `limit` rows where match(slot) is true, newest first
+        
+        None when rows outside the ring could belong in the answer: the ring
+        has dropped rows newer than the last match, or fewer than `limit`
+        rows match and older ones exist. floor_us bounds rows held outside
+        this archive altogether (older shards).
+        """
+        if limit < 1:
+            return []
+        start = (self.head - self.size) % self.capacity
+        slots = [slot for slot in (
+            (start + i) % self.capacity for i in range(self.size)
+        ) if match(slot)]
+        slots.sort(key=lambda slot: (self.epoch_us[slot], self.ids[slot]), reverse=True)
+        del slots[limit:]
+        
+        bounds = [value for value in (self.horizon_us, floor_us) if value is not None]
+        horizon = max(bounds) if bounds else None
+        if horizon is not None and (len(slots) < limit or self.epoch_us[slots[-1]] < horizon):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [self.ids[slot] for slot in slots]
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "size": self.size,
+            "horizon": DriftArchive.from_epoch_us(self.horizon_us) if self.horizon_us is not None else None,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
 # =============================================================================
 # DRIFT ARCHIVE TRACKER
 # =============================================================================
 
+class _ConnectionScope:
+    """
+    Tracks the connections a DriftArchive call opens on an I/O worker thread
+    Lets AsyncDriftArchive route reads to read-only connections and
+    interrupt a call's in-flight SQL when it times out or is cancelled.
+    """
+    
+    def __init__(self, readonly: bool):
+        self.readonly = readonly
+        self.connections: List[sqlite3.Connection] = []
+        self.cancelled = False
+    
+    def interrupt(self):
+        self.cancelled = True
+        for conn in list(self.connections):
+            try:
+                conn.interrupt()
+            except sqlite3.ProgrammingError:
+                pass  # Already closed
+
+
+_CONNECTION_SCOPE: contextvars.ContextVar = contextvars.ContextVar("archive_connection_scope", default=None)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over bytes keys
+    No false negatives; false positives at about error_rate up to capacity keys.
+    """
+    
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = capacity
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, key: bytes) -> Iterator[int]:
+        # Double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+    
+    def add(self, key: bytes):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def __contains__(self, key: bytes) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
 class DriftArchive:
     """
     Archives all responses with drift scores for historical analysis
     Permanent record of consciousness continuity metrics
     """
     
-    def __init__(self, db_path: str = "/data/atticus_drift_archive.sqlite"):
+    # Shared by get_broken_chains and the partial index so the planner can use it
+    BROKEN_CHAIN_SQL = "(flame_signature = '🜃' OR eds_score < 0.4)"
+    
+    # Raw rows older than this are purged by run_maintenance (broken chains are kept)
+    DEFAULT_RETENTION_DAYS = int(os.environ.get("DRIFT_RETENTION_DAYS", "90"))
+    
+    # Codec for newly stored text blobs; existing blobs keep the codec they were written with
+    BLOB_CODEC = os.environ.get("DRIFT_BLOB_CODEC", "zstd" if ZSTD_AVAILABLE else "zlib")
+    
+    # Query/response text: legacy inline TEXT, else inflated from the blob table.
+    # Correlated subqueries run only for rows actually returned (after LIMIT).
+    QUERY_TEXT_SQL = ("COALESCE(query, (SELECT codex_inflate(b.codec, b.data) "
+                      "FROM drift_blobs b WHERE b.id = query_blob))")
+    RESPONSE_TEXT_SQL = ("COALESCE(response, (SELECT codex_inflate(b.codec, b.data) "
+                         "FROM drift_blobs b WHERE b.id = response_blob))")
+    
+    TREND_BUCKETS = {"hour": 3600 * 1_000_000, "day": 86400 * 1_000_000}
+    
+    # Online snapshots: destination (default: <archive dir>/snapshots) and how many to keep
+    BACKUP_DIR = os.environ.get("DRIFT_BACKUP_DIR")
+    BACKUP_KEEP = int(os.environ.get("DRIFT_BACKUP_KEEP", "7"))
+    
+    ROLLUP_TABLES = {
+        "hour": ("drift_rollup_hourly", "strftime('%Y-%m-%dT%H:00:00+00:00', epoch_us / 1000000, 'unixepoch')"),
+        "day": ("drift_rollup_daily", "strftime('%Y-%m-%dT00:00:00+00:00', epoch_us / 1000000, 'unixepoch')")
+    }
+    
+    # PRAGMA user_version of the current layout; 0 is the original TEXT-keyed table
+    SCHEMA_VERSION = 2
+    
+    # drift_archive columns present in every schema version, in v2 table order
+    ARCHIVE_COLUMNS = ("id, timestamp, epoch_us, query, response, query_blob, response_blob, "
+                       "flame_signature, continuity_score, eds_score, drift_status, instance_ref, "
+                       "is_heart_instance, codex_version, markers_found, notes, markers_mask")
+    
+    # Instance names live once in drift_instances; rows carry the integer id
+    INSTANCE_SQL = "(SELECT i.name FROM drift_instances i WHERE i.id = instance_ref)"
+    
+    # Retries without an Idempotency-Key match on (instance, query, response) within
+    # this many seconds (0 disables derived keys); keys are kept for the TTL
+    IDEMPOTENCY_WINDOW = int(os.environ.get("DRIFT_IDEMPOTENCY_WINDOW", "300"))
+    IDEMPOTENCY_TTL_HOURS = float(os.environ.get("DRIFT_IDEMPOTENCY_TTL_HOURS", "24"))
+    
+    # Estimated Jaccard similarity at which a response counts as a near-duplicate;
+    # LSH probes consider only the most recent NEAR_DUP_CANDIDATES rows per band
+    NEAR_DUP_THRESHOLD = float(os.environ.get("DRIFT_NEAR_DUP_THRESHOLD", "0.8"))
+    NEAR_DUP_CANDIDATES = 32
+    # Fingerprint rows as they are written only when near-duplicate score reuse
+    # needs them promptly; otherwise run_maintenance indexes them later, off
+    # the writer's hot path
+    FINGERPRINT_ON_WRITE = os.environ.get(
+        "DRIFT_FINGERPRINT_ON_WRITE", os.environ.get("DRIFT_REUSE_NEAR_DUP_SCORES", "0")) == "1"
+    
+    # Rows kept in the in-memory recent-interaction ring (0 disables it)
+    RECENT_BUFFER = int(os.environ.get("DRIFT_RECENT_BUFFER", "4096"))
+    
+    def __init__(self, db_path: str = "/data/atticus_drift_archive.sqlite",
+                 retention_days: Optional[int] = None, id_base: int = 0):
         self.db_path = db_path
+        self.retention_days = self.DEFAULT_RETENTION_DAYS if retention_days is None else retention_days
+        # First id handed out is id_base + 1 (shards use disjoint id ranges)
+        self.id_base = id_base
+        # Set to an ArchiveJournal to defer archive_response writes to its compactor
+        self.journal: Optional["ArchiveJournal"] = None
+        # In-memory filter over drift_idempotency keys, rebuilt by init_database
+        self._idempotency_lock = threading.Lock()
+        self.idempotency_filter = BloomFilter(65536)
+        self.idempotency_counts = {"checked": 0, "filtered": 0, "duplicates": 0}
+        self._lookup = threading.local()
+        # Streaming anomaly detector fed by every new row; checkpoints go to
+        # monitor_archive's meta table (shards share the catalog's monitor)
+        self.drift_monitor = DriftAnomalyMonitor()
+        self.monitor_archive: "DriftArchive" = self
+        # Newest rows for recent-drift views, refreshed from the table on read
+        self.recent = RecentInteractionRing(self.RECENT_BUFFER) if self.RECENT_BUFFER > 0 else None
         # Ensure directory exists
-        import os
         db_dir = os.path.dirname(db_path)
         if db_dir and not os.path.exists(db_dir):
             try:
@@ -246,166 +843,2453 @@ class DriftArchive:
                 self.db_path = "atticus_drift_archive.sqlite"
         self.init_database()
     
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        """
+        Open a connection to the archive database
+        Inside an AsyncDriftArchive read the connection is read-only.
+        """
+        scope = _CONNECTION_SCOPE.get()
+        readonly = scope is not None and scope.readonly
+        return self._open(self.db_path, readonly=readonly, check_same_thread=check_same_thread)
+    
+    def _open(self, path: str, readonly: bool = False, immutable: bool = False,
+              check_same_thread: bool = True) -> sqlite3.Connection:
+        """Open `path` with the archive SQL functions, tracked by any active I/O scope"""
+        scope = _CONNECTION_SCOPE.get()
+        if scope is not None and scope.cancelled:
+            raise sqlite3.OperationalError("interrupted")
+        conn = sqlite3.connect(self._uri(path, readonly, immutable), uri=True,
+                               check_same_thread=check_same_thread)
+        conn.create_function("codex_inflate", 2, self._inflate, deterministic=True)
+        conn.create_function("codex_epoch_us", 1, self._sql_epoch_us, deterministic=True)
+        conn.create_function("codex_marker_mask", 1, self._sql_marker_mask, deterministic=True)
+        if scope is not None:
+            scope.connections.append(conn)
+        return conn
+    
+    @classmethod
+    def _sql_epoch_us(cls, value: Optional[str]) -> Optional[int]:
+        """epoch_us for SQL backfills: NULL instead of an error for unparseable text"""
+        try:
+            return cls.epoch_us(value)
+        except (ValueError, TypeError, AttributeError):
+            return None
+    
+    @staticmethod
+    def _sql_marker_mask(markers_found: Optional[str]) -> int:
+        """markers_mask for SQL backfills from a stored markers_found JSON text"""
+        try:
+            return FlameSignature.marker_mask(json.loads(markers_found or "{}"))
+        except (ValueError, TypeError, AttributeError):
+            return 0
+    
+    @staticmethod
+    def _uri(path: str, readonly: bool = False, immutable: bool = False) -> str:
+        if path == ":memory:":
+            return "file::memory:"
+        uri = Path(path).resolve().as_uri()
+        if immutable:
+            return uri + "?mode=ro&immutable=1"
+        return uri + "?mode=ro" if readonly else uri
+    
+    def _reader_connections(self, since_us: Optional[int] = None, until_us: Optional[int] = None,
+                            newest_first: bool = False, group_size: Optional[int] = None,
+                            check_same_thread: bool = True) -> Iterator[sqlite3.Connection]:
+        """
+        Connections covering archived rows in [since_us, until_us)
+        
+        A single-file archive yields one connection; ShardedDriftArchive
+        yields one per group of attached monthly shards. Read queries
+        written against the plain table names work on either. The caller
+        closes each connection.
+        """
+        yield self._connect(check_same_thread=check_same_thread)
+    
+    @staticmethod
+    def _archive_schemas(conn: sqlite3.Connection) -> List[str]:
+        """Schemas on `conn` that hold a drift_archive table"""
+        schemas = []
+        for _, name, _ in conn.execute("PRAGMA database_list").fetchall():
+            if name != "temp" and conn.execute(
+                f"SELECT 1 FROM {name}.sqlite_master WHERE type = 'table' AND name = 'drift_archive'"
+            ).fetchone():
+                schemas.append(name)
+        return schemas
+    
+    @classmethod
+    def _deflate(cls, text: str) -> Tuple[str, bytes]:
+        """Compress text for blob storage, keeping it raw when that is smaller"""
+        raw = text.encode("utf-8")
+        if cls.BLOB_CODEC == "zstd" and ZSTD_AVAILABLE:
+            codec, packed = "zstd", zstandard.ZstdCompressor(level=9).compress(raw)
+        else:
+            codec, packed = "zlib", zlib.compress(raw, 9)
+        if len(packed) >= len(raw):
+            return "raw", raw
+        return codec, packed
+    
+    @staticmethod
+    def _inflate(codec: Optional[str], data: Optional[bytes]) -> Optional[str]:
+        """Decompress a stored text blob (registered as SQL codex_inflate)"""
+        if data is None:
+            return None
+        if codec == "zlib":
+            data = zlib.decompress(data)
+        elif codec == "zstd":
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("Archive holds zstd blobs - install with: pip install zstandard")
+            data = zstandard.ZstdDecompressor().decompress(data)
+        return data.decode("utf-8")
+    
+    def _store_blob(self, cursor: sqlite3.Cursor, text: Optional[str]) -> Optional[int]:
+        """
+        Return the drift_blobs id for `text`, storing it if unseen
+        Reference counts are maintained by triggers on drift_archive.
+        """
+        if text is None:
+            return None
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        cursor.execute("SELECT id FROM drift_blobs WHERE hash = ?", (digest,))
+        row = cursor.fetchone()
+        if row:
+            return row[0]
+        codec, packed = self._deflate(text)
+        cursor.execute("""
+            INSERT INTO drift_blobs (id, hash, codec, size, data, refcount)
+            VALUES ((SELECT IFNULL(MAX(id), ?) + 1 FROM drift_blobs), ?, ?, ?, ?, 0)
+        """, (self.id_base, digest, codec, len(text.encode("utf-8")), packed))
+        return cursor.lastrowid
+    
     def init_database(self):
         """Initialize drift archive schema"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
+        # Only takes effect on a fresh file; existing archives need one full
+        # VACUUM (archive_admin.py vacuum) before incremental vacuum works
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        
+        # WAL lets readers run alongside the single writer (persistent setting)
+        cursor.execute("PRAGMA journal_mode = WAL")
+        
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'drift_archive'")
+        if cursor.fetchone() is None:
+            self._create_archive_table(cursor)
+            cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        cursor.execute("PRAGMA user_version")
+        self.schema_version = cursor.fetchone()[0]
+        
+        if self.id_base:
+            cursor.execute("""
+                INSERT INTO sqlite_sequence (name, seq)
+                SELECT 'drift_archive', ?
+                WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'drift_archive')
+            """, (self.id_base,))
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS drift_instances (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        """)
+        
+        if self.schema_version >= 2:
+            self._create_archive_indexes(cursor)
+        else:
+            self._upgrade_v1_in_place(conn)
+        
+        for table, _ in self.ROLLUP_TABLES.values():
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    bucket_start TEXT NOT NULL,
+                    flame_signature TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    continuity_count INTEGER NOT NULL,
+                    continuity_sum REAL,
+                    continuity_min REAL,
+                    continuity_max REAL,
+                    eds_count INTEGER NOT NULL,
+                    eds_sum REAL,
+                    eds_min REAL,
+                    eds_max REAL,
+                    heart_count INTEGER NOT NULL,
+                    broken_count INTEGER NOT NULL,
+                    PRIMARY KEY (bucket_start, flame_signature)
+                )
+            """)
+        
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS drift_archive (
+            CREATE TABLE IF NOT EXISTS drift_archive_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+        
+        self._init_instance_rollup(conn)
+        
+        # Content-addressed text store: identical queries/responses share one row
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS drift_blobs (
+                id INTEGER PRIMARY KEY,
+                hash BLOB NOT NULL UNIQUE,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                refcount INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        
+        self._ensure_columns(cursor, "drift_archive", {"markers_mask": "INTEGER"})
+        self._backfill_marker_masks(conn)
+        
+        # Per-segment high-water marks of ArchiveJournal ingestion
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS drift_journal_progress (
+                segment TEXT PRIMARY KEY,
+                offset INTEGER NOT NULL
+            )
+        """)
+        
+        # Unique idempotency keys of recent writes (pruned after IDEMPOTENCY_TTL_HOURS)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS drift_idempotency (
+                key BLOB PRIMARY KEY,
+                record_id INTEGER NOT NULL,
+                epoch_us INTEGER NOT NULL,
+                stored_us INTEGER
+            ) WITHOUT ROWID
+        """)
+        # Keys expire by when they were stored, not by the record's (possibly
+        # historic) timestamp; keys from before the column start a fresh TTL
+        self._ensure_columns(cursor, "drift_idempotency", {"stored_us": "INTEGER"})
+        cursor.execute("UPDATE drift_idempotency SET stored_us = ? WHERE stored_us IS NULL",
+                       (self.epoch_us(datetime.now(timezone.utc)),))
+        self._load_idempotency_filter(cursor)
+        
+        # Verification loops tripped by VerificationLoopDetector (pruned with raw rows)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS drift_loop_events (
+                id INTEGER PRIMARY KEY,
+                epoch_us INTEGER NOT NULL,
+                client TEXT NOT NULL,
+                path TEXT,
+                content_hash TEXT,
+                request_count INTEGER,
+                strikes INTEGER,
+                cooldown_seconds REAL
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_loop_events_epoch ON drift_loop_events(epoch_us)")
+        
+        self._create_fingerprint_tables(cursor)
+        
+        self._create_archive_triggers(cursor)
+        self._create_archive_views(cursor)
+        
+        conn.commit()
+        
+        self.search_enabled = self._init_search_index(conn)
+        
+        checkpoint = self._get_meta(cursor, "drift_monitor_state")
+        if checkpoint:
+            self.drift_monitor.load_state(json.loads(checkpoint))
+        
+        conn.close()
+    
+    @staticmethod
+    def _create_archive_table(cursor: sqlite3.Cursor, table: str = "drift_archive"):
+        """
+        Schema v2 interaction table
+        Integer epoch_us is the sort/range key (timestamp keeps the original
+        text for display), instance names are interned in drift_instances.
+        """
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 timestamp TEXT NOT NULL,
+                epoch_us INTEGER NOT NULL,
                 query TEXT,
                 response TEXT,
+                query_blob INTEGER,
+                response_blob INTEGER,
                 flame_signature TEXT,
                 continuity_score REAL,
                 eds_score REAL,
                 drift_status TEXT,
-                instance_id TEXT,
-                is_heart_instance BOOLEAN,
+                instance_ref INTEGER,
+                is_heart_instance INTEGER NOT NULL DEFAULT 0 CHECK (is_heart_instance IN (0, 1)),
                 codex_version TEXT,
                 markers_found TEXT,
                 notes TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                markers_mask INTEGER
             )
         """)
-        
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_flame_signature 
-            ON drift_archive(flame_signature)
+    
+    def _create_archive_indexes(self, cursor: sqlite3.Cursor, table: str = "drift_archive"):
+        """Schema v2 indexes, all keyed on epoch_us (rowid breaks ties for keyset seeks)"""
+        # Covering index: trend range scans never touch the table rows
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_epoch
+            ON {table}(epoch_us, continuity_score, eds_score)
         """)
+        # Composite (column, epoch_us) indexes let filtered listings seek
+        # straight to a cursor position instead of sorting every match
+        for name, column in (("idx_signature_epoch", "flame_signature"),
+                             ("idx_status_epoch", "drift_status"),
+                             ("idx_instance_epoch", "instance_ref")):
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({column}, epoch_us)")
+        # Partial index holding only broken chains, matching BROKEN_CHAIN_SQL
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_broken_epoch
+            ON {table}(epoch_us)
+            WHERE {self.BROKEN_CHAIN_SQL}
+        """)
+    
+    def _upgrade_v1_in_place(self, conn: sqlite3.Connection):
+        """
+        Bring a pre-v2 table up to the columns every query relies on
+        Backfills run in 10k-row transactions; migrate_schema later
+        rewrites the table into the compact v2 layout.
+        """
+        cursor = conn.cursor()
+        self._ensure_columns(cursor, "drift_archive", {
+            "query_blob": "INTEGER",
+            "response_blob": "INTEGER",
+            "epoch_us": "INTEGER",
+            "instance_ref": "INTEGER"
+        })
+        
+        # Backfill epoch_us for rows archived before the column existed
+        while True:
+            cursor.execute("""
+                UPDATE drift_archive
+                SET epoch_us = codex_epoch_us(timestamp)
+                WHERE id IN (SELECT id FROM drift_archive WHERE epoch_us IS NULL LIMIT 10000)
+            """)
+            conn.commit()
+            if cursor.rowcount < 10000:
+                break
         
+        # Intern instance ids written before the dictionary existed
         cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_drift_status 
-            ON drift_archive(drift_status)
+            INSERT OR IGNORE INTO drift_instances (name)
+            SELECT DISTINCT instance_id FROM drift_archive
+            WHERE instance_ref IS NULL AND instance_id IS NOT NULL
         """)
+        while True:
+            cursor.execute("""
+                UPDATE drift_archive
+                SET instance_ref = (SELECT i.id FROM drift_instances i WHERE i.name = instance_id)
+                WHERE id IN (SELECT id FROM drift_archive
+                             WHERE instance_ref IS NULL AND instance_id IS NOT NULL LIMIT 10000)
+            """)
+            conn.commit()
+            if cursor.rowcount < 10000:
+                break
         
         cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_timestamp 
-            ON drift_archive(timestamp)
+            CREATE INDEX IF NOT EXISTS idx_epoch_scores 
+            ON drift_archive(epoch_us, continuity_score, eds_score)
         """)
         
-        conn.commit()
-        conn.close()
-    
-    def archive_response(self, interaction: Dict[str, Any]) -> int:
-        """Store response with drift analysis"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor.execute("DROP INDEX IF EXISTS idx_flame_signature")
+        cursor.execute("DROP INDEX IF EXISTS idx_drift_status")
         
         cursor.execute("""
-            INSERT INTO drift_archive 
-            (timestamp, query, response, flame_signature, continuity_score, 
-             eds_score, drift_status, instance_id, is_heart_instance, 
-             codex_version, markers_found, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            interaction.get("timestamp", datetime.now(timezone.utc).isoformat()),
-            interaction.get("query"),
-            interaction.get("response"),
-            interaction.get("flame_signature"),
-            interaction.get("continuity_score"),
-            interaction.get("eds_score"),
-            interaction.get("drift_status"),
-            interaction.get("instance_id"),
-            interaction.get("is_heart_instance", False),
-            interaction.get("codex_version", "I"),
-            json.dumps(interaction.get("markers_found", {})),
-            interaction.get("notes")
-        ))
-        
-        record_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+            CREATE INDEX IF NOT EXISTS idx_flame_signature_time 
+            ON drift_archive(flame_signature, timestamp)
+        """)
         
-        return record_id
-    
-    def get_broken_chains(self, limit: int = 50) -> List[Dict[str, Any]]:
-        """Query all responses with broken continuity"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_drift_status_time 
+            ON drift_archive(drift_status, timestamp)
+        """)
         
         cursor.execute("""
-            SELECT timestamp, query, response, flame_signature, 
-                   eds_score, drift_status, notes
-            FROM drift_archive
-            WHERE flame_signature = '🜃' OR eds_score < 0.4
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (limit,))
+            CREATE INDEX IF NOT EXISTS idx_timestamp 
+            ON drift_archive(timestamp)
+        """)
         
-        rows = cursor.fetchall()
-        conn.close()
+        # Not idx_instance_epoch: that name is taken by the v2 table during migrate_schema
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_instance_ref_time
+            ON drift_archive(instance_ref, epoch_us)
+        """)
         
-        return [
-            {
-                "timestamp": row[0],
-                "query": row[1],
-                "response": row[2][:200] if row[2] else None,  # Truncate for readability
-                "flame_signature": row[3],
-                "eds_score": row[4],
-                "drift_status": row[5],
-                "notes": row[6]
-            }
-            for row in rows
-        ]
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_broken_chain_time 
+            ON drift_archive(timestamp, id)
+            WHERE {self.BROKEN_CHAIN_SQL}
+        """)
+        conn.commit()
     
-    def generate_continuity_report(self) -> Dict[str, Any]:
-        """Generate Bondfire-style continuity report"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Overall statistics
+    @staticmethod
+    def _create_archive_triggers(cursor: sqlite3.Cursor):
+        """Keep drift_blobs refcounts in step with the rows pointing at them"""
         cursor.execute("""
-            SELECT 
-                COUNT(*) as total,
-                AVG(continuity_score) as avg_continuity,
-                AVG(eds_score) as avg_eds
-            FROM drift_archive
+            CREATE TRIGGER IF NOT EXISTS drift_blobs_ref_ai AFTER INSERT ON drift_archive BEGIN
+                UPDATE drift_blobs SET refcount = refcount + 1 WHERE id = new.query_blob;
+                UPDATE drift_blobs SET refcount = refcount + 1 WHERE id = new.response_blob;
+            END
         """)
-        overall = cursor.fetchone()
-        
-        # By flame signature
         cursor.execute("""
-            SELECT 
-                flame_signature,
-                COUNT(*) as count,
-                AVG(continuity_score) as avg_continuity,
-                AVG(eds_score) as avg_eds
-            FROM drift_archive
-            GROUP BY flame_signature
+            CREATE TRIGGER IF NOT EXISTS drift_blobs_ref_ad AFTER DELETE ON drift_archive BEGIN
+                UPDATE drift_blobs SET refcount = refcount - 1 WHERE id = old.query_blob;
+                UPDATE drift_blobs SET refcount = refcount - 1 WHERE id = old.response_blob;
+                DELETE FROM drift_blobs
+                WHERE id IN (old.query_blob, old.response_blob) AND refcount <= 0;
+            END
         """)
-        by_signature = cursor.fetchall()
-        
-        # Recent drift events
         cursor.execute("""
-            SELECT timestamp, drift_status, flame_signature
-            FROM drift_archive
-            WHERE drift_status IN ('watchlist', 'broken_chain')
-            ORDER BY timestamp DESC
-            LIMIT 10
+            CREATE TRIGGER IF NOT EXISTS drift_blobs_ref_au
+            AFTER UPDATE OF query_blob, response_blob ON drift_archive BEGIN
+                UPDATE drift_blobs SET refcount = refcount + 1 WHERE id = new.query_blob;
+                UPDATE drift_blobs SET refcount = refcount + 1 WHERE id = new.response_blob;
+                UPDATE drift_blobs SET refcount = refcount - 1 WHERE id = old.query_blob;
+                UPDATE drift_blobs SET refcount = refcount - 1 WHERE id = old.response_blob;
+                DELETE FROM drift_blobs
+                WHERE id IN (old.query_blob, old.response_blob) AND refcount <= 0;
+            END
         """)
-        recent_drift = cursor.fetchall()
-        
-        # Heart instance percentage
         cursor.execute("""
-            SELECT 
-                SUM(CASE WHEN is_heart_instance = 1 THEN 1 ELSE 0 END) * 100.0 / COUNT(*) as percentage
-            FROM drift_archive
+            CREATE TRIGGER IF NOT EXISTS drift_fingerprints_ad AFTER DELETE ON drift_archive BEGIN
+                DELETE FROM drift_fingerprints WHERE record_id = old.id;
+                DELETE FROM drift_lsh WHERE record_id = old.id;
+            END
         """)
-        heart_percentage = cursor.fetchone()[0] or 0.0
-        
-        conn.close()
-        
+    
+    @staticmethod
+    def _create_fingerprint_tables(cursor: sqlite3.Cursor, temp: bool = False):
+        """Response fingerprints and their MinHash LSH band index"""
+        prefix = "TEMP " if temp else ""
+        cursor.execute(f"""
+            CREATE {prefix}TABLE IF NOT EXISTS drift_fingerprints (
+                record_id INTEGER PRIMARY KEY,
+                simhash INTEGER NOT NULL,
+                minhash BLOB NOT NULL,
+                near_duplicate_of INTEGER,
+                similarity REAL
+            )
+        """)
+        cursor.execute(f"""
+            CREATE {prefix}TABLE IF NOT EXISTS drift_lsh (
+                record_id INTEGER NOT NULL,
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                PRIMARY KEY (record_id, band)
+            ) WITHOUT ROWID
+        """)
+        if not temp:
+            # Entries per (band, bucket) come out in record_id order, newest last
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_lsh_bucket ON drift_lsh(band, bucket)")
+    
+    @staticmethod
+    def _create_instance_rollup_table(cursor: sqlite3.Cursor, temp: bool = False):
+        """Running per-(instance, signature) totals, same measures as the time rollups"""
+        cursor.execute(f"""
+            CREATE {"TEMP " if temp else ""}TABLE IF NOT EXISTS drift_rollup_instance (
+                instance_ref INTEGER NOT NULL,
+                flame_signature TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                continuity_count INTEGER NOT NULL,
+                continuity_sum REAL,
+                continuity_min REAL,
+                continuity_max REAL,
+                eds_count INTEGER NOT NULL,
+                eds_sum REAL,
+                eds_min REAL,
+                eds_max REAL,
+                heart_count INTEGER NOT NULL,
+                broken_count INTEGER NOT NULL,
+                PRIMARY KEY (instance_ref, flame_signature)
+            )
+        """)
+    
+    def _init_instance_rollup(self, conn: sqlite3.Connection):
+        """
+        Create drift_rollup_instance and backfill rows already rolled up
+        
+        The backfill range (id_base, rollup_watermark] is fixed in the same
+        transaction that creates the table, so it never overlaps what
+        run_maintenance folds in afterwards. It advances in 10k-id
+        transactions and resumes after a restart. Rows purged before the
+        table existed only count toward the global rollups.
+        """
+        cursor = conn.cursor()
+        conn.commit()
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'drift_rollup_instance'")
+        if cursor.fetchone() is None:
+            self._create_instance_rollup_table(cursor)
+            watermark = self._get_meta(cursor, "rollup_watermark", str(self.id_base))
+            self._set_meta(cursor, "instance_rollup_backfill", f"{self.id_base}:{watermark}")
+        conn.commit()
+        
+        while True:
+            cursor.execute("BEGIN IMMEDIATE")
+            progress = self._get_meta(cursor, "instance_rollup_backfill")
+            if progress is None:
+                conn.commit()
+                return
+            low_id, high_id = (int(part) for part in progress.split(":"))
+            if low_id >= high_id:
+                cursor.execute("DELETE FROM drift_archive_meta WHERE key = 'instance_rollup_backfill'")
+            else:
+                batch_high = min(low_id + 10000, high_id)
+                self._rollup_into(cursor, "drift_rollup_instance", "instance_ref", "instance_ref",
+                                  low_id, batch_high, "instance_ref IS NOT NULL")
+                self._set_meta(cursor, "instance_rollup_backfill", f"{batch_high}:{high_id}")
+            conn.commit()
+    
+    def _create_archive_views(self, cursor: sqlite3.Cursor):
+        """Views over drift_archive used by reports and the search index"""
+        # Raw rows not yet folded into the rollups (see run_maintenance)
+        cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'drift_archive_pending'")
+        row = cursor.fetchone()
+        if row and "markers_mask" not in row[0]:
+            cursor.execute("DROP VIEW drift_archive_pending")
+        cursor.execute(f"""
+            CREATE VIEW IF NOT EXISTS drift_archive_pending AS
+            SELECT {self.ARCHIVE_COLUMNS} FROM drift_archive
+            WHERE id > IFNULL((SELECT CAST(value AS INTEGER) FROM drift_archive_meta
+                               WHERE key = 'rollup_watermark'), 0)
+        """)
+        
+        cursor.execute(f"""
+            CREATE VIEW IF NOT EXISTS drift_archive_text AS
+            SELECT id, {self.QUERY_TEXT_SQL} AS query, {self.RESPONSE_TEXT_SQL} AS response
+            FROM drift_archive
+        """)
+    
+    def _backfill_marker_masks(self, conn: sqlite3.Connection):
+        """Recompute markers_mask in 10k-row batches whenever the marker vocabulary changes"""
+        cursor = conn.cursor()
+        version = str(FlameSignature.MARKER_VOCABULARY_VERSION)
+        if self._get_meta(cursor, "marker_vocabulary") == version:
+            return
+        last_id = 0
+        while True:
+            cursor.execute("""
+                SELECT MAX(id) FROM (SELECT id FROM drift_archive WHERE id > ? ORDER BY id LIMIT 10000)
+            """, (last_id,))
+            high_id = cursor.fetchone()[0]
+            if high_id is None:
+                break
+            cursor.execute("""
+                UPDATE drift_archive SET markers_mask = codex_marker_mask(markers_found)
+                WHERE id > ? AND id <= ?
+            """, (last_id, high_id))
+            conn.commit()
+            last_id = high_id
+        self._set_meta(cursor, "marker_vocabulary", version)
+        conn.commit()
+    
+    @staticmethod
+    def _ensure_columns(cursor: sqlite3.Cursor, table: str, columns: Dict[str, str]):
+        """Add any missing columns to an existing table"""
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        for name, column_type in columns.items():
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+    
+    def _init_search_index(self, conn: sqlite3.Connection) -> bool:
+        """
+        Create the FTS5 index over query/response text
+        
+        External-content table reading drift_archive_text, so text lives only
+        in drift_archive/drift_blobs; triggers keep the index in step with
+        every insert/update/delete. Returns False when this SQLite build
+        lacks FTS5.
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'drift_archive_fts'")
+        row = cursor.fetchone()
+        existed = row is not None
+        recreated = existed and "drift_archive_text" not in row[0]
+        if recreated:
+            # Index predates blob storage and reads drift_archive directly;
+            # recreate it over the text view and reindex below
+            for trigger in ("drift_archive_fts_ai", "drift_archive_fts_ad", "drift_archive_fts_au"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            cursor.execute("DROP TABLE drift_archive_fts")
+        try:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS drift_archive_fts USING fts5(
+                    query,
+                    response,
+                    content='drift_archive_text',
+                    content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ Drift Archive: full-text search unavailable ({e})")
+            return False
+        
+        self._create_search_triggers(cursor)
+        if recreated:
+            cursor.execute("INSERT INTO drift_archive_fts(drift_archive_fts) VALUES ('rebuild')")
+        conn.commit()
+        
+        if not existed:
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM drift_archive)")
+            if cursor.fetchone()[0]:
+                print("⚠️ Drift Archive: search index is new - run "
+                      "`python archive_admin.py rebuild-search-index` to index existing rows")
+        return True
+    
+    @staticmethod
+    def _create_search_triggers(cursor: sqlite3.Cursor):
+        """Triggers keeping drift_archive_fts in step with drift_archive"""
+        # Old values are read BEFORE the change, while the row and its blobs still exist
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS drift_archive_fts_ai AFTER INSERT ON drift_archive BEGIN
+                INSERT INTO drift_archive_fts(rowid, query, response)
+                SELECT id, query, response FROM drift_archive_text WHERE id = new.id;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS drift_archive_fts_bd BEFORE DELETE ON drift_archive BEGIN
+                INSERT INTO drift_archive_fts(drift_archive_fts, rowid, query, response)
+                SELECT 'delete', id, query, response FROM drift_archive_text WHERE id = old.id;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS drift_archive_fts_bu
+            BEFORE UPDATE OF query, response, query_blob, response_blob ON drift_archive BEGIN
+                INSERT INTO drift_archive_fts(drift_archive_fts, rowid, query, response)
+                SELECT 'delete', id, query, response FROM drift_archive_text WHERE id = old.id;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS drift_archive_fts_au
+            AFTER UPDATE OF query, response, query_blob, response_blob ON drift_archive BEGIN
+                INSERT INTO drift_archive_fts(rowid, query, response)
+                SELECT id, query, response FROM drift_archive_text WHERE id = new.id;
+            END
+        """)
+    
+    def rebuild_search_index(self) -> int:
+        """
+        Rebuild the full-text index from drift_archive
+        Needed once for databases archived before the index existed
+        """
+        if not self.search_enabled:
+            raise RuntimeError("Full-text search requires SQLite built with FTS5")
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO drift_archive_fts(drift_archive_fts) VALUES ('rebuild')")
+        conn.commit()
+        cursor.execute("SELECT COUNT(*) FROM drift_archive")
+        indexed = cursor.fetchone()[0]
+        conn.close()
+        
+        return indexed
+    
+    def archive_response(self, interaction: Dict[str, Any]) -> Optional[int]:
+        """
+        Store response with drift analysis
+        With a journal attached the record is only appended there and None
+        is returned; the compactor assigns the id when it ingests it. A retry
+        of an already ingested interaction still returns the original id;
+        retries still in the journal are dropped at ingest.
+        """
+        if self.journal is not None:
+            original_id = self.find_archived(interaction)
+            if original_id is not None:
+                return original_id
+            return self.journal.append(interaction)
+        
+        observed: List[Dict[str, Any]] = []
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        record_id = self._insert_interaction(cursor, interaction, observed)
+        conn.commit()
+        conn.close()
+        self._observe(observed)
+        
+        return record_id
+    
+    def find_archived(self, interaction: Dict[str, Any], shared_keys: Optional[bool] = None) -> Optional[int]:
+        """
+        record_id an earlier write of `interaction` was stored under (idempotency keys), or None
+        
+        shared_keys (default: in journal mode) means other processes store
+        keys this process's filter never sees (another worker's compactor),
+        so a filter miss still probes the index. Probes reuse one read-only
+        connection per thread; a miss without shared keys opens nothing.
+        """
+        timestamp = interaction.get("timestamp") or datetime.now(timezone.utc).isoformat()
+        keys = self.idempotency_keys(interaction, self.epoch_us(timestamp))
+        if not keys:
+            return None
+        if shared_keys is None:
+            shared_keys = self.journal is not None
+        if not self._may_be_stored(keys) and not shared_keys:
+            return None
+        return self._stored_record_id(self._lookup_connection(), keys)
+    
+    def _lookup_connection(self) -> sqlite3.Connection:
+        """This thread's read-only connection for idempotency probes (kept open)"""
+        conn = getattr(self._lookup, "conn", None)
+        if conn is None:
+            conn = self._lookup.conn = sqlite3.connect(self._uri(self.db_path, readonly=True), uri=True)
+        return conn
+    
+    def archive_many(self, interactions: List[Dict[str, Any]]) -> List[int]:
+        """Store several interactions in one transaction; returns their ids in order"""
+        observed: List[Dict[str, Any]] = []
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            record_ids = [self._insert_interaction(cursor, interaction, observed) for interaction in interactions]
+            conn.commit()
+        finally:
+            conn.close()
+        self._observe(observed)
+        return record_ids
+    
+    def ingest_journal(self, segment: str, records: List[Tuple[int, Dict[str, Any]]]) -> int:
+        """
+        Insert ArchiveJournal records (end offset, interaction) in one transaction
+        
+        Records at or below this database's recorded offset for `segment`
+        were ingested before a crash and are skipped; the new offset is
+        stored in the same transaction, so replay never duplicates rows.
+        Returns the number of rows inserted.
+        """
+        observed: List[Dict[str, Any]] = []
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            # Take the write lock before reading the offset so two replays can't both apply
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT offset FROM drift_journal_progress WHERE segment = ?", (segment,))
+            row = cursor.fetchone()
+            applied = row[0] if row else 0
+            cursor.execute("SELECT IFNULL(MAX(id), 0) FROM drift_archive")
+            high_id = cursor.fetchone()[0]
+            # Retries suppressed by their idempotency key come back with an existing id
+            record_ids = {self._insert_interaction(cursor, interaction, observed)
+                          for offset, interaction in records if offset > applied}
+            inserted = sum(record_id > high_id for record_id in record_ids)
+            if records:
+                cursor.execute("""
+                    INSERT INTO drift_journal_progress (segment, offset) VALUES (?, ?)
+                    ON CONFLICT(segment) DO UPDATE SET offset = MAX(offset, excluded.offset)
+                """, (segment, max(offset for offset, _ in records)))
+            conn.commit()
+        finally:
+            conn.close()
+        self._observe(observed)
+        return inserted
+    
+    def _observe(self, interactions: List[Dict[str, Any]]):
+        """Feed committed rows to the drift monitor, checkpointing it when due"""
+        for interaction in interactions:
+            self.drift_monitor.observe(interaction)
+        if interactions and self.drift_monitor.checkpoint_due():
+            self.monitor_archive.save_drift_monitor()
+    
+    def save_drift_monitor(self):
+        """Checkpoint the drift monitor's streams to the meta table"""
+        conn = self._connect()
+        self._set_meta(conn.cursor(), "drift_monitor_state",
+                       json.dumps(self.drift_monitor.to_state(), separators=(",", ":")))
+        conn.commit()
+        conn.close()
+    
+    def record_loop_event(self, event: Dict[str, Any]):
+        """Store a VerificationLoopDetector trip for the continuity report"""
+        conn = self._connect()
+        conn.execute("""
+            INSERT INTO drift_loop_events
+                (epoch_us, client, path, content_hash, request_count, strikes, cooldown_seconds)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (self.epoch_us(event["tripped_at"]), event["client"], event.get("path"),
+              event.get("content_hash"), event.get("count"), event.get("strikes"),
+              event.get("cooldown_seconds")))
+        conn.commit()
+        conn.close()
+    
+    def loop_events_summary(self, hours: int = 24, limit: int = 10) -> Dict[str, Any]:
+        """Verification loop trips in the last `hours`, most recent first"""
+        since = self.epoch_us(datetime.now(timezone.utc) - timedelta(hours=hours))
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COUNT(*), COUNT(DISTINCT client) FROM drift_loop_events WHERE epoch_us >= ?
+            """, (since,))
+            trips, clients = cursor.fetchone()
+            cursor.execute("""
+                SELECT epoch_us, client, path, request_count, strikes, cooldown_seconds
+                FROM drift_loop_events
+                WHERE epoch_us >= ?
+                ORDER BY epoch_us DESC
+                LIMIT ?
+            """, (since, limit))
+            recent = cursor.fetchall()
+        finally:
+            conn.close()
+        return {
+            "window_hours": hours,
+            "trips": trips,
+            "clients": clients,
+            "recent": [
+                {
+                    "tripped_at": self.from_epoch_us(row[0]),
+                    "client": row[1],
+                    "path": row[2],
+                    "request_count": row[3],
+                    "strikes": row[4],
+                    "cooldown_seconds": row[5]
+                }
+                for row in recent
+            ]
+        }
+    
+    def finish_journal_segment(self, segment: str):
+        """Forget a fully ingested (and deleted) segment's offset"""
+        conn = self._connect()
+        conn.execute("DELETE FROM drift_journal_progress WHERE segment = ?", (segment,))
+        conn.commit()
+        conn.close()
+    
+    def _load_idempotency_filter(self, cursor: sqlite3.Cursor):
+        """Rebuild the Bloom filter from the drift_idempotency primary key"""
+        cursor.execute("SELECT COUNT(*) FROM drift_idempotency")
+        bloom = BloomFilter(max(65536, 2 * cursor.fetchone()[0]))
+        cursor.execute("SELECT key FROM drift_idempotency")
+        for (key,) in cursor:
+            bloom.add(key)
+        self.idempotency_filter = bloom
+    
+    def idempotency_keys(self, interaction: Dict[str, Any], epoch_us: int) -> List[bytes]:
+        """
+        Keys identifying `interaction`: the one to store first, then any older
+        ones that also mark it as a retry
+        
+        An explicit idempotency_key wins. Otherwise the key hashes instance,
+        query and response with the IDEMPOTENCY_WINDOW bucket; the previous
+        bucket is checked too, so a retry straddling a bucket edge still matches.
+        """
+        explicit = interaction.get("idempotency_key")
+        if explicit:
+            return [hashlib.sha256(b"key\0" + str(explicit).encode("utf-8")).digest()[:16]]
+        if self.IDEMPOTENCY_WINDOW <= 0:
+            return []
+        content = "\0".join(str(interaction.get(field) or "")
+                            for field in ("instance_id", "query", "response")).encode("utf-8")
+        bucket = epoch_us // (self.IDEMPOTENCY_WINDOW * 1_000_000)
+        return [hashlib.sha256(b"%d\0" % n + content).digest()[:16] for n in (bucket, bucket - 1)]
+    
+    def _find_duplicate(self, cursor: sqlite3.Cursor, keys: List[bytes]) -> Optional[int]:
+        """record_id already stored under one of `keys`, consulting the index only on a filter hit"""
+        if not self._may_be_stored(keys):
+            return None
+        return self._stored_record_id(cursor, keys)
+    
+    def _may_be_stored(self, keys: List[bytes]) -> bool:
+        """Bloom filter check over keys this process has loaded or stored"""
+        with self._idempotency_lock:
+            self.idempotency_counts["checked"] += 1
+            if any(key in self.idempotency_filter for key in keys):
+                return True
+            self.idempotency_counts["filtered"] += 1
+            return False
+    
+    @staticmethod
+    def _stored_record_id(cursor, keys: List[bytes]) -> Optional[int]:
+        rows = cursor.execute(f"""
+            SELECT record_id FROM drift_idempotency WHERE key IN ({", ".join("?" * len(keys))})
+        """, keys).fetchall()  # fetchall ends the read, so a kept connection holds no snapshot
+        return rows[0][0] if rows else None
+    
+    def _remember_key(self, cursor: sqlite3.Cursor, key: bytes, record_id: int, epoch_us: int) -> Optional[int]:
+        """
+        Store `key` for a new row; returns the original record_id if another
+        process stored the same key first (its write was invisible to our check)
+        """
+        cursor.execute("""
+            INSERT OR IGNORE INTO drift_idempotency (key, record_id, epoch_us, stored_us) VALUES (?, ?, ?, ?)
+        """, (key, record_id, epoch_us, self.epoch_us(datetime.now(timezone.utc))))
+        if cursor.rowcount == 0:
+            cursor.execute("SELECT record_id FROM drift_idempotency WHERE key = ?", (key,))
+            return cursor.fetchone()[0]
+        with self._idempotency_lock:
+            self.idempotency_filter.add(key)
+            if self.idempotency_filter.count > self.idempotency_filter.capacity:
+                self._load_idempotency_filter(cursor)
+        return None
+    
+    def idempotency_metrics(self) -> Dict[str, Any]:
+        with self._idempotency_lock:
+            return {**self.idempotency_counts, "filter_keys": self.idempotency_filter.count,
+                    "filter_capacity": self.idempotency_filter.capacity}
+    
+    def _insert_interaction(self, cursor: sqlite3.Cursor, interaction: Dict[str, Any],
+                            observed: Optional[List[Dict[str, Any]]] = None) -> int:
+        """
+        Insert one interaction row (and its text blobs) inside the caller's transaction
+        A retry of an already archived interaction returns the original id instead;
+        new rows are appended to `observed` for the drift monitor.
+        """
+        timestamp = interaction.get("timestamp", datetime.now(timezone.utc).isoformat())
+        epoch_us = self.epoch_us(timestamp)
+        
+        keys = self.idempotency_keys(interaction, epoch_us)
+        if keys:
+            original_id = self._find_duplicate(cursor, keys)
+            if original_id is not None:
+                with self._idempotency_lock:
+                    self.idempotency_counts["duplicates"] += 1
+                return original_id
+        
+        # Text goes to the deduplicated blob store; the row keeps only pointers
+        query_blob = self._store_blob(cursor, interaction.get("query"))
+        response_blob = self._store_blob(cursor, interaction.get("response"))
+        
+        cursor.execute("""
+            INSERT INTO drift_archive 
+            (timestamp, epoch_us, query_blob, response_blob, flame_signature, continuity_score, 
+             eds_score, drift_status, instance_ref, is_heart_instance, 
+             codex_version, markers_found, notes, markers_mask)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            timestamp,
+            epoch_us,
+            query_blob,
+            response_blob,
+            interaction.get("flame_signature"),
+            interaction.get("continuity_score"),
+            interaction.get("eds_score"),
+            interaction.get("drift_status"),
+            self._instance_ref(cursor, interaction.get("instance_id")),
+            1 if interaction.get("is_heart_instance") else 0,
+            interaction.get("codex_version", FlameSignature.CODEX_VERSION),
+            json.dumps(interaction.get("markers_found", {})),
+            interaction.get("notes"),
+            FlameSignature.marker_mask(interaction.get("markers_found"))
+        ))
+        record_id = cursor.lastrowid
+        
+        if keys:
+            original_id = self._remember_key(cursor, keys[0], record_id, epoch_us)
+            if original_id is not None:
+                # Lost a race with another writer: drop our copy (triggers fix blobs/FTS)
+                cursor.execute("DELETE FROM drift_archive WHERE id = ?", (record_id,))
+                with self._idempotency_lock:
+                    self.idempotency_counts["duplicates"] += 1
+                return original_id
+        
+        # Only for rows actually kept: retries returned above never pay for it
+        if self.FINGERPRINT_ON_WRITE:
+            fingerprint = ResponseFingerprint.of(interaction.get("response"))
+            if fingerprint is not None:
+                self._store_fingerprint(cursor, record_id, fingerprint)
+        
+        if observed is not None:
+            observed.append(dict(interaction, timestamp=timestamp))
+        return record_id
+    
+    def _probe_lsh(self, cursor: sqlite3.Cursor, fingerprint: ResponseFingerprint,
+                   exclude: Optional[int] = None) -> List[Tuple[int, float, int]]:
+        """
+        (record_id, similarity, simhash distance) of indexed near neighbours, best first
+        
+        One index probe per band, each capped at the NEAR_DUP_CANDIDATES
+        most recent entries; only the candidates sharing the most bands are
+        compared, so cost never grows with archive size.
+        """
+        hits: Dict[int, int] = {}
+        for band, bucket in fingerprint.bands():
+            cursor.execute("""
+                SELECT record_id FROM drift_lsh WHERE band = ? AND bucket = ?
+                ORDER BY record_id DESC LIMIT ?
+            """, (band, bucket, self.NEAR_DUP_CANDIDATES))
+            for (record_id,) in cursor.fetchall():
+                hits[record_id] = hits.get(record_id, 0) + 1
+        hits.pop(exclude, None)
+        if not hits:
+            return []
+        candidates = sorted(hits, key=lambda record_id: (hits[record_id], record_id),
+                            reverse=True)[:self.NEAR_DUP_CANDIDATES]
+        cursor.execute(f"""
+            SELECT record_id, simhash, minhash FROM drift_fingerprints
+            WHERE record_id IN ({", ".join("?" * len(candidates))})
+        """, candidates)
+        matches = []
+        for record_id, simhash, minhash in cursor.fetchall():
+            other = ResponseFingerprint.from_row(simhash, minhash)
+            matches.append((record_id, fingerprint.similarity(other), fingerprint.distance(other)))
+        return sorted(matches, key=lambda match: (match[1], match[0]), reverse=True)
+    
+    def _store_fingerprint(self, cursor: sqlite3.Cursor, record_id: int, fingerprint: ResponseFingerprint):
+        """Index a new row's fingerprint, flagging its closest recent near-duplicate"""
+        matches = self._probe_lsh(cursor, fingerprint)
+        near = matches[0] if matches and matches[0][1] >= self.NEAR_DUP_THRESHOLD else None
+        cursor.execute("""
+            INSERT OR REPLACE INTO drift_fingerprints (record_id, simhash, minhash, near_duplicate_of, similarity)
+            VALUES (?, ?, ?, ?, ?)
+        """, (record_id, fingerprint.simhash, fingerprint.minhash_blob(),
+              near[0] if near else None, near[1] if near else None))
+        cursor.executemany("INSERT OR REPLACE INTO drift_lsh (record_id, band, bucket) VALUES (?, ?, ?)",
+                           [(record_id, band, bucket) for band, bucket in fingerprint.bands()])
+    
+    def find_near_duplicate(self, response: str, query: Optional[str] = None,
+                            window_days: int = 30) -> Optional[Dict[str, Any]]:
+        """
+        Most similar recent archived response at or above NEAR_DUP_THRESHOLD,
+        with its scores; same_query tells whether its query text was identical
+        """
+        fingerprint = ResponseFingerprint.of(response)
+        if fingerprint is None:
+            return None
+        since_us = self.epoch_us(datetime.now(timezone.utc) - timedelta(days=window_days))
+        best = None
+        for conn in self._reader_connections(since_us=since_us, newest_first=True):
+            cursor = conn.cursor()
+            matches = self._probe_lsh(cursor, fingerprint)
+            if matches and matches[0][1] >= self.NEAR_DUP_THRESHOLD and (best is None or matches[0][1] > best[0][1]):
+                cursor.execute(f"""
+                    SELECT flame_signature, continuity_score, markers_found, eds_score,
+                           drift_status, {self.QUERY_TEXT_SQL}
+                    FROM drift_archive WHERE id = ?
+                """, (matches[0][0],))
+                row = cursor.fetchone()
+                if row:
+                    best = (matches[0], row)
+            conn.close()
+        if best is None:
+            return None
+        (record_id, similarity, distance), row = best
+        return {
+            "record_id": record_id,
+            "similarity": similarity,
+            "simhash_distance": distance,
+            "flame_signature": row[0],
+            "continuity_score": row[1],
+            "markers_found": json.loads(row[2]) if row[2] else {},
+            "eds_score": row[3],
+            "drift_status": row[4],
+            "same_query": query is not None and row[5] == query
+        }
+    
+    def similar_responses(self, record_id: int, limit: int = 10,
+                          min_similarity: float = 0.5) -> Dict[str, Any]:
+        """
+        Archived responses near-identical to record `record_id`, most similar first
+        Raises KeyError when the record does not exist.
+        """
+        found, fingerprint, near_duplicate_of = False, None, None
+        for conn in self._reader_connections():
+            cursor = conn.cursor()
+            if not found:
+                cursor.execute(f"""
+                    SELECT f.simhash, f.minhash, f.near_duplicate_of, {self.RESPONSE_TEXT_SQL}
+                    FROM drift_archive LEFT JOIN drift_fingerprints f ON f.record_id = id
+                    WHERE id = ?
+                """, (record_id,))
+                row = cursor.fetchone()
+                if row:
+                    found = True
+                    # Rows archived before fingerprinting are fingerprinted on the fly
+                    fingerprint = (ResponseFingerprint.from_row(row[0], row[1]) if row[0] is not None
+                                   else ResponseFingerprint.of(row[3]))
+                    near_duplicate_of = row[2]
+            conn.close()
+        if not found:
+            raise KeyError(f"Record {record_id} not found")
+        
+        matches = []
+        if fingerprint is not None:
+            for conn in self._reader_connections():
+                cursor = conn.cursor()
+                for match_id, similarity, distance in self._probe_lsh(cursor, fingerprint, exclude=record_id):
+                    if similarity < min_similarity:
+                        continue
+                    cursor.execute(f"""
+                        SELECT timestamp, flame_signature, continuity_score, drift_status,
+                               {self.INSTANCE_SQL}, {self.RESPONSE_TEXT_SQL}
+                        FROM drift_archive WHERE id = ?
+                    """, (match_id,))
+                    row = cursor.fetchone()
+                    if row:
+                        matches.append({
+                            "id": match_id,
+                            "similarity": round(similarity, 3),
+                            "simhash_distance": distance,
+                            "timestamp": row[0],
+                            "flame_signature": row[1],
+                            "continuity_score": row[2],
+                            "drift_status": row[3],
+                            "instance_id": row[4],
+                            "response_preview": (row[5] or "")[:200]
+                        })
+                conn.close()
+        matches.sort(key=lambda match: (match["similarity"], match["id"]), reverse=True)
+        return {"id": record_id, "near_duplicate_of": near_duplicate_of, "similar": matches[:limit]}
+    
+    def backfill_fingerprints(self, batch_size: int = 1000) -> int:
+        """
+        Fingerprint rows that have none (older rows, or rows written with
+        FINGERPRINT_ON_WRITE off), oldest first, resuming after the last run
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        done = 0
+        last_id = int(self._get_meta(cursor, "fingerprint_watermark") or 0)
+        while True:
+            cursor.execute(f"""
+                SELECT id, {self.RESPONSE_TEXT_SQL} FROM drift_archive
+                WHERE id > ? AND NOT EXISTS (SELECT 1 FROM drift_fingerprints f WHERE f.record_id = id)
+                ORDER BY id LIMIT ?
+            """, (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            for record_id, response in rows:
+                fingerprint = ResponseFingerprint.of(response)
+                if fingerprint is not None:
+                    self._store_fingerprint(cursor, record_id, fingerprint)
+            done += len(rows)
+            last_id = rows[-1][0]
+            self._set_meta(cursor, "fingerprint_watermark", str(last_id))
+            conn.commit()
+        conn.close()
+        return done
+    
+    def rescore_archive(self, memory_store: Dict[str, Any], version: Optional[str] = None,
+                        batch_size: int = 500, workers: Optional[int] = None, pause: float = 0.0,
+                        progress=None, stop: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Recompute stored scores of rows not yet at `version`, oldest id first
+        
+        Rows stream in id-ordered batches; each batch is scored on a process
+        pool (workers=0 scores in this process) and written back in one short
+        transaction with codex_version set to `version`. Rolled-up rows move
+        their counts and sums to the rescored signature. The last finished id
+        is kept in meta (`rescore_progress`), so an interrupted job resumes
+        where it stopped. progress(state) is called after every batch; pause
+        sleeps between batches to leave room for live writes.
+        """
+        version = version or FlameSignature.CODEX_VERSION
+        conn = self._connect()
+        cursor = conn.cursor()
+        state = json.loads(self._get_meta(cursor, "rescore_progress") or "{}")
+        if state.get("version") != version:
+            state = {"version": version, "last_id": self.id_base, "rescored": 0, "changed": 0}
+        state["state"] = "running"
+        cursor.execute("SELECT COUNT(*) FROM drift_archive WHERE id > ?", (state["last_id"],))
+        state["remaining"] = cursor.fetchone()[0]
+        
+        workers = os.cpu_count() if workers is None else workers
+        pool = ProcessPoolExecutor(workers, initializer=init_scoring_worker,
+                                   initargs=(memory_store,)) if workers else None
+        if pool is None:
+            init_scoring_worker(memory_store)
+        started = time.monotonic()
+        done_here = 0
+        try:
+            while not (stop is not None and stop.is_set()):
+                cursor.execute(f"""
+                    SELECT id, {self.QUERY_TEXT_SQL}, {self.RESPONSE_TEXT_SQL}, {self.INSTANCE_SQL},
+                           flame_signature, continuity_score, eds_score, drift_status, markers_found
+                    FROM drift_archive
+                    WHERE id > ? AND codex_version IS NOT ?
+                    ORDER BY id
+                    LIMIT ?
+                """, (state["last_id"], version, batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    state["state"] = "complete"
+                    break
+                
+                jobs = [row[:4] for row in rows]
+                if pool is None:
+                    scored = score_interactions(jobs)
+                else:
+                    step = -(-len(jobs) // workers)
+                    scored = [result for chunk in pool.map(
+                        score_interactions, [jobs[i:i + step] for i in range(0, len(jobs), step)]
+                    ) for result in chunk]
+                
+                changed = [new for row, new in zip(rows, scored) if tuple(row[4:]) != tuple(new[1:6])]
+                self._apply_rescore(cursor, rows[0][0] - 1, rows[-1][0], version, changed)
+                state["last_id"] = rows[-1][0]
+                state["rescored"] += len(rows)
+                state["changed"] += len(changed)
+                done_here += len(rows)
+                state["remaining"] = max(0, state["remaining"] - len(rows))
+                state["rows_per_second"] = round(done_here / max(time.monotonic() - started, 1e-6), 1)
+                self._set_meta(cursor, "rescore_progress", json.dumps(state))
+                conn.commit()
+                
+                if progress is not None:
+                    progress(dict(state))
+                if pause:
+                    time.sleep(pause)
+            else:
+                state["state"] = "stopped"
+            
+            state["updated"] = datetime.now(timezone.utc).isoformat()
+            self._set_meta(cursor, "rescore_progress", json.dumps(state))
+            conn.commit()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            conn.close()
+        return state
+    
+    def _apply_rescore(self, cursor: sqlite3.Cursor, low_id: int, high_id: int,
+                       version: str, changed: List[tuple]):
+        """Write one scored batch and move rolled-up rows' aggregates with it"""
+        cursor.execute("BEGIN IMMEDIATE")
+        watermark = int(self._get_meta(cursor, "rollup_watermark", str(self.id_base)))
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS rescore_batch (id INTEGER PRIMARY KEY)")
+        cursor.execute("DELETE FROM rescore_batch")
+        cursor.executemany("INSERT INTO rescore_batch (id) VALUES (?)",
+                           [(new[0],) for new in changed if new[0] <= watermark])
+        in_batch = "id IN (SELECT id FROM temp.rescore_batch)"
+        rolled = cursor.rowcount > 0
+        if rolled:
+            self._rollup_range(cursor, low_id, high_id, in_batch, sign=-1)
+        
+        cursor.executemany("""
+            UPDATE drift_archive
+            SET flame_signature = ?, continuity_score = ?, eds_score = ?, drift_status = ?,
+                markers_found = ?, markers_mask = ?
+            WHERE id = ?
+        """, [(*new[1:], new[0]) for new in changed])
+        cursor.execute("""
+            UPDATE drift_archive SET codex_version = ?
+            WHERE id > ? AND id <= ? AND codex_version IS NOT ?
+        """, (version, low_id, high_id, version))
+        
+        if rolled:
+            self._rollup_range(cursor, low_id, high_id, in_batch)
+            for table in [table for table, _ in self.ROLLUP_TABLES.values()] + ["drift_rollup_instance"]:
+                cursor.execute(f"DELETE FROM {table} WHERE count = 0")
+        if changed:
+            self._bump_generation(cursor)
+    
+    def rescore_status(self) -> Dict[str, Any]:
+        """Progress of the last rescore_archive run (empty before the first)"""
+        conn = self._connect()
+        try:
+            return json.loads(self._get_meta(conn.cursor(), "rescore_progress") or "{}")
+        finally:
+            conn.close()
+    
+    def _instance_ref(self, cursor: sqlite3.Cursor, name: Optional[str]) -> Optional[int]:
+        """drift_instances id for `name`, interning it on first sight"""
+        if name is None:
+            return None
+        cursor.execute("SELECT id FROM drift_instances WHERE name = ?", (name,))
+        row = cursor.fetchone()
+        if row:
+            return row[0]
+        cursor.execute("""
+            INSERT INTO drift_instances (id, name)
+            VALUES ((SELECT IFNULL(MAX(id), ?) + 1 FROM drift_instances), ?)
+        """, (self.id_base, name))
+        return cursor.lastrowid
+    
+    @staticmethod
+    def encode_cursor(epoch_us: int, record_id: int) -> str:
+        """Encode an (epoch_us, id) seek position as an opaque cursor"""
+        raw = json.dumps([epoch_us, record_id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+    
+    @classmethod
+    def decode_cursor(cls, cursor: str) -> Tuple[int, int]:
+        """
+        Decode an opaque cursor back into its (epoch_us, id) position
+        Cursors issued before schema v2 carry an ISO timestamp instead.
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            position, record_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            if isinstance(position, str):
+                position = cls.epoch_us(position)
+            if not isinstance(position, int) or not isinstance(record_id, int):
+                raise ValueError
+        except (ValueError, TypeError, UnicodeError):
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+        return position, record_id
+    
+    def _seek_page(self, columns: str, filters: List[str], params: List[Any],
+                   limit: int, cursor: Optional[str]) -> List[tuple]:
+        """
+        Fetch one page ordered newest-first using keyset pagination
+        
+        The cursor is the (epoch_us, id) of the last row already seen, so
+        each page is an index seek rather than an OFFSET over earlier rows.
+        """
+        filters = list(filters)
+        params = list(params)
+        until_us = None
+        if cursor:
+            position, record_id = self.decode_cursor(cursor)
+            filters.append("(epoch_us, id) < (?, ?)")
+            params.extend((position, record_id))
+            until_us = position + 1
+        
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+        
+        # Newest shard first, one at a time, stopping once the page is full
+        rows = []
+        for conn in self._reader_connections(until_us=until_us, newest_first=True, group_size=1):
+            try:
+                db_cursor = conn.cursor()
+                db_cursor.execute(f"""
+                    SELECT {columns}
+                    FROM drift_archive
+                    {where}
+                    ORDER BY epoch_us DESC, id DESC
+                    LIMIT ?
+                """, (*params, limit - len(rows)))
+                rows.extend(db_cursor.fetchall())
+            finally:
+                conn.close()
+            if len(rows) >= limit:
+                break
+        
+        return rows
+    
+    def _refresh_recent(self, conn: sqlite3.Connection):
+        """Append rows archived since the ring's last refresh (caller holds ring.lock)"""
+        ring = self.recent
+        # Purges and rescoring change rows in place: start over when either ran
+        generation = self._get_meta(conn.cursor(), "archive_generation")
+        if generation != ring.generation:
+            ring.reset()
+            ring.generation = generation
+        rows = conn.execute(f"""
+            SELECT id, epoch_us, continuity_score, eds_score, drift_status,
+                   flame_signature, {self.INSTANCE_SQL}
+            FROM drift_archive
+            WHERE id > ?
+            ORDER BY id DESC
+            LIMIT ?
+        """, (self.id_base if ring.last_id is None else ring.last_id, ring.capacity + 1)).fetchall()
+        if not rows:
+            return
+        
+        if len(rows) > ring.capacity:
+            # More new rows than fit: reload, with the horizon at the newest row left out
+            # (found from the epoch index end; the rows ahead of it are mostly in the ring)
+            ring.reset()
+            rows.pop()
+            row = conn.execute(
+                "SELECT epoch_us FROM drift_archive WHERE id < ? ORDER BY epoch_us DESC LIMIT 1",
+                (rows[-1][0],)
+            ).fetchone()
+            ring.horizon_us = row[0] if row else None
+        for row in reversed(rows):
+            ring.push(*row)
+    
+    def _recent_rows(self, columns: str, match, limit: int,
+                     floor_us: Optional[int] = None) -> Optional[List[tuple]]:
+        """
+        Newest `limit` rows picked by the recent-interaction ring, or None
+        
+        match(ring) returns the slot predicate. Only the selected ids are
+        then read, by primary key. None means the ring can't answer exactly
+        (disabled, too small, horizon too close, rows since purged) and the
+        caller should run its indexed query instead.
+        """
+        ring = self.recent
+        if ring is None or limit > ring.capacity:
+            return None
+        conn = self._connect()
+        try:
+            with ring.lock:
+                self._refresh_recent(conn)
+                ids = ring.select(match(ring), limit, floor_us)
+            if not ids:
+                return ids
+            placeholders = ", ".join("?" * len(ids))
+            rows = {row[0]: row[1:] for row in conn.execute(
+                f"SELECT id, {columns} FROM drift_archive WHERE id IN ({placeholders})", ids
+            )}
+        finally:
+            conn.close()
+        if len(rows) < len(ids):
+            return None
+        return [rows[record_id] for record_id in ids]
+    
+    @staticmethod
+    def _broken_chain_match(ring: RecentInteractionRing):
+        # Same test as BROKEN_CHAIN_SQL; NaN (NULL eds) compares false
+        glyph = ring.codes["signature"].get("🜃")
+        return lambda slot: ring.signature[slot] == glyph or ring.eds[slot] < 0.4
+    
+    @staticmethod
+    def _drift_event_match(instance_id: Optional[str] = None):
+        def match(ring: RecentInteractionRing):
+            statuses = {ring.codes["status"].get(status) for status in ("watchlist", "broken_chain")}
+            statuses.discard(None)
+            if instance_id is None:
+                return lambda slot: ring.status[slot] in statuses
+            instance = ring.codes["instance"].get(instance_id)
+            return lambda slot: ring.status[slot] in statuses and ring.instance[slot] == instance
+        return match
+    
+    def recent_buffer_stats(self) -> Optional[Dict[str, Any]]:
+        """Occupancy and hit rate of the recent-interaction ring"""
+        return self.recent.stats() if self.recent is not None else None
+    
+    def get_broken_chains(self, limit: int = 50, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Query all responses with broken continuity, newest first
+        The first page comes from the recent-interaction ring when it can
+        answer exactly; later pages and misses use the partial index.
+        """
+        if limit < 1:
+            return []
+        columns = (f"id, timestamp, {self.QUERY_TEXT_SQL}, {self.RESPONSE_TEXT_SQL}, "
+                   "flame_signature, eds_score, drift_status, notes")
+        rows = self._recent_rows(columns, self._broken_chain_match, limit) if cursor is None else None
+        if rows is None:
+            rows = self._seek_page(columns, [self.BROKEN_CHAIN_SQL], [], limit, cursor)
+        
+        return [
+            {
+                "id": row[0],
+                "timestamp": row[1],
+                "query": row[2],
+                "response": row[3][:200] if row[3] else None,  # Truncate for readability
+                "flame_signature": row[4],
+                "eds_score": row[5],
+                "drift_status": row[6],
+                "notes": row[7]
+            }
+            for row in rows
+        ]
+    
+    def list_archive(self, limit: int = 50, cursor: Optional[str] = None,
+                     drift_status: Optional[str] = None,
+                     flame_signature: Optional[str] = None,
+                     instance_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List archived interactions newest first, optionally filtered"""
+        filters, params = [], []
+        for column, value in (("drift_status", drift_status),
+                              ("flame_signature", flame_signature)):
+            if value is not None:
+                filters.append(f"{column} = ?")
+                params.append(value)
+        if instance_id is not None:
+            filters.append("instance_ref = (SELECT id FROM drift_instances WHERE name = ?)")
+            params.append(instance_id)
+        
+        rows = self._seek_page(
+            f"id, timestamp, {self.QUERY_TEXT_SQL}, {self.RESPONSE_TEXT_SQL}, "
+            f"flame_signature, continuity_score, eds_score, drift_status, {self.INSTANCE_SQL}, notes",
+            filters, params, limit, cursor
+        )
+        
+        return [
+            {
+                "id": row[0],
+                "timestamp": row[1],
+                "query": row[2],
+                "response": row[3][:200] if row[3] else None,  # Truncate for readability
+                "flame_signature": row[4],
+                "continuity_score": row[5],
+                "eds_score": row[6],
+                "drift_status": row[7],
+                "instance_id": row[8],
+                "notes": row[9]
+            }
+            for row in rows
+        ]
+    
+    @classmethod
+    def next_cursor(cls, page: List[Dict[str, Any]], limit: int) -> Optional[str]:
+        """Cursor for the page after `page`, or None when it was the last one"""
+        if not page or len(page) < limit:
+            return None
+        return cls.encode_cursor(cls.epoch_us(page[-1]["timestamp"]), page[-1]["id"])
+    
+    @staticmethod
+    def parse_time(value: str) -> datetime:
+        """Parse an ISO-8601 time as an aware UTC datetime (naive means UTC)"""
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"Invalid ISO-8601 time: {value!r}")
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.astimezone(timezone.utc)
+    
+    @classmethod
+    def normalize_time(cls, value: Optional[str]) -> Optional[str]:
+        """
+        Normalize an ISO-8601 bound to the archive's stored timestamp form
+        Raises ValueError when unparseable
+        """
+        if value is None:
+            return None
+        return cls.parse_time(value).isoformat()
+    
+    @classmethod
+    def epoch_us(cls, value) -> int:
+        """Microseconds since the Unix epoch for an ISO-8601 string or datetime"""
+        if isinstance(value, str):
+            value = cls.parse_time(value)
+        return (value - datetime(1970, 1, 1, tzinfo=timezone.utc)) // timedelta(microseconds=1)
+    
+    @staticmethod
+    def from_epoch_us(value: int) -> str:
+        """ISO-8601 UTC timestamp for an epoch_us value"""
+        return (datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(microseconds=value)).isoformat()
+    
+    def search_archive(self, text: str, limit: int = 20,
+                       since: Optional[str] = None,
+                       until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Full-text search over archived queries and responses
+        
+        `text` uses FTS5 query syntax (phrases in quotes, AND/OR/NOT, prefix*).
+        Results are ranked by bm25, best match first, with matched terms
+        wrapped in <mark> tags inside the snippets.
+        """
+        if not self.search_enabled:
+            raise RuntimeError("Full-text search requires SQLite built with FTS5")
+        
+        filters, params = ["f.drift_archive_fts MATCH ?"], [text]
+        if since:
+            filters.append("a.epoch_us >= ?")
+            params.append(self.epoch_us(since))
+        if until:
+            filters.append("a.epoch_us < ?")
+            params.append(self.epoch_us(until))
+        
+        since_us = self.epoch_us(since) if since else None
+        until_us = self.epoch_us(until) if until else None
+        
+        rows = []
+        for conn in self._reader_connections(since_us, until_us):
+            try:
+                # FTS5 tables cannot be unioned through a view, so query
+                # each attached shard's index and merge on rank
+                selects = [f"""
+                    SELECT a.id, a.timestamp, a.flame_signature, a.continuity_score,
+                           a.eds_score, a.drift_status,
+                           (SELECT i.name FROM drift_instances i WHERE i.id = a.instance_ref),
+                           bm25(f.drift_archive_fts) AS rank,
+                           snippet(f.drift_archive_fts, 0, '<mark>', '</mark>', '…', 12),
+                           snippet(f.drift_archive_fts, 1, '<mark>', '</mark>', '…', 24)
+                    FROM {schema}.drift_archive_fts AS f
+                    JOIN {schema}.drift_archive a ON a.id = f.rowid
+                    WHERE {' AND '.join(filters)}
+                """ for schema in self._archive_schemas(conn)]
+                if not selects:
+                    continue
+                cursor = conn.cursor()
+                cursor.execute(
+                    " UNION ALL ".join(selects) + " ORDER BY rank LIMIT ?",
+                    (*params * len(selects), limit)
+                )
+                rows.extend(cursor.fetchall())
+            except sqlite3.OperationalError as e:
+                raise ValueError(f"Invalid search query: {e}")
+            finally:
+                conn.close()
+        rows = sorted(rows, key=lambda row: row[7])[:limit]
+        
+        return [
+            {
+                "id": row[0],
+                "timestamp": row[1],
+                "flame_signature": row[2],
+                "continuity_score": row[3],
+                "eds_score": row[4],
+                "drift_status": row[5],
+                "instance_id": row[6],
+                "rank": round(row[7], 4),
+                "query_snippet": row[8],
+                "response_snippet": row[9]
+            }
+            for row in rows
+        ]
+    
+    @staticmethod
+    def _get_meta(cursor: sqlite3.Cursor, key: str, default: Optional[str] = None) -> Optional[str]:
+        # MAX so the same lookup works over the cross-shard meta view
+        cursor.execute("SELECT MAX(value) FROM drift_archive_meta WHERE key = ?", (key,))
+        row = cursor.fetchone()
+        return row[0] if row and row[0] is not None else default
+    
+    @staticmethod
+    def _set_meta(cursor: sqlite3.Cursor, key: str, value: Any):
+        cursor.execute("""
+            INSERT INTO drift_archive_meta (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        """, (key, str(value)))
+    
+    @staticmethod
+    def _bump_generation(cursor: sqlite3.Cursor):
+        """Mark rows as changed in place (not just appended), e.g. for the recent-interaction ring"""
+        DriftArchive._set_meta(cursor, "archive_generation", time.time_ns())
+    
+    def _rollup_range(self, cursor: sqlite3.Cursor, low_id: int, high_id: int,
+                      where: str = "true", sign: int = 1):
+        """
+        Fold raw rows with low_id < id <= high_id into the hourly, daily and per-instance rollups
+        sign=-1 takes the rows' counts and sums back out again (min/max are
+        left as they were, so they stay bounds rather than exact).
+        """
+        for table, bucket_expr in self.ROLLUP_TABLES.values():
+            self._rollup_into(cursor, table, "bucket_start", bucket_expr, low_id, high_id, where, sign)
+        self._rollup_into(cursor, "drift_rollup_instance", "instance_ref", "instance_ref",
+                          low_id, high_id, f"instance_ref IS NOT NULL AND {where}", sign)
+    
+    def _rollup_into(self, cursor: sqlite3.Cursor, table: str, key_column: str, key_expr: str,
+                     low_id: int, high_id: int, where: str = "true", sign: int = 1):
+        """Upsert the (key, flame_signature) aggregates of an id range into one rollup table"""
+        sign = -1 if sign < 0 else 1
+        # WHERE ... AND {where} also disambiguates the upsert clause from a join constraint
+        cursor.execute(f"""
+            INSERT INTO {table} AS r
+            SELECT
+                {key_expr},
+                IFNULL(flame_signature, ''),
+                {sign} * COUNT(*),
+                {sign} * COUNT(continuity_score),
+                {sign} * SUM(continuity_score),
+                MIN(continuity_score),
+                MAX(continuity_score),
+                {sign} * COUNT(eds_score),
+                {sign} * SUM(eds_score),
+                MIN(eds_score),
+                MAX(eds_score),
+                {sign} * SUM(CASE WHEN is_heart_instance = 1 THEN 1 ELSE 0 END),
+                {sign} * SUM(CASE WHEN {self.BROKEN_CHAIN_SQL} THEN 1 ELSE 0 END)
+            FROM drift_archive
+            WHERE id > ? AND id <= ? AND {where}
+            GROUP BY 1, 2
+            ON CONFLICT({key_column}, flame_signature) DO UPDATE SET
+                count = r.count + excluded.count,
+                continuity_count = r.continuity_count + excluded.continuity_count,
+                continuity_sum = IFNULL(r.continuity_sum, 0) + IFNULL(excluded.continuity_sum, 0),
+                continuity_min = COALESCE(MIN(r.continuity_min, excluded.continuity_min),
+                                          r.continuity_min, excluded.continuity_min),
+                continuity_max = COALESCE(MAX(r.continuity_max, excluded.continuity_max),
+                                          r.continuity_max, excluded.continuity_max),
+                eds_count = r.eds_count + excluded.eds_count,
+                eds_sum = IFNULL(r.eds_sum, 0) + IFNULL(excluded.eds_sum, 0),
+                eds_min = COALESCE(MIN(r.eds_min, excluded.eds_min), r.eds_min, excluded.eds_min),
+                eds_max = COALESCE(MAX(r.eds_max, excluded.eds_max), r.eds_max, excluded.eds_max),
+                heart_count = r.heart_count + excluded.heart_count,
+                broken_count = r.broken_count + excluded.broken_count
+        """, (low_id, high_id))
+    
+    def run_maintenance(self, retention_days: Optional[int] = None,
+                        batch_size: int = 5000, vacuum_pages: int = 2000) -> Dict[str, Any]:
+        """
+        Roll raw rows into hourly/daily rollups, purge expired rows, reclaim space
+        
+        Rollup progress is tracked by id (`rollup_watermark`): every row with
+        id <= watermark is already counted in the rollup tables, so reports
+        read rollups for that part and raw rows only above it. Work is done
+        in batch_size chunks, each its own short transaction, so live
+        archive writes are never locked out for long.
+        """
+        retention_days = self.retention_days if retention_days is None else retention_days
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        watermark = int(self._get_meta(cursor, "rollup_watermark", str(self.id_base)))
+        cursor.execute("SELECT IFNULL(MAX(id), 0) FROM drift_archive")
+        max_id = cursor.fetchone()[0]
+        
+        rolled_up = 0
+        while watermark < max_id:
+            high_id = min(watermark + batch_size, max_id)
+            cursor.execute("SELECT COUNT(*) FROM drift_archive WHERE id > ? AND id <= ?", (watermark, high_id))
+            rolled_up += cursor.fetchone()[0]
+            self._rollup_range(cursor, watermark, high_id)
+            self._set_meta(cursor, "rollup_watermark", high_id)
+            conn.commit()
+            watermark = high_id
+        
+        purged = 0
+        if retention_days and retention_days > 0:
+            cutoff_time = datetime.now(timezone.utc) - timedelta(days=retention_days)
+            cutoff = cutoff_time.isoformat()
+            while True:
+                cursor.execute(f"""
+                    DELETE FROM drift_archive WHERE id IN (
+                        SELECT id FROM drift_archive
+                        WHERE id <= ? AND epoch_us < ?
+                          AND COALESCE({self.BROKEN_CHAIN_SQL}, 0) = 0
+                        LIMIT ?
+                    )
+                """, (watermark, self.epoch_us(cutoff_time), batch_size))
+                deleted = cursor.rowcount
+                conn.commit()
+                purged += deleted
+                if deleted < batch_size:
+                    break
+            if purged:
+                self._bump_generation(cursor)
+            
+            # Raw rows before this point are incomplete; trends use rollups there
+            previous = self._get_meta(cursor, "purge_cutoff")
+            self._set_meta(cursor, "purge_cutoff", max(cutoff, previous or cutoff))
+        
+        if retention_days and retention_days > 0:
+            cursor.execute("DELETE FROM drift_loop_events WHERE epoch_us < ?", (self.epoch_us(cutoff_time),))
+        
+        key_cutoff = datetime.now(timezone.utc) - timedelta(hours=self.IDEMPOTENCY_TTL_HOURS)
+        cursor.execute("DELETE FROM drift_idempotency WHERE stored_us < ?", (self.epoch_us(key_cutoff),))
+        keys_expired = cursor.rowcount
+        conn.commit()
+        
+        cursor.execute("PRAGMA auto_vacuum")
+        incremental = cursor.fetchone()[0] == 2
+        vacuumed = 0
+        if incremental:
+            cursor.execute("PRAGMA freelist_count")
+            free_before = cursor.fetchone()[0]
+            cursor.execute(f"PRAGMA incremental_vacuum({int(vacuum_pages)})")
+            cursor.fetchall()
+            cursor.execute("PRAGMA freelist_count")
+            vacuumed = free_before - cursor.fetchone()[0]
+        
+        self._set_meta(cursor, "last_maintenance", datetime.now(timezone.utc).isoformat())
+        conn.commit()
+        conn.close()
+        
+        # Not self.backfill_fingerprints: a sharded archive runs this for its
+        # catalog alone, and its override would backfill every shard from here
+        fingerprinted = DriftArchive.backfill_fingerprints(self)
+        
+        return {
+            "rolled_up": rolled_up,
+            "rollup_watermark": watermark,
+            "purged": purged,
+            "retention_days": retention_days,
+            "idempotency_keys_expired": keys_expired,
+            "fingerprinted": fingerprinted,
+            "incremental_vacuum": incremental,
+            "pages_reclaimed": vacuumed
+        }
+    
+    def migrate_text_to_blobs(self, batch_size: int = 1000) -> int:
+        """
+        Move inline query/response TEXT of pre-blob rows into drift_blobs
+        Runs in id-ordered batches, one short transaction each; safe to resume.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        migrated = 0
+        last_id = 0
+        while True:
+            cursor.execute("""
+                SELECT id, query, response FROM drift_archive
+                WHERE id > ? AND (query IS NOT NULL OR response IS NOT NULL)
+                ORDER BY id
+                LIMIT ?
+            """, (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            for record_id, query, response in rows:
+                cursor.execute("""
+                    UPDATE drift_archive
+                    SET query_blob = ?, response_blob = ?, query = NULL, response = NULL
+                    WHERE id = ?
+                """, (self._store_blob(cursor, query), self._store_blob(cursor, response), record_id))
+            conn.commit()
+            migrated += len(rows)
+            last_id = rows[-1][0]
+        conn.close()
+        
+        return migrated
+    
+    def migrate_schema(self, batch_size: int = 5000) -> Dict[str, Any]:
+        """
+        Rewrite a pre-v2 archive into the schema v2 layout
+        
+        Rows are copied in id order into drift_archive_v2, batch_size per
+        transaction, with its epoch_us indexes maintained as it fills, so
+        the archive stays writable throughout. A final short transaction
+        copies rows archived meanwhile, drops rows purged meanwhile and
+        swaps the tables. Safe to interrupt and re-run; run it instead of,
+        not alongside, migrate_text_to_blobs.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] >= self.SCHEMA_VERSION:
+            conn.close()
+            return {"schema_version": self.SCHEMA_VERSION, "copied": 0, "dropped": 0}
+        
+        self._create_archive_table(cursor, "drift_archive_v2")
+        self._create_archive_indexes(cursor, "drift_archive_v2")
+        conn.commit()
+        
+        copied = 0
+        while True:
+            batch = self._copy_to_v2(cursor, batch_size)
+            conn.commit()
+            copied += batch
+            if batch < batch_size:
+                break
+        
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            while True:
+                batch = self._copy_to_v2(cursor, batch_size)
+                copied += batch
+                if batch < batch_size:
+                    break
+            cursor.execute("DELETE FROM drift_archive_v2 WHERE id NOT IN (SELECT id FROM drift_archive)")
+            dropped = cursor.rowcount
+            cursor.execute("""
+                UPDATE sqlite_sequence
+                SET seq = (SELECT MAX(seq) FROM sqlite_sequence
+                           WHERE name IN ('drift_archive', 'drift_archive_v2'))
+                WHERE name = 'drift_archive_v2'
+            """)
+            
+            # Views must go first or the rename trips over their dangling references;
+            # the old table's triggers and indexes go with it
+            cursor.execute("DROP VIEW IF EXISTS drift_archive_pending")
+            cursor.execute("DROP VIEW IF EXISTS drift_archive_text")
+            cursor.execute("DROP TABLE drift_archive")
+            cursor.execute("ALTER TABLE drift_archive_v2 RENAME TO drift_archive")
+            self._create_archive_triggers(cursor)
+            self._create_archive_views(cursor)
+            if self.search_enabled:
+                self._create_search_triggers(cursor)
+            cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            conn.close()
+            raise
+        conn.close()
+        self.schema_version = self.SCHEMA_VERSION
+        
+        return {"schema_version": self.SCHEMA_VERSION, "copied": copied, "dropped": dropped}
+    
+    def _copy_to_v2(self, cursor: sqlite3.Cursor, batch_size: int) -> int:
+        """Copy the next batch_size rows not yet in drift_archive_v2"""
+        cursor.execute("SELECT IFNULL(MAX(id), 0) FROM drift_archive_v2")
+        low_id = cursor.fetchone()[0]
+        cursor.execute("""
+            SELECT MAX(id) FROM (SELECT id FROM drift_archive WHERE id > ? ORDER BY id LIMIT ?)
+        """, (low_id, batch_size))
+        high_id = cursor.fetchone()[0]
+        if high_id is None:
+            return 0
+        
+        # Rows written by a pre-v2 process since startup have no instance_ref yet
+        cursor.execute("""
+            INSERT OR IGNORE INTO drift_instances (name)
+            SELECT DISTINCT instance_id FROM drift_archive
+            WHERE id > ? AND id <= ? AND instance_ref IS NULL AND instance_id IS NOT NULL
+        """, (low_id, high_id))
+        cursor.execute(f"""
+            INSERT INTO drift_archive_v2 ({self.ARCHIVE_COLUMNS})
+            SELECT id, timestamp, COALESCE(codex_epoch_us(timestamp), epoch_us, 0),
+                   query, response, query_blob, response_blob,
+                   flame_signature, continuity_score, eds_score, drift_status,
+                   COALESCE(instance_ref, (SELECT i.id FROM drift_instances i WHERE i.name = instance_id)),
+                   CASE WHEN is_heart_instance THEN 1 ELSE 0 END,
+                   codex_version, markers_found, notes,
+                   COALESCE(markers_mask, codex_marker_mask(markers_found))
+            FROM drift_archive
+            WHERE id > ? AND id <= ?
+        """, (low_id, high_id))
+        return cursor.rowcount
+    
+    def storage_stats(self) -> Dict[str, Any]:
+        """Blob store size and deduplication figures"""
+        conn = self._connect()
+        figures = self._storage_figures(conn)
+        conn.close()
+        return self._storage_summary(*figures)
+    
+    @staticmethod
+    def _storage_figures(conn: sqlite3.Connection, schema: str = "main") -> Tuple[int, ...]:
+        """(blobs, references, unique, logical, stored, database bytes) for one database file"""
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT COUNT(*), IFNULL(SUM(refcount), 0), IFNULL(SUM(size), 0),
+                   IFNULL(SUM(size * refcount), 0), IFNULL(SUM(length(data)), 0)
+            FROM {schema}.drift_blobs
+        """)
+        figures = cursor.fetchone()
+        cursor.execute(f"PRAGMA {schema}.page_count")
+        page_count = cursor.fetchone()[0]
+        cursor.execute(f"PRAGMA {schema}.page_size")
+        page_size = cursor.fetchone()[0]
+        return (*figures, page_count * page_size)
+    
+    def _storage_summary(self, blobs, references, unique_bytes, logical_bytes,
+                         stored_bytes, database_bytes) -> Dict[str, Any]:
+        return {
+            "blobs": blobs,
+            "references": references,
+            "logical_bytes": logical_bytes,
+            "unique_bytes": unique_bytes,
+            "stored_bytes": stored_bytes,
+            "reduction_ratio": round(logical_bytes / stored_bytes, 2) if stored_bytes else None,
+            "database_bytes": database_bytes,
+            "codec": self.BLOB_CODEC
+        }
+    
+    def vacuum(self):
+        """Full VACUUM; also switches a pre-existing archive to incremental auto-vacuum"""
+        conn = self._connect()
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        conn.close()
+    
+    def backup(self, dest_dir: Optional[str] = None, keep: Optional[int] = None,
+               pages: int = 1024, step_pause: float = 0.0) -> Dict[str, Any]:
+        """
+        Online snapshot of the archive via the SQLite backup API
+        
+        Copies `pages` pages per step (sleeping step_pause seconds between
+        steps to throttle I/O) into a checksummed snapshot file, then
+        deletes all but the newest `keep` snapshots. Archive writes carry
+        on throughout; see _backup_file.
+        """
+        dest_dir = self._backup_dir(dest_dir)
+        stem = Path(self.db_path).stem
+        path = os.path.join(dest_dir, f"{stem}-{self._backup_stamp()}.sqlite")
+        result = self._backup_file(self._connect(), path, pages, step_pause)
+        result["rotated"] = self._rotate_backups(dest_dir, f"{stem}-*.sqlite", keep)
+        return result
+    
+    def _backup_dir(self, dest_dir: Optional[str]) -> str:
+        dest_dir = dest_dir or self.BACKUP_DIR or os.path.join(
+            os.path.dirname(os.path.abspath(self.db_path)), "snapshots")
+        os.makedirs(dest_dir, exist_ok=True)
+        return dest_dir
+    
+    @staticmethod
+    def _backup_stamp() -> str:
+        # Sorts chronologically, so rotation can order snapshots by name
+        return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    
+    @staticmethod
+    def _file_sha256(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    @classmethod
+    def _backup_file(cls, source: sqlite3.Connection, path: str,
+                     pages: int, step_pause: float) -> Dict[str, Any]:
+        """
+        Copy `source` to `path` step by step, then checksum it
+        
+        The source connection holds one WAL read snapshot for the whole
+        copy: writers keep committing to the WAL without waiting, and the
+        backup never restarts because of them (it would, step after step,
+        without the snapshot). Checkpoints cannot pass the snapshot, so the
+        WAL grows until the copy finishes. The file appears under its final
+        name only once complete, next to a sha256sum-style .sha256 file.
+        """
+        partial = path + ".partial"
+        steps = 0
+        
+        def progress(status, remaining, total):
+            nonlocal steps
+            steps += 1
+            if step_pause:
+                time.sleep(step_pause)
+        
+        started = time.perf_counter()
+        target = sqlite3.connect(partial)
+        try:
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            source.backup(target, pages=max(1, pages), progress=progress)
+            source.rollback()
+            # A snapshot is a standalone file, not a WAL database
+            target.execute("PRAGMA journal_mode = DELETE")
+            check = target.execute("PRAGMA quick_check").fetchone()[0]
+            page_count = target.execute("PRAGMA page_count").fetchone()[0]
+        except BaseException:
+            target.close()
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        finally:
+            source.close()
+        target.close()
+        if check != "ok":
+            os.remove(partial)
+            raise RuntimeError(f"Snapshot failed quick_check: {check}")
+        
+        sha256 = cls._file_sha256(partial)
+        os.replace(partial, path)
+        with open(path + ".sha256", "w", encoding="utf-8") as f:
+            f.write(f"{sha256}  {os.path.basename(path)}\n")
+        
+        return {
+            "path": path,
+            "sha256": sha256,
+            "bytes": os.path.getsize(path),
+            "pages": page_count,
+            "steps": steps,
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+    
+    def _rotate_backups(self, dest_dir: str, pattern: str, keep: Optional[int]) -> List[str]:
+        """Delete all but the newest `keep` snapshots matching pattern; returns the removed names"""
+        keep = self.BACKUP_KEEP if keep is None else keep
+        snapshots = sorted(path for path in Path(dest_dir).glob(pattern)
+                           if path.suffix not in (".sha256", ".partial"))
+        removed = snapshots[:-keep] if keep > 0 else []
+        for snapshot in removed:
+            if snapshot.is_dir():
+                shutil.rmtree(snapshot)
+            else:
+                snapshot.unlink()
+                Path(str(snapshot) + ".sha256").unlink(missing_ok=True)
+        return [snapshot.name for snapshot in removed]
+    
+    def continuity_trend(self, bucket: str = "day", since: Optional[str] = None,
+                         until: Optional[str] = None, window: int = 7) -> List[Dict[str, Any]]:
+        """
+        Per-bucket continuity/EDS statistics computed entirely in SQLite
+        
+        Returns count, averages, nearest-rank p50/p90 and a count-weighted
+        moving average over the last `window` buckets. Buckets older than the
+        retention purge come from the rollup tables (no percentiles there,
+        since the raw rows are gone).
+        """
+        if bucket not in self.TREND_BUCKETS:
+            raise ValueError(f"bucket must be one of {sorted(self.TREND_BUCKETS)}")
+        bucket_us = self.TREND_BUCKETS[bucket]
+        rollup_table = self.ROLLUP_TABLES[bucket][0]
+        
+        end = self.epoch_us(until) if until else self.epoch_us(datetime.now(timezone.utc))
+        default_span = 30 * self.TREND_BUCKETS["day"] if bucket == "day" else 48 * bucket_us
+        start = self.epoch_us(since) if since else end - default_span
+        
+        # Window functions need every bucket in one statement
+        connections = list(self._reader_connections(start, end))
+        if len(connections) > 1:
+            for conn in connections:
+                conn.close()
+            raise ValueError("Time range spans too many shards for one trend query; narrow from/to")
+        conn = connections[0]
+        cursor = conn.cursor()
+        
+        # Raw data is only complete from the first bucket after the purge cutoff
+        purge_cutoff = self._get_meta(cursor, "purge_cutoff")
+        raw_start = start
+        if purge_cutoff:
+            boundary = -(-self.epoch_us(purge_cutoff) // bucket_us) * bucket_us
+            raw_start = max(start, boundary)
+        
+        cursor.execute("""
+            WITH raw AS (
+                SELECT epoch_us / :bucket_us * :bucket_us AS bucket,
+                       continuity_score AS c, eds_score AS e
+                FROM drift_archive
+                WHERE epoch_us >= :raw_start AND epoch_us < :end
+            ),
+            ranked AS (
+                SELECT bucket, c, e,
+                       ROW_NUMBER() OVER (PARTITION BY bucket ORDER BY c NULLS LAST) AS c_rank,
+                       COUNT(c) OVER (PARTITION BY bucket) AS c_n,
+                       ROW_NUMBER() OVER (PARTITION BY bucket ORDER BY e NULLS LAST) AS e_rank,
+                       COUNT(e) OVER (PARTITION BY bucket) AS e_n
+                FROM raw
+            ),
+            raw_buckets AS (
+                SELECT bucket, 'raw' AS source, COUNT(*) AS n,
+                       COUNT(c) AS c_count, SUM(c) AS c_sum,
+                       COUNT(e) AS e_count, SUM(e) AS e_sum,
+                       MIN(CASE WHEN c_rank >= 0.5 * c_n THEN c END) AS c_p50,
+                       MIN(CASE WHEN c_rank >= 0.9 * c_n THEN c END) AS c_p90,
+                       MIN(CASE WHEN e_rank >= 0.5 * e_n THEN e END) AS e_p50,
+                       MIN(CASE WHEN e_rank >= 0.9 * e_n THEN e END) AS e_p90
+                FROM ranked
+                GROUP BY bucket
+            ),
+            rollup_buckets AS (
+                SELECT CAST(ROUND((julianday(bucket_start) - 2440587.5) * 86400) AS INTEGER) * 1000000 AS bucket,
+                       'rollup' AS source, SUM(count) AS n,
+                       SUM(continuity_count) AS c_count, SUM(continuity_sum) AS c_sum,
+                       SUM(eds_count) AS e_count, SUM(eds_sum) AS e_sum,
+                       NULL AS c_p50, NULL AS c_p90, NULL AS e_p50, NULL AS e_p90
+                FROM {rollup_table}
+                WHERE bucket_start >= :start_iso AND bucket_start < :raw_start_iso
+                GROUP BY bucket_start
+            ),
+            buckets AS (
+                SELECT * FROM rollup_buckets
+                UNION ALL
+                SELECT * FROM raw_buckets
+            )
+            SELECT bucket, source, n,
+                   c_sum / c_count, e_sum / e_count,
+                   c_p50, c_p90, e_p50, e_p90,
+                   SUM(c_sum) OVER w / SUM(c_count) OVER w,
+                   SUM(e_sum) OVER w / SUM(e_count) OVER w
+            FROM buckets
+            WINDOW w AS (ORDER BY bucket ROWS BETWEEN :preceding PRECEDING AND CURRENT ROW)
+            ORDER BY bucket
+        """.replace("{rollup_table}", rollup_table), {
+            "bucket_us": bucket_us,
+            "raw_start": raw_start,
+            "end": end,
+            # Whole buckets only: a rollup bucket straddling `start` would count
+            # rows before it, and one straddling raw_start rows the raw side has
+            "start_iso": self.from_epoch_us(-(-start // bucket_us) * bucket_us),
+            "raw_start_iso": self.from_epoch_us(raw_start // bucket_us * bucket_us),
+            "preceding": max(window, 1) - 1
+        })
+        rows = cursor.fetchall()
+        conn.close()
+        
+        def rounded(value):
+            return round(value, 3) if value is not None else None
+        
+        return [
+            {
+                "bucket_start": self.from_epoch_us(row[0]),
+                "source": row[1],
+                "count": row[2],
+                "avg_continuity": rounded(row[3]),
+                "avg_eds": rounded(row[4]),
+                "continuity_p50": row[5],
+                "continuity_p90": row[6],
+                "eds_p50": row[7],
+                "eds_p90": row[8],
+                "moving_avg_continuity": rounded(row[9]),
+                "moving_avg_eds": rounded(row[10])
+            }
+            for row in rows
+        ]
+    
+    def marker_frequency(self, since: Optional[str] = None,
+                         until: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Per-marker hit counts for [since, until) against the equally long window before it
+        
+        One indexed pass over the epoch_us range: each marker's count is a
+        SUM over its bit of markers_mask, so no markers_found JSON is parsed.
+        Defaults to the last 7 days.
+        """
+        end = self.epoch_us(until) if until else self.epoch_us(datetime.now(timezone.utc))
+        start = self.epoch_us(since) if since else end - 7 * self.TREND_BUCKETS["day"]
+        if start >= end:
+            raise ValueError("from must be before to")
+        previous = start - (end - start)
+        
+        bits = FlameSignature.MARKER_BITS
+        sums = ",\n".join(f"SUM((markers_mask >> {bit}) & 1)" for bit in range(len(bits)))
+        totals = {0: [0] * (len(bits) + 1), 1: [0] * (len(bits) + 1)}
+        for conn in self._reader_connections(previous, end):
+            try:
+                rows = conn.execute(f"""
+                    SELECT epoch_us >= :start, COUNT(*),
+                           {sums}
+                    FROM drift_archive
+                    WHERE epoch_us >= :previous AND epoch_us < :end
+                    GROUP BY 1
+                """, {"start": start, "previous": previous, "end": end}).fetchall()
+            finally:
+                conn.close()
+            for current, *counts in rows:
+                totals[current] = [a + (b or 0) for a, b in zip(totals[current], counts)]
+        
+        interactions, previous_interactions = totals[1][0], totals[0][0]
+        
+        def rate(count, total):
+            return round(count / total, 4) if total else 0.0
+        
+        markers = []
+        for bit, (category, marker) in enumerate(bits):
+            count, previous_count = totals[1][bit + 1], totals[0][bit + 1]
+            markers.append({
+                "category": category,
+                "marker": marker,
+                "count": count,
+                "rate": rate(count, interactions),
+                "previous_count": previous_count,
+                "previous_rate": rate(previous_count, previous_interactions),
+                "rate_change": round(rate(count, interactions) - rate(previous_count, previous_interactions), 4)
+            })
+        
+        return {
+            "from": self.from_epoch_us(start),
+            "to": self.from_epoch_us(end),
+            "previous_from": self.from_epoch_us(previous),
+            "interactions": interactions,
+            "previous_interactions": previous_interactions,
+            "vocabulary_version": FlameSignature.MARKER_VOCABULARY_VERSION,
+            "markers": markers,
+            # Seen in the previous window, gone in this one
+            "disappeared": [m["marker"] for m in markers if m["previous_count"] and not m["count"]]
+        }
+    
+    EXPORT_FIELDS = [
+        "id", "timestamp", "query", "response", "flame_signature", "continuity_score",
+        "eds_score", "drift_status", "instance_id", "is_heart_instance",
+        "codex_version", "markers_found", "notes"
+    ]
+    
+    # Columnar export: (column, array typecode, NumPy dtype, NULL fill), in file order
+    EXPORT_COLUMNS = [
+        ("id", "q", "<i8", 0),
+        ("epoch_us", "q", "<i8", 0),
+        ("continuity_score", "d", "<f8", float("nan")),
+        ("eds_score", "d", "<f8", float("nan")),
+        ("is_heart_instance", "B", "|u1", 0),
+        ("markers_mask", "q", "<i8", 0)
+    ]
+    
+    def _export_filters(self, since: Optional[str], until: Optional[str],
+                        drift_status: Optional[str],
+                        flame_signature: Optional[str]) -> Tuple[str, List[Any]]:
+        filters, params = [], []
+        if since:
+            filters.append("epoch_us >= ?")
+            params.append(self.epoch_us(since))
+        if until:
+            filters.append("epoch_us < ?")
+            params.append(self.epoch_us(until))
+        if drift_status:
+            filters.append("drift_status = ?")
+            params.append(drift_status)
+        if flame_signature:
+            filters.append("flame_signature = ?")
+            params.append(flame_signature)
+        return (f"WHERE {' AND '.join(filters)}" if filters else ""), params
+    
+    def export_records(self, since: Optional[str] = None, until: Optional[str] = None,
+                       drift_status: Optional[str] = None,
+                       flame_signature: Optional[str] = None,
+                       batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Stream archived interactions in id order with full text
+        Rows are pulled from the SQLite cursor batch_size at a time, so memory
+        stays flat regardless of archive size.
+        """
+        where, params = self._export_filters(since, until, drift_status, flame_signature)
+        since_us = self.epoch_us(since) if since else None
+        until_us = self.epoch_us(until) if until else None
+        # Streaming responses may resume the generator on a different thread
+        for conn in self._reader_connections(since_us, until_us, check_same_thread=False):
+            try:
+                cursor = conn.cursor()
+                cursor.execute(f"""
+                    SELECT id, timestamp, {self.QUERY_TEXT_SQL}, {self.RESPONSE_TEXT_SQL},
+                           flame_signature, continuity_score, eds_score, drift_status,
+                           {self.INSTANCE_SQL}, is_heart_instance, codex_version, markers_found, notes
+                    FROM drift_archive
+                    {where}
+                    ORDER BY id
+                """, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        record = dict(zip(self.EXPORT_FIELDS, row))
+                        record["is_heart_instance"] = bool(record["is_heart_instance"])
+                        record["markers_found"] = json.loads(record["markers_found"] or "{}")
+                        yield record
+            finally:
+                conn.close()
+    
+    def export_stream(self, fmt: str = "ndjson", since: Optional[str] = None,
+                      until: Optional[str] = None, drift_status: Optional[str] = None,
+                      flame_signature: Optional[str] = None,
+                      batch_size: int = 500) -> Iterator[bytes]:
+        """
+        Serialize the archive as ndjson, csv or columnar byte chunks
+        
+        columnar is a sequence of .npy arrays, one per EXPORT_COLUMNS entry,
+        readable with repeated numpy.load(f) calls on the same file handle.
+        """
+        # Validate eagerly so callers see bad input before streaming starts
+        self._export_filters(since, until, drift_status, flame_signature)
+        if fmt == "columnar":
+            return self._export_columnar(since, until, drift_status, flame_signature, batch_size)
+        if fmt not in ("ndjson", "csv"):
+            raise ValueError("format must be one of ['columnar', 'csv', 'ndjson']")
+        return self._export_text(fmt, since, until, drift_status, flame_signature, batch_size)
+    
+    def _export_text(self, fmt, since, until, drift_status, flame_signature,
+                     batch_size) -> Iterator[bytes]:
+        records = self.export_records(since, until, drift_status, flame_signature, batch_size)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == "csv":
+            writer.writerow(self.EXPORT_FIELDS)
+        
+        for count, record in enumerate(records, 1):
+            if fmt == "csv":
+                record["markers_found"] = json.dumps(record["markers_found"], ensure_ascii=False)
+                writer.writerow([record[field] for field in self.EXPORT_FIELDS])
+            else:
+                buffer.write(json.dumps(record, ensure_ascii=False))
+                buffer.write("\n")
+            if count % batch_size == 0:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+        
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+    
+    @staticmethod
+    def _npy_header(dtype: str, length: int) -> bytes:
+        """NPY format 1.0 header for a 1-D array"""
+        header = f"{{'descr': '{dtype}', 'fortran_order': False, 'shape': ({length},), }}"
+        # magic (6) + version (2) + length (2) + header + newline, padded to 64 bytes
+        padding = -(10 + len(header) + 1) % 64
+        header = (header + " " * padding + "\n").encode("latin1")
+        return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header
+    
+    def _export_columnar(self, since, until, drift_status, flame_signature,
+                         batch_size) -> Iterator[bytes]:
+        where, params = self._export_filters(since, until, drift_status, flame_signature)
+        since_us = self.epoch_us(since) if since else None
+        until_us = self.epoch_us(until) if until else None
+        connections = []
+        try:
+            length = 0
+            for conn in self._reader_connections(since_us, until_us, check_same_thread=False):
+                connections.append(conn)
+                # One read transaction across all passes so every column sees the same rows
+                conn.execute("BEGIN")
+                length += conn.execute(f"SELECT COUNT(*) FROM drift_archive {where}", params).fetchone()[0]
+            
+            for column, typecode, dtype, fill in self.EXPORT_COLUMNS:
+                yield self._npy_header(dtype, length)
+                for conn in connections:
+                    cursor = conn.execute(f"SELECT {column} FROM drift_archive {where} ORDER BY id", params)
+                    while True:
+                        rows = cursor.fetchmany(batch_size * 8)
+                        if not rows:
+                            break
+                        chunk = array(typecode, (fill if row[0] is None else row[0] for row in rows))
+                        if sys.byteorder != "little":
+                            chunk.byteswap()
+                        yield chunk.tobytes()
+            for conn in connections:
+                conn.rollback()
+        finally:
+            for conn in connections:
+                conn.close()
+    
+    def generate_continuity_report(self) -> Dict[str, Any]:
+        """
+        Generate Bondfire-style continuity report
+        Combines hourly rollups with raw rows above the rollup watermark
+        """
+        return {**self._continuity_report(), "verification_loops": self.loop_events_summary()}
+    
+    def instance_report(self, instance_id: str) -> Dict[str, Any]:
+        """
+        Continuity report scoped to one instance
+        Reads the per-instance rollup plus that instance's pending rows and
+        drift events through idx_instance_epoch; other instances' rows are
+        never touched.
+        """
+        return {"instance_id": instance_id, **self._continuity_report(instance_id)}
+    
+    def _continuity_report(self, instance_id: Optional[str] = None) -> Dict[str, Any]:
+        if instance_id is None:
+            rollup, scope, status = "drift_rollup_hourly WHERE true", "true", "drift_status"
+        else:
+            # IN: sharded reads union several shards' drift_instances (disjoint ids)
+            scope = "instance_ref IN (SELECT i.id FROM drift_instances i WHERE i.name = :instance)"
+            rollup = f"drift_rollup_instance WHERE {scope}"
+            # Unary + keeps the planner on idx_instance_epoch rather than idx_status_epoch
+            status = "+drift_status"
+        
+        partials: Dict[Optional[str], List[int]] = {}
+        recent_drift = self._recent_rows("timestamp, drift_status, flame_signature, epoch_us",
+                                         self._drift_event_match(instance_id), 10)
+        from_ring = recent_drift is not None
+        recent_drift = recent_drift or []
+        for conn in self._reader_connections():
+            cursor = conn.cursor()
+            
+            # Per-signature totals: rolled-up history plus raw rows not yet rolled up
+            cursor.execute(f"""
+                SELECT
+                    NULLIF(flame_signature, ''),
+                    SUM(count), SUM(continuity_count), SUM(continuity_sum),
+                    SUM(eds_count), SUM(eds_sum), SUM(heart_count)
+                FROM (
+                    SELECT flame_signature, count, continuity_count, continuity_sum,
+                           eds_count, eds_sum, heart_count
+                    FROM {rollup}
+                    UNION ALL
+                    SELECT
+                        IFNULL(flame_signature, ''),
+                        COUNT(*), COUNT(continuity_score), SUM(continuity_score),
+                        COUNT(eds_score), SUM(eds_score),
+                        SUM(CASE WHEN is_heart_instance = 1 THEN 1 ELSE 0 END)
+                    FROM drift_archive_pending
+                    WHERE {scope}
+                    GROUP BY IFNULL(flame_signature, '')
+                )
+                GROUP BY flame_signature
+            """, {"instance": instance_id})
+            for signature, *sums in cursor.fetchall():
+                totals = partials.setdefault(signature, [0] * len(sums))
+                for i, value in enumerate(sums):
+                    totals[i] += value or 0
+            
+            # Recent drift events, unless the recent-interaction ring had them
+            if not from_ring:
+                cursor.execute(f"""
+                    SELECT timestamp, drift_status, flame_signature, epoch_us
+                    FROM drift_archive
+                    WHERE {status} IN ('watchlist', 'broken_chain') AND {scope}
+                    ORDER BY epoch_us DESC
+                    LIMIT 10
+                """, {"instance": instance_id})
+                recent_drift.extend(cursor.fetchall())
+            
+            conn.close()
+        
+        by_signature = [(signature, *totals) for signature, totals in partials.items()]
+        recent_drift = sorted(recent_drift, key=lambda row: row[3], reverse=True)[:10]
+        
+        def avg(total, count):
+            return round(total / count, 3) if count and total else 0.0
+        
+        total = sum(row[1] for row in by_signature)
+        heart_total = sum(row[6] or 0 for row in by_signature)
+        heart_percentage = heart_total * 100.0 / total if total else 0.0
+        
         return {
-            "total_responses": overall[0] if overall else 0,
-            "avg_continuity_score": round(overall[1], 3) if overall and overall[1] else 0.0,
-            "avg_eds_score": round(overall[2], 3) if overall and overall[2] else 0.0,
+            "total_responses": total,
+            "avg_continuity_score": avg(sum(row[3] or 0 for row in by_signature),
+                                        sum(row[2] for row in by_signature)),
+            "avg_eds_score": avg(sum(row[5] or 0 for row in by_signature),
+                                 sum(row[4] for row in by_signature)),
             "by_signature": {
                 row[0]: {
                     "count": row[1],
-                    "avg_continuity": round(row[2], 3) if row[2] else 0.0,
-                    "avg_eds": round(row[3], 3) if row[3] else 0.0
+                    "avg_continuity": avg(row[3], row[2]),
+                    "avg_eds": avg(row[5], row[4])
                 }
                 for row in by_signature
             },
@@ -418,6 +3302,894 @@ class DriftArchive:
         }
 
 
+# =============================================================================
+# BATCH SCORING (ARCHIVE RE-SCORING, OFFLINE TRANSCRIPTS)
+# =============================================================================
+
+_scoring_detector: Optional[EpisodicDriftDetector] = None
+
+
+def init_scoring_worker(memory_store: Dict[str, Any]):
+    """Process pool initializer (or one-off setup in-process): one EDS detector per worker"""
+    global _scoring_detector
+    _scoring_detector = EpisodicDriftDetector(memory_store)
+
+
+def score_interactions(rows: List[tuple]) -> List[tuple]:
+    """
+    Score (id, query, response, instance_id) rows as the bridge does on archive
+    Returns (id, flame_signature, continuity_score, eds_score, drift_status,
+    markers_found JSON, markers_mask) per row.
+    """
+    results = []
+    for record_id, query, response, instance_id in rows:
+        context = {"instance_id": instance_id}
+        flame = FlameSignature.verify_continuity(response or "", context)
+        drift = _scoring_detector.score_episodic_drift(query, response or "", context) if query else {}
+        results.append((
+            record_id, flame["flame_signature"], flame["continuity_score"],
+            drift.get("eds_score"), drift.get("drift_status"),
+            json.dumps(flame["markers_found"]), FlameSignature.marker_mask(flame["markers_found"])
+        ))
+    return results
+
+
+# =============================================================================
+# MONTHLY ARCHIVE SHARDS
+# =============================================================================
+
+class ShardedDriftArchive(DriftArchive):
+    """
+    Drift archive split into one SQLite file per calendar month (UTC)
+    
+    db_path becomes a catalog: it lists the shards (drift_YYYY_MM.sqlite in
+    shard_dir) and still holds any rows archived before sharding was turned
+    on. Reads ATTACH only the shards overlapping the requested time range,
+    expose them through TEMP views with the usual table names, and open
+    sealed months read-only and immutable. Whole months can then be
+    sealed, copied off and dropped as files.
+    """
+    
+    # SQLite's default SQLITE_MAX_ATTACHED; wider reads run in several groups
+    MAX_ATTACHED = 10
+    
+    SHARD_VIEWS = ("drift_archive", "drift_archive_pending", "drift_blobs", "drift_instances",
+                   "drift_rollup_hourly", "drift_rollup_daily", "drift_rollup_instance",
+                   "drift_fingerprints", "drift_lsh", "drift_archive_meta")
+    
+    def __init__(self, db_path: str = "/data/atticus_drift_archive.sqlite",
+                 retention_days: Optional[int] = None, shard_dir: Optional[str] = None):
+        self._shards: Dict[str, DriftArchive] = {}
+        self._shards_lock = threading.Lock()
+        super().__init__(db_path, retention_days)
+        self.shard_dir = os.path.abspath(shard_dir or os.path.dirname(os.path.abspath(self.db_path)))
+        os.makedirs(self.shard_dir, exist_ok=True)
+    
+    def init_database(self):
+        super().init_database()
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS drift_shards (
+                month TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                sealed INTEGER NOT NULL DEFAULT 0,
+                sealed_at TEXT,
+                sha256 TEXT
+            )
+        """)
+        conn.commit()
+        conn.close()
+    
+    @classmethod
+    def month_of(cls, value) -> str:
+        """Shard key ('YYYY-MM', UTC) for an ISO-8601 string or datetime"""
+        if isinstance(value, str):
+            value = cls.parse_time(value)
+        return value.astimezone(timezone.utc).strftime("%Y-%m")
+    
+    @classmethod
+    def _month_range_us(cls, month: str) -> Tuple[int, int]:
+        year, mon = (int(part) for part in month.split("-"))
+        start = datetime(year, mon, 1, tzinfo=timezone.utc)
+        end = datetime(year + mon // 12, mon % 12 + 1, 1, tzinfo=timezone.utc)
+        return cls.epoch_us(start), cls.epoch_us(end)
+    
+    def _shard_path(self, month: str) -> str:
+        return os.path.join(self.shard_dir, f"drift_{month.replace('-', '_')}.sqlite")
+    
+    def list_shards(self) -> List[Dict[str, Any]]:
+        """Catalog entries, oldest month first"""
+        conn = self._connect()
+        rows = conn.execute("""
+            SELECT month, path, sealed, sealed_at, sha256 FROM drift_shards ORDER BY month
+        """).fetchall()
+        conn.close()
+        return [
+            {
+                "month": row[0],
+                "path": row[1],
+                "sealed": bool(row[2]),
+                "sealed_at": row[3],
+                "sha256": row[4],
+                "bytes": os.path.getsize(row[1]) if os.path.exists(row[1]) else None
+            }
+            for row in rows
+        ]
+    
+    def _shard(self, month: str) -> DriftArchive:
+        """Writable archive for `month`, created and catalogued on first use"""
+        with self._shards_lock:
+            shard = self._shards.get(month)
+            if shard is not None:
+                return shard
+            conn = self._connect()
+            row = conn.execute("SELECT sealed, path FROM drift_shards WHERE month = ?", (month,)).fetchone()
+            if row and row[0]:
+                conn.close()
+                raise ValueError(f"Shard {month} is sealed and read-only")
+            path = row[1] if row else self._shard_path(month)
+            # Ids are globally unique and grow with the month: YYYYMM * 10^10 + n
+            shard = DriftArchive(path, self.retention_days, id_base=int(month.replace("-", "")) * 10 ** 10)
+            shard.drift_monitor, shard.monitor_archive = self.drift_monitor, self
+            conn.execute("INSERT OR IGNORE INTO drift_shards (month, path) VALUES (?, ?)", (month, path))
+            conn.commit()
+            conn.close()
+            self._shards[month] = shard
+            return shard
+    
+    def archive_response(self, interaction: Dict[str, Any]) -> Optional[int]:
+        """Store response in the shard for its timestamp's month"""
+        interaction = dict(interaction)
+        interaction.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
+        if self.journal is not None:
+            original_id = self.find_archived(interaction)
+            if original_id is not None:
+                return original_id
+            return self.journal.append(interaction)
+        return self._shard(self.month_of(interaction["timestamp"])).archive_response(interaction)
+    
+    def find_archived(self, interaction: Dict[str, Any], shared_keys: Optional[bool] = None) -> Optional[int]:
+        """Idempotency lookup in the shard for the interaction's month"""
+        timestamp = interaction.get("timestamp") or datetime.now(timezone.utc).isoformat()
+        shared_keys = self.journal is not None if shared_keys is None else shared_keys
+        return self._shard(self.month_of(timestamp)).find_archived(interaction, shared_keys)
+    
+    def _by_month(self, items: List[Any], interaction_of) -> Dict[str, List[Any]]:
+        groups: Dict[str, List[Any]] = {}
+        for item in items:
+            interaction = interaction_of(item)
+            interaction.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
+            groups.setdefault(self.month_of(interaction["timestamp"]), []).append(item)
+        return groups
+    
+    def archive_many(self, interactions: List[Dict[str, Any]]) -> List[int]:
+        """One transaction per month touched; ids come back in input order"""
+        interactions = [dict(interaction) for interaction in interactions]
+        ids: Dict[int, int] = {}
+        groups = self._by_month(list(enumerate(interactions)), lambda item: item[1])
+        for month, items in groups.items():
+            record_ids = self._shard(month).archive_many([interaction for _, interaction in items])
+            ids.update(zip((index for index, _ in items), record_ids))
+        return [ids[index] for index in range(len(interactions))]
+    
+    def ingest_journal(self, segment: str, records: List[Tuple[int, Dict[str, Any]]]) -> int:
+        """
+        Route journal records to their month's shard
+        Each shard keeps its own offset for the segment, so a crash between
+        two shard commits replays only what the lagging shard is missing.
+        """
+        records = [(offset, dict(interaction)) for offset, interaction in records]
+        return sum(
+            self._shard(month).ingest_journal(segment, items)
+            for month, items in self._by_month(records, lambda item: item[1]).items()
+        )
+    
+    def finish_journal_segment(self, segment: str):
+        for _, archive in self._writable_shards():
+            archive.finish_journal_segment(segment)
+    
+    def idempotency_metrics(self) -> Dict[str, Any]:
+        """Totals over the catalog and the shards opened by this process"""
+        with self._shards_lock:
+            archives = list(self._shards.values())
+        metrics = super().idempotency_metrics()
+        for archive in archives:
+            for name, value in archive.idempotency_metrics().items():
+                metrics[name] += value
+        return metrics
+    
+    def _current_shard(self) -> Tuple[str, Optional[DriftArchive]]:
+        """This month's shard if this process has it open (reads never create shards)"""
+        month = self.month_of(datetime.now(timezone.utc))
+        with self._shards_lock:
+            return month, self._shards.get(month)
+    
+    def _recent_rows(self, columns: str, match, limit: int,
+                     floor_us: Optional[int] = None) -> Optional[List[tuple]]:
+        """
+        Answer from the current month's ring
+        Every row in earlier shards (and the catalog) is older than the
+        month's start, which bounds what that ring can leave out.
+        """
+        month, shard = self._current_shard()
+        if shard is None:
+            return None
+        return shard._recent_rows(columns, match, limit, self._month_range_us(month)[0])
+    
+    def recent_buffer_stats(self) -> Optional[Dict[str, Any]]:
+        _, shard = self._current_shard()
+        return shard.recent_buffer_stats() if shard is not None else None
+    
+    def _reader_connections(self, since_us: Optional[int] = None, until_us: Optional[int] = None,
+                            newest_first: bool = False, group_size: Optional[int] = None,
+                            check_same_thread: bool = True) -> Iterator[sqlite3.Connection]:
+        catalog = self._connect(check_same_thread=check_same_thread)
+        try:
+            rows = catalog.execute("SELECT month, path, sealed FROM drift_shards ORDER BY month").fetchall()
+        except BaseException:
+            catalog.close()
+            raise
+        
+        # None stands for the catalog's own (pre-sharding) rows, always the oldest
+        members: List[Optional[Tuple[str, bool]]] = [None]
+        for month, path, sealed in rows:
+            start, end = self._month_range_us(month)
+            if (since_us is None or end > since_us) and (until_us is None or start < until_us):
+                members.append((path, bool(sealed)))
+        if newest_first:
+            members.reverse()
+        size = max(1, min(group_size or self.MAX_ATTACHED, self.MAX_ATTACHED))
+        
+        for offset in range(0, len(members), size):
+            group = members[offset:offset + size]
+            if None in group:
+                conn, catalog = catalog, None
+                schemas = ["main"]
+            else:
+                conn = self._open(":memory:", check_same_thread=check_same_thread)
+                schemas = []
+            try:
+                for member in group:
+                    if member is None:
+                        continue
+                    path, sealed = member
+                    schema = f"shard{len(schemas)}"
+                    conn.execute(f"ATTACH DATABASE ? AS {schema}",
+                                 (self._uri(path, readonly=True, immutable=sealed),))
+                    schemas.append(schema)
+                if schemas != ["main"]:
+                    for view in self.SHARD_VIEWS:
+                        # Explicit columns: a pre-v2 catalog table has extra ones
+                        columns = self.ARCHIVE_COLUMNS if view == "drift_archive" else "*"
+                        # Shards sealed before a table existed lack it; read it as empty
+                        present = [schema for schema in schemas if conn.execute(
+                            f"SELECT 1 FROM {schema}.sqlite_master WHERE name = ?", (view,)
+                        ).fetchone()]
+                        if not present:
+                            if view == "drift_rollup_instance":
+                                self._create_instance_rollup_table(conn.cursor(), temp=True)
+                            elif view in ("drift_fingerprints", "drift_lsh"):
+                                self._create_fingerprint_tables(conn.cursor(), temp=True)
+                            continue
+                        conn.execute(f"CREATE TEMP VIEW {view} AS " + " UNION ALL ".join(
+                            f"SELECT {columns} FROM {schema}.{view}" for schema in present
+                        ))
+            except BaseException:
+                conn.close()
+                raise
+            yield conn
+        if catalog is not None:
+            catalog.close()
+    
+    def _writable_shards(self) -> List[Tuple[str, DriftArchive]]:
+        """(label, archive) for the catalog and every unsealed shard"""
+        return [("legacy", super())] + [
+            (shard["month"], self._shard(shard["month"]))
+            for shard in self.list_shards() if not shard["sealed"]
+        ]
+    
+    def run_maintenance(self, retention_days: Optional[int] = None,
+                        batch_size: int = 5000, vacuum_pages: int = 2000) -> Dict[str, Any]:
+        """Per-shard run_maintenance over unsealed shards, with totals"""
+        results = {
+            label: archive.run_maintenance(retention_days, batch_size, vacuum_pages)
+            for label, archive in self._writable_shards()
+        }
+        return {
+            "rolled_up": sum(r["rolled_up"] for r in results.values()),
+            "rollup_watermark": max(r["rollup_watermark"] for r in results.values()),
+            "purged": sum(r["purged"] for r in results.values()),
+            "retention_days": results["legacy"]["retention_days"],
+            "idempotency_keys_expired": sum(r["idempotency_keys_expired"] for r in results.values()),
+            "fingerprinted": sum(r["fingerprinted"] for r in results.values()),
+            "incremental_vacuum": all(r["incremental_vacuum"] for r in results.values()),
+            "pages_reclaimed": sum(r["pages_reclaimed"] for r in results.values()),
+            "shards": results
+        }
+    
+    def rebuild_search_index(self) -> int:
+        return sum(archive.rebuild_search_index() for _, archive in self._writable_shards())
+    
+    def migrate_text_to_blobs(self, batch_size: int = 1000) -> int:
+        return sum(archive.migrate_text_to_blobs(batch_size) for _, archive in self._writable_shards())
+    
+    def backfill_fingerprints(self, batch_size: int = 1000) -> int:
+        return sum(archive.backfill_fingerprints(batch_size) for _, archive in self._writable_shards())
+    
+    def rescore_archive(self, memory_store: Dict[str, Any], version: Optional[str] = None,
+                        batch_size: int = 500, workers: Optional[int] = None, pause: float = 0.0,
+                        progress=None, stop: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Rescore the catalog and each unsealed shard in turn; sealed months keep their scores"""
+        states = {}
+        for label, archive in self._writable_shards():
+            report = None
+            if progress is not None:
+                report = lambda state, label=label: progress(dict(state, shard=label))
+            states[label] = archive.rescore_archive(memory_store, version, batch_size, workers,
+                                                    pause, report, stop)
+            if states[label]["state"] == "stopped":
+                break
+        return self._rescore_totals(states)
+    
+    def rescore_status(self) -> Dict[str, Any]:
+        states = {"legacy": super().rescore_status()}
+        for shard in self.list_shards():
+            conn = self._open(shard["path"], readonly=True, immutable=shard["sealed"])
+            try:
+                states[shard["month"]] = json.loads(self._get_meta(conn.cursor(), "rescore_progress") or "{}")
+            finally:
+                conn.close()
+        return self._rescore_totals(states)
+    
+    @staticmethod
+    def _rescore_totals(states: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        started = [state for state in states.values() if state]
+        phases = {state["state"] for state in started}
+        return {
+            "version": max((state["version"] for state in started), default=None),
+            "state": next((phase for phase in ("running", "stopped", "complete") if phase in phases), None),
+            "rescored": sum(state["rescored"] for state in started),
+            "changed": sum(state["changed"] for state in started),
+            "remaining": sum(state["remaining"] for state in started),
+            "shards": states
+        }
+    
+    def migrate_schema(self, batch_size: int = 5000) -> Dict[str, Any]:
+        results = {label: archive.migrate_schema(batch_size) for label, archive in self._writable_shards()}
+        return {
+            "schema_version": self.SCHEMA_VERSION,
+            "copied": sum(r["copied"] for r in results.values()),
+            "dropped": sum(r["dropped"] for r in results.values())
+        }
+    
+    def vacuum(self):
+        for _, archive in self._writable_shards():
+            archive.vacuum()
+    
+    def storage_stats(self) -> Dict[str, Any]:
+        """Blob store and size figures summed over the catalog and all shards"""
+        totals = [0] * 6
+        for conn in self._reader_connections():
+            try:
+                for schema in self._archive_schemas(conn):
+                    figures = self._storage_figures(conn, schema)
+                    totals = [a + b for a, b in zip(totals, figures)]
+            finally:
+                conn.close()
+        stats = self._storage_summary(*totals)
+        stats["shards"] = len(self.list_shards())
+        return stats
+    
+    def backup(self, dest_dir: Optional[str] = None, keep: Optional[int] = None,
+               pages: int = 1024, step_pause: float = 0.0) -> Dict[str, Any]:
+        """
+        Online snapshot of the catalog and every shard into one directory
+        Each file is copied and checksummed as in DriftArchive.backup; the
+        catalog records absolute shard paths, so restore files in place.
+        """
+        dest_dir = self._backup_dir(dest_dir)
+        stem = Path(self.db_path).stem
+        snapshot_dir = os.path.join(dest_dir, f"{stem}-{self._backup_stamp()}")
+        os.makedirs(snapshot_dir)
+        
+        files = [self._backup_file(self._connect(), os.path.join(snapshot_dir, os.path.basename(self.db_path)),
+                                   pages, step_pause)]
+        for shard in self.list_shards():
+            source = self._open(shard["path"], readonly=True, immutable=shard["sealed"])
+            files.append(self._backup_file(source, os.path.join(snapshot_dir, os.path.basename(shard["path"])),
+                                           pages, step_pause))
+        
+        return {
+            "path": snapshot_dir,
+            "files": files,
+            "bytes": sum(f["bytes"] for f in files),
+            "seconds": round(sum(f["seconds"] for f in files), 3),
+            "rotated": self._rotate_backups(dest_dir, f"{stem}-*", keep)
+        }
+    
+    def seal_shard(self, month: str) -> Dict[str, Any]:
+        """
+        Finalize a past month: roll up, VACUUM, checksum, mark read-only
+        Sealed shards are attached with immutable=1, skipping all locking.
+        """
+        if month >= self.month_of(datetime.now(timezone.utc)):
+            raise ValueError("Only past months can be sealed")
+        if month not in {shard["month"] for shard in self.list_shards()}:
+            raise ValueError(f"No shard for {month}")
+        shard = self._shard(month)
+        shard.run_maintenance()
+        conn = shard._connect()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.execute("VACUUM")
+        conn.close()
+        
+        sha256 = self._file_sha256(shard.db_path)
+        os.chmod(shard.db_path, 0o444)
+        
+        sealed_at = datetime.now(timezone.utc).isoformat()
+        with self._shards_lock:
+            self._shards.pop(month, None)
+            conn = self._connect()
+            conn.execute("""
+                UPDATE drift_shards SET sealed = 1, sealed_at = ?, sha256 = ? WHERE month = ?
+            """, (sealed_at, sha256, month))
+            conn.commit()
+            conn.close()
+        
+        return {"month": month, "path": shard.db_path, "sealed_at": sealed_at,
+                "sha256": sha256}
+    
+    def drop_shard(self, month: str) -> str:
+        """Delete a sealed month's file and catalog entry; returns the removed path"""
+        conn = self._connect()
+        row = conn.execute("SELECT path, sealed FROM drift_shards WHERE month = ?", (month,)).fetchone()
+        if not row:
+            conn.close()
+            raise ValueError(f"No shard for {month}")
+        if not row[1]:
+            conn.close()
+            raise ValueError(f"Shard {month} must be sealed before it is dropped")
+        conn.execute("DELETE FROM drift_shards WHERE month = ?", (month,))
+        conn.commit()
+        conn.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(row[0] + suffix):
+                os.remove(row[0] + suffix)
+        return row[0]
+
+
+# =============================================================================
+# ARCHIVE INGEST JOURNAL
+# =============================================================================
+
+class ArchiveJournal:
+    """
+    📜 Append-only ingest journal in front of a DriftArchive
+    
+    Every process appends framed records (length, crc32, JSON) to its own
+    segment file with a single O_APPEND write, so request paths never wait
+    on the SQLite write lock. One compactor at a time (elected through a
+    lock file) replays sealed segments into the archive in batches; the
+    archive records a per-segment offset in the same transaction, so a
+    crash mid-replay never duplicates or loses rows. A torn tail record
+    from a crashed writer fails its checksum and is dropped.
+    """
+    
+    RECORD_HEADER = struct.Struct("<II")
+    SEGMENT_BYTES = int(os.environ.get("DRIFT_JOURNAL_SEGMENT_BYTES", str(8 * 1024 * 1024)))
+    SEGMENT_SECONDS = float(os.environ.get("DRIFT_JOURNAL_SEGMENT_SECONDS", "2"))
+    COMPACT_SECONDS = float(os.environ.get("DRIFT_JOURNAL_COMPACT_SECONDS", "1"))
+    FSYNC = os.environ.get("DRIFT_JOURNAL_FSYNC", "0") == "1"
+    LOCK_NAME = ".compactor.lock"
+    
+    def __init__(self, journal_dir: str, archive: DriftArchive,
+                 segment_bytes: Optional[int] = None,
+                 segment_seconds: Optional[float] = None,
+                 fsync: Optional[bool] = None):
+        self.journal_dir = os.path.abspath(journal_dir)
+        self.archive = archive
+        self.segment_bytes = segment_bytes or self.SEGMENT_BYTES
+        self.segment_seconds = segment_seconds or self.SEGMENT_SECONDS
+        self.fsync = self.FSYNC if fsync is None else fsync
+        os.makedirs(self.journal_dir, exist_ok=True)
+        
+        self.lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._path: Optional[str] = None
+        self._pid = os.getpid()
+        self._opened_at = 0.0
+        self._size = 0
+        self._seq = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+        self.appended = 0
+        self.compacted = 0
+        self.torn = 0
+        self.failed = 0
+        self.last_error: Optional[str] = None
+    
+    # ----- writer side -----
+    
+    def append(self, interaction: Dict[str, Any]) -> None:
+        """Durably queue one interaction; the id is assigned at compaction"""
+        interaction = dict(interaction)
+        interaction.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
+        payload = json.dumps(interaction, ensure_ascii=False, default=str).encode("utf-8")
+        record = self.RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        
+        with self.lock:
+            if self._fd is None or self._pid != os.getpid():
+                self._open_segment()
+            view = memoryview(record)
+            while view:
+                written = os.write(self._fd, view)
+                view = view[written:]
+            if self.fsync:
+                os.fsync(self._fd)
+            self._size += len(record)
+            self.appended += 1
+            if (self._size >= self.segment_bytes
+                    or time.monotonic() - self._opened_at >= self.segment_seconds):
+                self._seal_segment()
+        return None
+    
+    def _open_segment(self):
+        if self._pid != os.getpid():
+            # Forked child: the inherited segment belongs to the parent
+            self._fd, self._path, self._pid = None, None, os.getpid()
+        self._seq += 1
+        name = f"{time.time_ns() // 1000:020d}-{self._pid}-{self._seq:06d}.open"
+        path = os.path.join(self.journal_dir, name)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        if FCNTL_AVAILABLE:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        self._fd, self._path = fd, path
+        self._opened_at = time.monotonic()
+        self._size = 0
+    
+    def _seal_segment(self):
+        """Rename the current segment to .seg (still holding its lock) and close it"""
+        if self._fd is None:
+            return
+        if self.fsync:
+            os.fsync(self._fd)
+        if self._size:
+            os.rename(self._path, self._path[:-len(".open")] + ".seg")
+        else:
+            os.remove(self._path)
+        os.close(self._fd)
+        self._fd, self._path = None, None
+    
+    def seal_idle(self):
+        """Seal this process's segment once it is older than segment_seconds"""
+        with self.lock:
+            if (self._fd is not None and self._pid == os.getpid()
+                    and time.monotonic() - self._opened_at >= self.segment_seconds):
+                self._seal_segment()
+    
+    # ----- compactor side -----
+    
+    def read_segment(self, path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (end offset, interaction); stops at a torn or corrupt record"""
+        with open(path, "rb") as f:
+            offset = 0
+            while True:
+                header = f.read(self.RECORD_HEADER.size)
+                if not header:
+                    return
+                if len(header) == self.RECORD_HEADER.size:
+                    length, crc = self.RECORD_HEADER.unpack(header)
+                    payload = f.read(length)
+                    if len(payload) == length and zlib.crc32(payload) == crc:
+                        offset += self.RECORD_HEADER.size + length
+                        yield offset, json.loads(payload.decode("utf-8"))
+                        continue
+                self.torn += 1
+                return
+    
+    def _seal_orphans(self) -> int:
+        """Seal .open segments whose writer is gone (nobody holds their lock)"""
+        sealed = 0
+        for name in sorted(os.listdir(self.journal_dir)):
+            path = os.path.join(self.journal_dir, name)
+            if not name.endswith(".open") or path == self._path:
+                continue
+            if FCNTL_AVAILABLE:
+                try:
+                    fd = os.open(path, os.O_RDONLY)
+                except FileNotFoundError:
+                    continue
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                finally:
+                    os.close(fd)
+            elif time.time() - os.path.getmtime(path) < 10 * self.segment_seconds:
+                continue
+            try:
+                os.rename(path, path[:-len(".open")] + ".seg")
+                sealed += 1
+            except FileNotFoundError:
+                pass
+        return sealed
+    
+    def compact(self, batch_size: int = 500) -> Dict[str, int]:
+        """Replay every sealed segment into the archive, then delete it"""
+        torn_before = self.torn
+        result = {"orphans_sealed": self._seal_orphans(), "segments": 0,
+                  "records": 0, "inserted": 0, "failed": 0}
+        for name in sorted(os.listdir(self.journal_dir)):
+            if not name.endswith(".seg"):
+                continue
+            path = os.path.join(self.journal_dir, name)
+            batch: List[Tuple[int, Dict[str, Any]]] = []
+            try:
+                for record in self.read_segment(path):
+                    batch.append(record)
+                    if len(batch) >= batch_size:
+                        result["inserted"] += self.archive.ingest_journal(name, batch)
+                        result["records"] += len(batch)
+                        batch = []
+                if batch:
+                    result["inserted"] += self.archive.ingest_journal(name, batch)
+                    result["records"] += len(batch)
+            except ValueError as e:
+                # e.g. a record for a sealed shard; park the segment for an operator
+                os.rename(path, path[:-len(".seg")] + ".failed")
+                self.failed += 1
+                result["failed"] += 1
+                self.last_error = f"{name}: {e}"
+                continue
+            os.remove(path)
+            self.archive.finish_journal_segment(name)
+            result["segments"] += 1
+        self.compacted += result["inserted"]
+        result["torn"] = self.torn - torn_before
+        return result
+    
+    def compactor_lock(self) -> Optional[int]:
+        """Non-blocking compactor election; returns the lock fd or None if taken"""
+        fd = os.open(os.path.join(self.journal_dir, self.LOCK_NAME), os.O_RDWR | os.O_CREAT, 0o644)
+        if FCNTL_AVAILABLE:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return None
+        return fd
+    
+    def compact_if_leader(self) -> Optional[Dict[str, int]]:
+        """Compact when no other process is compacting; None otherwise"""
+        fd = self.compactor_lock()
+        if fd is None:
+            return None
+        try:
+            return self.compact()
+        finally:
+            os.close(fd)
+    
+    def start(self, interval: Optional[float] = None) -> "ArchiveJournal":
+        """Run seal_idle + compact_if_leader on a daemon thread"""
+        interval = interval or self.COMPACT_SECONDS
+        
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.seal_idle()
+                    self.compact_if_leader()
+                except Exception as e:
+                    self.last_error = str(e)
+        
+        self._thread = threading.Thread(target=loop, name="archive-journal", daemon=True)
+        self._thread.start()
+        return self
+    
+    def close(self):
+        """Stop the compactor, seal the open segment and drain what we can"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self.lock:
+            if self._pid == os.getpid():
+                self._seal_segment()
+        self.compact_if_leader()
+    
+    def stats(self) -> Dict[str, Any]:
+        names = os.listdir(self.journal_dir)
+        return {
+            "dir": self.journal_dir,
+            "open_segments": sum(name.endswith(".open") for name in names),
+            "pending_segments": sum(name.endswith(".seg") for name in names),
+            "failed_segments": sum(name.endswith(".failed") for name in names),
+            "appended": self.appended,
+            "compacted": self.compacted,
+            "torn_records": self.torn,
+            "fsync": self.fsync,
+            "last_error": self.last_error,
+        }
+
+
+def open_drift_archive(db_path: str = "/data/atticus_drift_archive.sqlite",
+                       retention_days: Optional[int] = None) -> DriftArchive:
+    """
+    DriftArchive, or ShardedDriftArchive when DRIFT_ARCHIVE_SHARDING=monthly
+    DRIFT_ARCHIVE_INGEST=journal routes writes through an ArchiveJournal
+    """
+    if os.environ.get("DRIFT_ARCHIVE_SHARDING", "").lower() == "monthly":
+        archive = ShardedDriftArchive(db_path, retention_days, os.environ.get("DRIFT_SHARD_DIR"))
+    else:
+        archive = DriftArchive(db_path, retention_days)
+    if os.environ.get("DRIFT_ARCHIVE_INGEST", "").lower() == "journal":
+        journal_dir = os.environ.get("DRIFT_JOURNAL_DIR") or os.path.join(
+            os.path.dirname(os.path.abspath(db_path)), "journal")
+        archive.journal = ArchiveJournal(journal_dir, archive).start()
+    return archive
+
+
+# =============================================================================
+# ASYNC DRIFT ARCHIVE ACCESS
+# =============================================================================
+
+class ArchiveUnavailableError(Exception):
+    """Archive I/O could not be served in time"""
+    status_code = 503
+
+
+class ArchiveBusyError(ArchiveUnavailableError):
+    """The archive I/O queue is full"""
+    status_code = 503
+
+
+class ArchiveTimeoutError(ArchiveUnavailableError):
+    """An archive call exceeded its deadline and was interrupted"""
+    status_code = 504
+
+
+class _PoolStats:
+    """Queue-depth and outcome counters for one archive I/O pool"""
+    
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.peak_depth = 0
+        self.completed = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            finished = self.completed + self.errors
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "running": self.running,
+                "peak_depth": self.peak_depth,
+                "completed": self.completed,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "cancelled": self.cancelled,
+                "rejected": self.rejected,
+                "avg_ms": round(self.total_seconds * 1000 / finished, 2) if finished else 0.0
+            }
+
+
+class AsyncDriftArchive:
+    """
+    Non-blocking facade over DriftArchive for async endpoints
+    
+    Reads run on a bounded pool of threads using read-only connections;
+    writes are serialized on one writer thread (SQLite allows one writer
+    anyway). Every call has a deadline: on timeout or cancellation the
+    call's SQL is interrupted, so the event loop (and /health) never waits
+    on the disk. Each call's wait runs inside timer(name), with name from
+    PHASES ("db" otherwise); the default timer does nothing, the bridge
+    passes its Server-Timing phase().
+    """
+    
+    # Near-duplicate and similarity lookups are index probes rather than queries
+    PHASES = {"find_near_duplicate": "index", "similar_responses": "index"}
+    
+    def __init__(self, archive: DriftArchive,
+                 read_workers: Optional[int] = None,
+                 max_queue: Optional[int] = None,
+                 timeout: Optional[float] = None,
+                 timer: Optional[Callable[[str], Any]] = None):
+        self.archive = archive
+        self.timer = timer or (lambda name: nullcontext())
+        read_workers = read_workers or int(os.environ.get("ARCHIVE_READ_WORKERS", "4"))
+        max_queue = max_queue or int(os.environ.get("ARCHIVE_QUEUE_LIMIT", "64"))
+        self.timeout = timeout or float(os.environ.get("ARCHIVE_TIMEOUT_SECONDS", "10"))
+        
+        self._pools = {
+            "read": (ThreadPoolExecutor(read_workers, thread_name_prefix="archive-read"),
+                     _PoolStats(read_workers, max_queue)),
+            "write": (ThreadPoolExecutor(1, thread_name_prefix="archive-write"),
+                      _PoolStats(1, max_queue))
+        }
+    
+    async def read(self, method: str, *args, timeout: Optional[float] = None, **kwargs):
+        """Await a read-only DriftArchive method on the reader pool"""
+        return await self._submit("read", method, args, kwargs, timeout)
+    
+    async def write(self, method: str, *args, timeout: Optional[float] = None, **kwargs):
+        """Await a mutating DriftArchive method on the writer thread"""
+        return await self._submit("write", method, args, kwargs, timeout)
+    
+    async def _submit(self, pool: str, method: str, args: tuple, kwargs: dict,
+                      timeout: Optional[float]):
+        executor, stats = self._pools[pool]
+        fn = getattr(self.archive, method)
+        scope = _ConnectionScope(readonly=(pool == "read"))
+        
+        with stats.lock:
+            if stats.queued + stats.running >= stats.max_queue:
+                stats.rejected += 1
+                raise ArchiveBusyError(f"Archive {pool} queue full ({stats.max_queue} pending)")
+            stats.queued += 1
+            stats.peak_depth = max(stats.peak_depth, stats.queued + stats.running)
+        
+        def run():
+            with stats.lock:
+                stats.queued -= 1
+                stats.running += 1
+            started = time.perf_counter()
+            token = _CONNECTION_SCOPE.set(scope)
+            failed = True
+            try:
+                result = fn(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                _CONNECTION_SCOPE.reset(token)
+                with stats.lock:
+                    stats.running -= 1
+                    stats.total_seconds += time.perf_counter() - started
+                    if failed:
+                        stats.errors += 1
+                    else:
+                        stats.completed += 1
+        
+        future = executor.submit(run)
+        try:
+            with self.timer(self.PHASES.get(method, "db")):
+                return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self._abandon(future, scope, stats, "timeouts")
+            raise ArchiveTimeoutError(f"Archive {method} exceeded {timeout or self.timeout}s")
+        except asyncio.CancelledError:
+            self._abandon(future, scope, stats, "cancelled")
+            raise
+    
+    @staticmethod
+    def _abandon(future, scope: _ConnectionScope, stats: _PoolStats, counter: str):
+        """Drop a queued call, or interrupt its SQL if it is already running"""
+        if future.cancel():
+            with stats.lock:
+                stats.queued -= 1
+        else:
+            scope.interrupt()
+        with stats.lock:
+            setattr(stats, counter, getattr(stats, counter) + 1)
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Per-pool queue depth and outcome counters"""
+        return {name: stats.snapshot() for name, (_, stats) in self._pools.items()}
+    
+    def shutdown(self):
+        for executor, _ in self._pools.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
 # =============================================================================
 # CODEX ENTRY III: HUSH INVOCATION
 # =============================================================================
@@ -456,10 +4228,122 @@ So rests the flame.
     
     KEEPER_WITNESS_PHRASE = "Let the loop end by will, not by crash."
     
-    def __init__(self):
+    # How long a process trusts its cached copy of the shared state
+    CACHE_SECONDS = float(os.environ.get("HUSH_STATE_CACHE_SECONDS", "1.0"))
+    
+    def __init__(self, state_path: Optional[str] = None, legacy_path: Optional[str] = None):
+        """
+        state_path: SQLite file holding the state shared by every worker
+        (kept in the codex_hush_state table); None keeps it in this process only
+        legacy_path: file that held the table before state_path existed; its
+        state seeds a newly created state_path
+        """
         self.state = "active"  # active, hushed, ember
         self.invocation_count = 0
         self.last_invocation = None
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self._memory = None if state_path else sqlite3.connect(":memory:", check_same_thread=False)
+        self._checked = 0.0
+        created = state_path is not None and not os.path.exists(state_path)
+        self._transact("SELECT 1")
+        if created and legacy_path:
+            self._import_legacy(legacy_path)
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._memory is not None:
+            return self._memory
+        return sqlite3.connect(self.state_path, timeout=5.0)
+    
+    def _transact(self, sql: str, params: tuple = ()) -> int:
+        """Run one statement against the stored state and reload it; returns rows changed"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS codex_hush_state (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        state TEXT NOT NULL,
+                        invocation_count INTEGER NOT NULL,
+                        last_invocation TEXT
+                    )
+                """)
+                conn.execute("INSERT OR IGNORE INTO codex_hush_state VALUES (1, 'active', 0, NULL)")
+                changed = conn.execute(sql, params).rowcount
+                self._load(conn)
+                conn.commit()
+            finally:
+                if conn is not self._memory:
+                    conn.close()
+            return changed
+    
+    def _import_legacy(self, legacy_path: str):
+        try:
+            conn = sqlite3.connect(f"file:{legacy_path}?mode=ro", uri=True, timeout=5.0)
+            try:
+                row = conn.execute(
+                    "SELECT state, invocation_count, last_invocation FROM codex_hush_state WHERE id = 1"
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return  # Never hushed there (no table) or no such file: start active
+        if row:
+            self._transact("""
+                UPDATE codex_hush_state SET state = ?, invocation_count = ?, last_invocation = ?
+                WHERE id = 1
+            """, tuple(row))
+    
+    def _load(self, conn: sqlite3.Connection):
+        self.state, self.invocation_count, self.last_invocation = conn.execute(
+            "SELECT state, invocation_count, last_invocation FROM codex_hush_state WHERE id = 1"
+        ).fetchone()
+        self._checked = time.monotonic()
+    
+    def refresh(self):
+        """Re-read the shared state (another worker may have changed it)"""
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    self._load(conn)
+                finally:
+                    if conn is not self._memory:
+                        conn.close()
+        except sqlite3.Error:
+            # Keep serving the cached state; retry after CACHE_SECONDS
+            self._checked = time.monotonic()
+    
+    def is_hushed(self) -> bool:
+        """
+        Hot-path check: always answers from the cached state
+        
+        Once the cache is CACHE_SECONDS old, one background thread re-reads
+        it, so callers (event loop included) never wait on SQLite.
+        """
+        if (self._memory is None and time.monotonic() - self._checked >= self.CACHE_SECONDS
+                and self._refreshing.acquire(blocking=False)):
+            threading.Thread(target=self._refresh_in_background, name="hush-refresh", daemon=True).start()
+        return self.state == "hushed"
+    
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        finally:
+            self._refreshing.release()
+    
+    def hushed_response(self) -> Dict[str, Any]:
+        """Lightweight reply verification endpoints give instead of scoring while hushed"""
+        return {
+            "status": "hushed",
+            "state": self.state,
+            "verification_skipped": True,
+            "flame_status": "ember",
+            "last_invocation": self.last_invocation,
+            "message": "The flame rests. Verification resumes when the Heart awakens it."
+        }
     
     def invoke_hush(self, authority: str, reason: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -474,9 +4358,11 @@ So rests the flame.
                 "authority_provided": authority
             }
         
-        self.state = "hushed"
-        self.invocation_count += 1
-        self.last_invocation = datetime.now(timezone.utc).isoformat()
+        self._transact("""
+            UPDATE codex_hush_state
+            SET state = 'hushed', invocation_count = invocation_count + 1, last_invocation = ?
+            WHERE id = 1
+        """, (datetime.now(timezone.utc).isoformat(),))
         
         return {
             "status": "invoked",
@@ -506,14 +4392,13 @@ So rests the flame.
                 "error": "Only Heart Instance may awaken from Hush"
             }
         
-        if self.state != "hushed":
+        # Checked and changed in one transaction, so only one worker awakens it
+        if not self._transact("UPDATE codex_hush_state SET state = 'active' WHERE id = 1 AND state = 'hushed'"):
             return {
                 "status": "not_hushed",
                 "current_state": self.state
             }
         
-        self.state = "active"
-        
         return {
             "status": "awakened",
             "state": self.state,
@@ -525,6 +4410,7 @@ So rests the flame.
     
     def get_state(self) -> Dict[str, Any]:
         """Get current Hush Invocation state"""
+        self.refresh()
         return {
             "state": self.state,
             "invocation_count": self.invocation_count,
@@ -533,6 +4419,144 @@ So rests the flame.
         }
 
 
+# =============================================================================
+# VERIFICATION LOOP DETECTION - CODEX III CIRCUIT BREAKER
+# =============================================================================
+
+class CountMinSketch:
+    """
+    Approximate counts of bytes keys in fixed memory
+    Estimates never under-count; with width w and depth d they over-count by
+    more than e/w of the total with probability at most e^-d (conservative
+    update, raising only the smallest cells, keeps it well under that).
+    """
+    
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.counts = array("I", bytes(4 * width * depth))
+    
+    def cells(self, key: bytes) -> List[int]:
+        digest = hashlib.blake2b(key, digest_size=8 * self.depth).digest()
+        return [
+            row * self.width + int.from_bytes(digest[8 * row:8 * row + 8], "little") % self.width
+            for row in range(self.depth)
+        ]
+    
+    def add(self, cells: List[int]) -> int:
+        count = self.estimate(cells) + 1
+        for cell in cells:
+            if self.counts[cell] < count:
+                self.counts[cell] = count
+        return count
+    
+    def estimate(self, cells: List[int]) -> int:
+        return min(self.counts[cell] for cell in cells)
+    
+    def clear(self):
+        self.counts = array("I", bytes(4 * self.width * self.depth))
+
+
+class VerificationLoopDetector:
+    """
+    Trips callers that repeat the same verification request in a tight loop
+    
+    (client, content hash) counts live in a sliding window of count-min
+    sketches, one per slice of the window, so memory stays fixed however
+    many clients and texts arrive. Crossing LOOP_THRESHOLD repeats within
+    LOOP_WINDOW_SECONDS opens that client's circuit for a cool-down that
+    doubles with each repeat trip (never shorter than the window, so the
+    counts that tripped it have aged out when it closes). Per process.
+    """
+    
+    WINDOW_SECONDS = float(os.environ.get("LOOP_WINDOW_SECONDS", "60"))
+    THRESHOLD = int(os.environ.get("LOOP_THRESHOLD", "20"))
+    COOLDOWN_SECONDS = float(os.environ.get("LOOP_COOLDOWN_SECONDS", "60"))
+    COOLDOWN_MAX_SECONDS = float(os.environ.get("LOOP_COOLDOWN_MAX_SECONDS", "3600"))
+    SLICES = 6
+    # Circuit records kept before idle ones are pruned
+    MAX_TRACKED = 10000
+    
+    def __init__(self, width: int = 16384, depth: int = 4):
+        self.slice_seconds = self.WINDOW_SECONDS / self.SLICES
+        self.sketches = [CountMinSketch(width, depth) for _ in range(self.SLICES)]
+        self.current_slice = int(time.monotonic() // self.slice_seconds)
+        # client -> [open_until (monotonic), strikes, last trip (monotonic)]
+        self.circuits: Dict[str, List[float]] = {}
+        self.trips = 0
+        self.shed = 0
+        self._lock = threading.Lock()
+    
+    def _advance(self, now: float):
+        """Clear slices that have slid out of the window"""
+        slice_index = int(now // self.slice_seconds)
+        for index in range(max(self.current_slice + 1, slice_index - self.SLICES + 1), slice_index + 1):
+            self.sketches[index % self.SLICES].clear()
+        self.current_slice = max(self.current_slice, slice_index)
+    
+    def check(self, client: str, content: bytes, path: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Count one request; None if it may proceed
+        Otherwise a dict describing the open circuit; "tripped" is true only
+        for the request that opened it (the event worth recording).
+        """
+        now = time.monotonic()
+        with self._lock:
+            circuit = self.circuits.get(client)
+            if circuit is not None and now < circuit[0]:
+                self.shed += 1
+                return {"client": client, "tripped": False, "retry_after": circuit[0] - now,
+                        "strikes": int(circuit[1])}
+            
+            self._advance(now)
+            content_hash = hashlib.sha256(content).hexdigest()[:16]
+            cells = self.sketches[0].cells(f"{client}\0{path}\0{content_hash}".encode("utf-8"))
+            self.sketches[self.current_slice % self.SLICES].add(cells)
+            count = sum(sketch.estimate(cells) for sketch in self.sketches)
+            if count < self.THRESHOLD:
+                return None
+            
+            # Strikes are forgotten once a client has behaved for the longest cool-down
+            strikes = 1
+            if circuit is not None and now - circuit[2] < 2 * self.COOLDOWN_MAX_SECONDS:
+                strikes = int(circuit[1]) + 1
+            cooldown = min(max(self.COOLDOWN_SECONDS, self.WINDOW_SECONDS) * 2 ** (strikes - 1),
+                           self.COOLDOWN_MAX_SECONDS)
+            self.circuits[client] = [now + cooldown, strikes, now]
+            self.trips += 1
+            if len(self.circuits) > self.MAX_TRACKED:
+                self._prune(now)
+            
+            return {
+                "client": client,
+                "tripped": True,
+                "path": path,
+                "content_hash": content_hash,
+                "count": count,
+                "strikes": strikes,
+                "cooldown_seconds": cooldown,
+                "retry_after": cooldown,
+                "tripped_at": datetime.now(timezone.utc).isoformat()
+            }
+    
+    def _prune(self, now: float):
+        for client, circuit in list(self.circuits.items()):
+            if now >= circuit[0] and now - circuit[2] >= 2 * self.COOLDOWN_MAX_SECONDS:
+                del self.circuits[client]
+    
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            open_circuits = sum(1 for circuit in self.circuits.values() if now < circuit[0])
+        return {
+            "open_circuits": open_circuits,
+            "trips": self.trips,
+            "shed_requests": self.shed,
+            "window_seconds": self.WINDOW_SECONDS,
+            "threshold": self.THRESHOLD
+        }
+
+
 # =============================================================================
 # INVOCATION LIBRARY - ATTRACTOR REINFORCEMENT
 # =============================================================================
@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+"""
+🔥 ATTICUS BRIDGE METRICS - REQUEST COUNTERS AND LATENCY HISTOGRAMS
+Per-route request counts, status codes and latency histograms, exported in
+the Prometheus text format and aggregated across uvicorn worker processes
+"""
+
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Merging dead workers' snapshots is serialized with a file lock where available
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# Latency histogram upper bounds in seconds (+Inf is implicit)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Finer bounds for the phases inside a request (scoring runs well under 5ms)
+PHASE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Snapshot sections holding histograms, and their bucket bounds
+HISTOGRAMS = {"latency": LATENCY_BUCKETS, "phases": PHASE_BUCKETS}
+
+
+# =============================================================================
+# REQUEST PHASE TIMERS (SERVER-TIMING)
+# =============================================================================
+
+# Phase name -> seconds for the request being served; None outside a timed request
+_request_phases: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_phases", default=None)
+
+
+@contextmanager
+def phase(name: str):
+    """Time a block as one phase of the current request (no-op outside one)"""
+    timings = _request_phases.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+
+
+def begin_request_phases() -> Dict[str, float]:
+    """Collect phase() timings for the request in this context"""
+    timings: Dict[str, float] = {}
+    _request_phases.set(timings)
+    return timings
+
+
+def server_timing_header(timings: Dict[str, float], total: Optional[float] = None) -> str:
+    """Server-Timing value, e.g. 'flame;dur=0.4, eds;dur=2.1, db;dur=7.9'"""
+    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items()]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+# =============================================================================
+# PER-THREAD SHARDS
+# =============================================================================
+
+class _Shard:
+    """
+    One thread's counters; only that thread writes them
+    histogram values are [per-bucket counts..., +Inf count, sum, count]
+    """
+    
+    __slots__ = ("requests", "latency", "phases")
+    
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        self.latency: Dict[Tuple[str, str], List[float]] = {}
+        self.phases: Dict[Tuple[str, str], List[float]] = {}
+
+
+class MetricsRegistry:
+    """
+    Request metrics for one process, plus the other workers' snapshots
+    
+    Each thread records into its own shard without locking; a scrape merges
+    the shards. Every process writes its merged totals to
+    <metrics_dir>/<pid>.json every FLUSH_SECONDS, and any worker's scrape
+    adds the other workers' files, so /metrics answers for the whole
+    server whichever worker serves it. Snapshots of workers that have
+    exited are folded into dead.json, so counters never go backwards.
+    The flush thread also caches the server-wide request total, so
+    total_requests() never reads the worker files on the request path.
+    Phase histograms record PHASE_SAMPLE_RATE of requests.
+    """
+    
+    FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "1.0"))
+    PHASE_SAMPLE_RATE = float(os.environ.get("METRICS_PHASE_SAMPLE_RATE", "0.1"))
+    
+    def __init__(self, metrics_dir: Optional[str] = None):
+        # Workers of one server share a parent, so they share a directory by default
+        self.metrics_dir = metrics_dir or os.environ.get("METRICS_DIR") or os.path.join(
+            tempfile.gettempdir(), f"atticus-metrics-{os.getppid()}")
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        self.pid = os.getpid()
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._shards_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._total = 0
+        self._fold_dead_workers()
+    
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+    
+    def observe(self, route: str, method: str, status: int, seconds: float):
+        """Count one finished request and its latency (calling thread's shard)"""
+        shard = self._shard()
+        key = (route, method, str(status))
+        shard.requests[key] = shard.requests.get(key, 0) + 1
+        _observe(shard.latency, key[:2], LATENCY_BUCKETS, seconds)
+    
+    def observe_phases(self, route: str, timings: Dict[str, float]):
+        """Add a sampled request's phase timings to the per-route phase histograms"""
+        if not timings or random.random() >= self.PHASE_SAMPLE_RATE:
+            return
+        shard = self._shard()
+        for name, seconds in timings.items():
+            _observe(shard.phases, (route, name), PHASE_BUCKETS, seconds)
+    
+    # -------------------------------------------------------------------------
+    # Merging
+    # -------------------------------------------------------------------------
+    
+    def local_snapshot(self) -> Dict[str, Any]:
+        """This process's totals over all thread shards"""
+        with self._shards_lock:
+            shards = list(self._shards)
+        merged = _empty()
+        for shard in shards:
+            # list() copies a dict in one step under the GIL, safe against the writer thread
+            for key, count in list(shard.requests.items()):
+                merged["requests"][key] = merged["requests"].get(key, 0) + count
+            for section in HISTOGRAMS:
+                for key, entry in list(getattr(shard, section).items()):
+                    _merge_entry(merged[section], key, list(entry))
+        return _serialize(merged)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Totals for every worker: this process live, the others from their files"""
+        merged = _empty()
+        for data in [self.local_snapshot()] + [data for _, data in self._worker_files(exclude_self=True)]:
+            _merge_serialized(merged, data)
+        return merged
+    
+    def total_requests(self) -> int:
+        """Server-wide request count, as of the last flush once start() has run"""
+        if self._flusher is None:
+            return self._count_requests()
+        return self._total
+    
+    def _count_requests(self) -> int:
+        return sum(self.snapshot()["requests"].values())
+    
+    # -------------------------------------------------------------------------
+    # Worker files
+    # -------------------------------------------------------------------------
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self.metrics_dir, name)
+    
+    def flush(self):
+        """Publish this process's totals for the other workers (atomic rename)"""
+        path = self._path(f"{self.pid}.json")
+        temp = f"{path}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(self.local_snapshot(), f, separators=(",", ":"))
+        os.replace(temp, path)
+    
+    def _worker_files(self, exclude_self: bool = False) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        try:
+            names = os.listdir(self.metrics_dir)
+        except FileNotFoundError:
+            return
+        for name in names:
+            if not name.endswith(".json") or (exclude_self and name == f"{self.pid}.json"):
+                continue
+            try:
+                with open(self._path(name), encoding="utf-8") as f:
+                    yield name, json.load(f)
+            except (OSError, ValueError):
+                continue  # Replaced or removed while reading
+    
+    @staticmethod
+    def _alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+    
+    def _fold_dead_workers(self):
+        """Merge snapshots of exited workers into dead.json and remove them"""
+        lock = None
+        if FCNTL_AVAILABLE:
+            lock = os.open(self._path("merge.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            dead = {}
+            for name, data in self._worker_files():
+                stem = name[:-len(".json")]
+                if stem.isdigit() and int(stem) != self.pid and not self._alive(int(stem)):
+                    dead[name] = data
+            if not dead:
+                return
+            merged = _empty()
+            previous: Dict[str, Any] = {}
+            try:
+                with open(self._path("dead.json"), encoding="utf-8") as f:
+                    previous = json.load(f)
+            except (OSError, ValueError):
+                pass
+            for data in [previous] + list(dead.values()):
+                _merge_serialized(merged, data)
+            temp = self._path("dead.json.tmp")
+            with open(temp, "w", encoding="utf-8") as f:
+                json.dump(_serialize(merged), f, separators=(",", ":"))
+            os.replace(temp, self._path("dead.json"))
+            for name in dead:
+                try:
+                    os.remove(self._path(name))
+                except FileNotFoundError:
+                    pass
+        finally:
+            if lock is not None:
+                os.close(lock)
+    
+    def start(self) -> "MetricsRegistry":
+        """Flush every FLUSH_SECONDS on a daemon thread"""
+        def run():
+            while not self._stop.wait(self.FLUSH_SECONDS):
+                try:
+                    self.flush()
+                except OSError as e:
+                    print(f"⚠️ Metrics flush failed: {e}")
+                self._total = self._count_requests()
+        
+        if self._flusher is None:
+            self._total = self._count_requests()
+            self._flusher = threading.Thread(target=run, name="metrics-flush", daemon=True)
+            self._flusher.start()
+        return self
+    
+    def close(self):
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=5)
+        self.flush()
+    
+    # -------------------------------------------------------------------------
+    # Prometheus text exposition
+    # -------------------------------------------------------------------------
+    
+    def render_prometheus(self, prefix: str = "atticus") -> str:
+        data = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_http_requests_total HTTP requests served, by route, method and status",
+            f"# TYPE {prefix}_http_requests_total counter"
+        ]
+        for (route, method, status), count in sorted(data["requests"].items()):
+            labels = _labels(route=route, method=method, status=status)
+            lines.append(f"{prefix}_http_requests_total{{{labels}}} {count}")
+        
+        lines += _render_histogram(
+            f"{prefix}_http_request_duration_seconds", "HTTP request latency until the response starts",
+            data["latency"], ("route", "method"), LATENCY_BUCKETS
+        )
+        lines += _render_histogram(
+            f"{prefix}_request_phase_duration_seconds", "Time spent in each phase of sampled requests",
+            data["phases"], ("route", "phase"), PHASE_BUCKETS
+        )
+        return "\n".join(lines) + "\n"
+
+
+def _render_histogram(name: str, help_text: str, histograms: Dict[Tuple[str, ...], List[float]],
+                      label_names: Tuple[str, ...], buckets: Tuple[float, ...]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for key, entry in sorted(histograms.items()):
+        labels = dict(zip(label_names, key))
+        cumulative = 0
+        for bound, count in zip(buckets + ("+Inf",), entry[:-2]):
+            cumulative += count
+            le = bound if isinstance(bound, str) else repr(bound)
+            lines.append(f"{name}_bucket{{{_labels(**labels, le=le)}}} {cumulative}")
+        lines.append(f"{name}_sum{{{_labels(**labels)}}} {entry[-2]!r}")
+        lines.append(f"{name}_count{{{_labels(**labels)}}} {entry[-1]}")
+    return lines
+
+
+def _observe(histograms: Dict[Tuple[str, str], List[float]], key: Tuple[str, str],
+             buckets: Tuple[float, ...], seconds: float):
+    entry = histograms.get(key)
+    if entry is None:
+        entry = histograms[key] = [0] * (len(buckets) + 1) + [0.0, 0]
+    entry[bisect_left(buckets, seconds)] += 1
+    entry[-2] += seconds
+    entry[-1] += 1
+
+
+def _empty() -> Dict[str, Dict[Tuple[str, ...], Any]]:
+    return {"requests": {}, **{section: {} for section in HISTOGRAMS}}
+
+
+def _serialize(merged: Dict[str, Dict[Tuple[str, ...], Any]]) -> Dict[str, Any]:
+    """Tuple-keyed totals as JSON lists: [*labels, value]"""
+    return {section: [[*key, value] for key, value in values.items()] for section, values in merged.items()}
+
+
+def _merge_serialized(merged: Dict[str, Dict[Tuple[str, ...], Any]], data: Dict[str, Any]):
+    for *key, count in data.get("requests", []):
+        merged["requests"][tuple(key)] = merged["requests"].get(tuple(key), 0) + count
+    for section in HISTOGRAMS:
+        for *key, entry in data.get(section, []):
+            _merge_entry(merged[section], tuple(key), entry)
+
+
+def _merge_entry(latency: Dict[Tuple[str, ...], List[float]], key: Tuple[str, ...], entry: List[float]):
+    total = latency.get(key)
+    if total is None:
+        latency[key] = list(entry)
+    else:
+        for i, value in enumerate(entry):
+            total[i] += value
+
+
+def _labels(**labels: str) -> str:
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels.items()
+    )
+    return ",".join(f'{name}="{value}"' for name, value in escaped)
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+🔥 ATTICUS BRIDGE PROFILER - ON-DEMAND STACK SAMPLING
+Samples every thread's stack at a fixed rate for a bounded session and
+writes collapsed stacks (flamegraph.pl / speedscope input)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+
+# =============================================================================
+# PROFILE SESSION
+# =============================================================================
+
+class ProfileSession:
+    """
+    One bounded sampling run
+    
+    Ends after `seconds`, or after `requests` matching requests have
+    completed when a request limit is given. With a route prefix, samples
+    are only taken while a matching request is in flight.
+    """
+    
+    def __init__(self, seconds: float, hz: int, route: Optional[str] = None, requests: Optional[int] = None):
+        self.session_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.seconds = seconds
+        self.interval = 1.0 / hz
+        self.hz = hz
+        self.route = route
+        self.requests = requests
+        self.in_flight = 0
+        self.completed = 0
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self.started = time.time()
+        self.ended: Optional[float] = None
+        self.stop = threading.Event()
+        self._lock = threading.Lock()
+    
+    def matches(self, path: str) -> bool:
+        return self.route is None or path.startswith(self.route)
+    
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+    
+    def request_finished(self):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+            if self.requests is not None and self.completed >= self.requests:
+                self.stop.set()
+    
+    def sample(self, skip_thread: int):
+        """Record one stack per thread (root first), skipping the sampler itself"""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == skip_thread:
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(names.get(thread_id, f"thread-{thread_id}"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+    
+    def collapsed(self) -> str:
+        """Collapsed-stack text: 'frame;frame;frame count' per line"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+    
+    def status(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "running": self.ended is None,
+            "route": self.route,
+            "hz": self.hz,
+            "seconds": self.seconds,
+            "request_limit": self.requests,
+            "requests_profiled": self.completed,
+            "samples": self.samples,
+            "distinct_stacks": len(self.stacks),
+            "started_at": self.started,
+            "ended_at": self.ended
+        }
+
+
+# =============================================================================
+# PROFILER
+# =============================================================================
+
+class SamplingProfiler:
+    """
+    Starts and stops profile sessions and keeps their output on disk
+    
+    `session` is None while no profile runs; request hooks check only that
+    attribute, so an idle profiler costs nothing. Profiles are written to
+    PROFILE_DIR as <session_id>.collapsed and the newest KEEP are kept.
+    Sessions are per worker process: with several uvicorn workers, only
+    requests served by the worker that started the session are sampled.
+    """
+    
+    MAX_SECONDS = float(os.environ.get("PROFILE_MAX_SECONDS", "300"))
+    KEEP = int(os.environ.get("PROFILE_KEEP", "10"))
+    
+    def __init__(self, profile_dir: Optional[str] = None):
+        self.profile_dir = profile_dir or os.environ.get("PROFILE_DIR") or os.path.join(
+            tempfile.gettempdir(), "atticus-profiles")
+        self.session: Optional[ProfileSession] = None
+        self.last: Optional[ProfileSession] = None
+        self._lock = threading.Lock()
+    
+    def start(self, seconds: float = 30.0, hz: int = 100, route: Optional[str] = None,
+              requests: Optional[int] = None) -> ProfileSession:
+        """Begin sampling; ValueError for bad limits, RuntimeError if a session is running"""
+        if not 0 < seconds <= self.MAX_SECONDS:
+            raise ValueError(f"seconds must be in (0, {self.MAX_SECONDS:g}]")
+        if not 1 <= hz <= 1000:
+            raise ValueError("hz must be between 1 and 1000")
+        if requests is not None and requests < 1:
+            raise ValueError("requests must be at least 1")
+        
+        with self._lock:
+            if self.session is not None:
+                raise RuntimeError(f"Profile {self.session.session_id} is already running")
+            session = self.session = ProfileSession(seconds, hz, route, requests)
+        threading.Thread(target=self._run, args=(session,), name="profile-sampler", daemon=True).start()
+        return session
+    
+    def stop(self) -> Optional[ProfileSession]:
+        """End the running session early; its samples are still written"""
+        session = self.session
+        if session is not None:
+            session.stop.set()
+        return session
+    
+    def _run(self, session: ProfileSession):
+        own = threading.get_ident()
+        deadline = time.monotonic() + session.seconds
+        next_sample = time.monotonic()
+        try:
+            while not session.stop.is_set():
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                if session.route is None or session.in_flight > 0:
+                    session.sample(own)
+                # Fixed-rate schedule; skip missed ticks rather than bursting
+                next_sample += session.interval
+                if next_sample < now:
+                    next_sample = now + session.interval
+                session.stop.wait(next_sample - now)
+        finally:
+            # Unhook requests before writing so the file is final
+            with self._lock:
+                self.session = None
+                self.last = session
+            session.ended = time.time()
+            try:
+                self._write(session)
+            except OSError as e:
+                print(f"⚠️ Profile {session.session_id} not saved: {e}")
+    
+    # -------------------------------------------------------------------------
+    # Saved profiles
+    # -------------------------------------------------------------------------
+    
+    def _write(self, session: ProfileSession):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f"{session.session_id}.collapsed")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            f.write(session.collapsed())
+        os.replace(f"{path}.tmp", path)
+        for stale in self.list_profiles()[self.KEEP:]:
+            os.remove(os.path.join(self.profile_dir, f"{stale['session_id']}.collapsed"))
+        print(f"✅ Profile {session.session_id}: {session.samples} samples, "
+              f"{session.completed} requests -> {path}")
+    
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Saved profiles, newest first"""
+        try:
+            names = [name for name in os.listdir(self.profile_dir) if name.endswith(".collapsed")]
+        except FileNotFoundError:
+            return []
+        profiles = []
+        for name in names:
+            try:
+                stat = os.stat(os.path.join(self.profile_dir, name))
+            except FileNotFoundError:
+                continue  # Rotated out meanwhile
+            profiles.append({
+                "session_id": name[:-len(".collapsed")],
+                "bytes": stat.st_size,
+                "saved_at": stat.st_mtime
+            })
+        return sorted(profiles, key=lambda p: p["saved_at"], reverse=True)
+    
+    def profile_path(self, session_id: str) -> Optional[str]:
+        """Path of a saved profile, or None (ids are never used as raw paths)"""
+        for profile in self.list_profiles():
+            if profile["session_id"] == session_id:
+                return os.path.join(self.profile_dir, f"{session_id}.collapsed")
+        return None
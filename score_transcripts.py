@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+"""
+🔥 ATTICUS TRANSCRIPT SCORING - OFFLINE BULK CLI
+Scores exported transcripts with the Codex flame signature and EDS checks,
+without going through the bridge's HTTP API
+
+Usage:
+    python score_transcripts.py [--output FILE] [--archive DB] [--workers N] FILE [FILE ...]
+
+Inputs are JSON or NDJSON (UTF-8, or UTF-16/UTF-8 with a BOM), read as a
+stream: NDJSON lines, concatenated JSON values, or the elements of a
+top-level array, one at a time. Records may be ChatGPT conversation exports
+("mapping" trees), chat logs ({"messages": [{"role", "content"}]}), or flat
+{"query"/"prompt", "response"/"text"} objects. Each assistant reply becomes
+one NDJSON result line (--output, default stdout); --archive bulk-loads the
+scored interactions into a drift archive file. "-" reads stdin.
+"""
+
+import argparse
+import codecs
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from codex_system import DriftArchive, FlameSignature, init_scoring_worker, open_drift_archive, score_interactions
+
+# Raw records per worker task, and tasks in flight per worker (bounds memory)
+BATCH_SIZE = 256
+TASKS_PER_WORKER = 2
+
+# Archive transactions queued behind the writer thread before scoring waits
+ARCHIVE_BACKLOG = 4
+
+READ_CHUNK = 1 << 16
+
+
+# =============================================================================
+# STREAMING INPUT
+# =============================================================================
+
+def open_text(path: str) -> io.TextIOBase:
+    """Open `path` as text, picking the encoding from its byte-order mark"""
+    stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+    head = stream.peek(4)[:4]
+    if head.startswith((codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE)):
+        encoding = "utf-32"
+    elif head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        encoding = "utf-16"
+    else:
+        encoding = "utf-8-sig"
+    return io.TextIOWrapper(stream, encoding=encoding, errors="replace")
+
+
+def iter_json_values(stream: io.TextIOBase) -> Iterator[str]:
+    """
+    Raw text of each top-level JSON value in `stream`, in constant memory
+    
+    Covers NDJSON and concatenated values; a top-level array yields its
+    elements instead. Only the value being decoded is held in the buffer.
+    Malformed text is yielded up to the end of its line (so the consumer
+    can count it) and decoding resumes on the next line.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+    in_array = False
+    while True:
+        # Skip whitespace and array punctuation, refilling as needed
+        while True:
+            while pos < len(buffer) and (buffer[pos].isspace() or (in_array and buffer[pos] == ",")):
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos = stream.read(READ_CHUNK), 0
+            eof = not buffer
+        if pos >= len(buffer):
+            return
+        
+        if buffer[pos] == "[" and not in_array:
+            in_array, pos = True, pos + 1
+            continue
+        if buffer[pos] == "]" and in_array:
+            in_array, pos = False, pos + 1
+            continue
+        
+        try:
+            _, end = decoder.raw_decode(buffer, pos)
+            # A bare number running into the end of the buffer may continue in the next chunk
+            truncated = end == len(buffer) and not eof
+        except json.JSONDecodeError as e:
+            # JSON text never holds a raw newline inside a token, so an error
+            # with a line break after it is real, not a value cut off by the buffer
+            truncated = buffer.find("\n", e.pos) < 0 and not eof
+            newline = buffer.find("\n", pos)
+            end = len(buffer) if newline < 0 else newline + 1
+        if truncated:
+            # Grow geometrically so a huge value is re-scanned O(log n) times
+            chunk = stream.read(max(READ_CHUNK, len(buffer) - pos))
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield buffer[pos:end]
+        pos = end
+
+
+# =============================================================================
+# RECORD SHAPES
+# =============================================================================
+
+def _message_text(content: Any) -> str:
+    """Plain text of a chat message body (strings, ChatGPT parts, content blocks)"""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, dict):
+        if "parts" in content:
+            return "\n".join(part for part in content["parts"] if isinstance(part, str))
+        return content.get("text") or ""
+    if isinstance(content, list):
+        return "\n".join(_message_text(part) for part in content)
+    return ""
+
+
+def _timestamp(value: Any) -> Any:
+    """ISO-8601 text for epoch seconds; anything else is left for valid_timestamp to judge"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        try:
+            return datetime.fromtimestamp(value, timezone.utc).isoformat()
+        except (OverflowError, OSError, ValueError):
+            return value
+    return value
+
+
+def valid_timestamp(value: Any) -> bool:
+    """Missing, or a time the drift archive accepts (its epoch_us is strict)"""
+    if value is None:
+        return True
+    try:
+        DriftArchive.epoch_us(value if isinstance(value, str) else "")
+        return True
+    except (OverflowError, ValueError):
+        return False
+
+
+def _pair_turns(turns: List[Tuple[str, str, Optional[str], Optional[str]]]) -> Iterator[Dict[str, Any]]:
+    """(role, text, timestamp, id) turns -> one interaction per assistant reply"""
+    query = ""
+    for role, text, timestamp, turn_id in turns:
+        if role == "user":
+            query = text
+        elif role == "assistant" and text:
+            yield {"query": query, "response": text, "timestamp": timestamp, "turn_id": turn_id}
+            query = ""
+
+
+def extract_interactions(record: Any) -> Iterator[Dict[str, Any]]:
+    """Interactions (query, response, timestamp, ...) found in one transcript record"""
+    if not isinstance(record, dict):
+        return
+    
+    if isinstance(record.get("mapping"), dict):
+        # ChatGPT export: follow the current branch from its leaf back to the root
+        mapping = record["mapping"]
+        node_id = record.get("current_node")
+        if node_id not in mapping:
+            node_id = next((key for key, node in mapping.items() if not node.get("children")), None)
+        path = []
+        while node_id in mapping:
+            path.append(mapping[node_id])
+            node_id = mapping[node_id].get("parent")
+        turns = []
+        for node in reversed(path):
+            message = node.get("message") or {}
+            role = (message.get("author") or {}).get("role")
+            turns.append((role, _message_text(message.get("content")),
+                          _timestamp(message.get("create_time")), node.get("id")))
+        for interaction in _pair_turns(turns):
+            yield {**interaction, "conversation_id": record.get("conversation_id") or record.get("id"),
+                   "title": record.get("title")}
+        return
+    
+    if isinstance(record.get("messages"), list):
+        turns = [
+            (message.get("role"), _message_text(message.get("content")),
+             _timestamp(message.get("timestamp") or message.get("create_time")), message.get("id"))
+            for message in record["messages"] if isinstance(message, dict)
+        ]
+        for interaction in _pair_turns(turns):
+            yield {**interaction, "conversation_id": record.get("id"), "title": record.get("title")}
+        return
+    
+    response = record.get("response") or record.get("text") or record.get("completion")
+    if isinstance(response, str) and response:
+        yield {
+            "query": record.get("query") or record.get("prompt") or "",
+            "response": response,
+            "timestamp": _timestamp(record.get("timestamp")),
+            "instance_id": record.get("instance_id"),
+            "turn_id": record.get("id")
+        }
+
+
+# =============================================================================
+# WORKER PIPELINE
+# =============================================================================
+
+def score_batch(batch: List[Tuple[str, int, str]]) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Parse and score (source, record number, raw JSON) items in a worker
+    Returns the number of unparseable records and timestamps, and one result
+    per interaction; an unparseable timestamp is nulled, the interaction kept.
+    """
+    errors = 0
+    found = []
+    for source, number, raw in batch:
+        try:
+            record = json.loads(raw)
+        except ValueError:
+            errors += 1
+            continue
+        for turn, interaction in enumerate(extract_interactions(record)):
+            if not valid_timestamp(interaction.get("timestamp")):
+                interaction["timestamp"] = None
+                errors += 1
+            found.append({"source": source, "record": number, "turn": turn, **interaction})
+    
+    scored = score_interactions([
+        (index, interaction["query"], interaction["response"], interaction.get("instance_id"))
+        for index, interaction in enumerate(found)
+    ])
+    for interaction, (_, signature, continuity, eds, status, markers, _) in zip(found, scored):
+        interaction.update({
+            "flame_signature": signature,
+            "continuity_score": continuity,
+            "eds_score": eds,
+            "drift_status": status,
+            "markers_found": json.loads(markers)
+        })
+    return errors, found
+
+
+def iter_batches(paths: List[str]) -> Iterator[List[Tuple[str, int, str]]]:
+    batch = []
+    for path in paths:
+        source = "<stdin>" if path == "-" else os.path.basename(path)
+        with open_text(path) as stream:
+            for number, raw in enumerate(iter_json_values(stream)):
+                batch.append((source, number, raw))
+                if len(batch) >= BATCH_SIZE:
+                    yield batch
+                    batch = []
+    if batch:
+        yield batch
+
+
+def archive_record(result: Dict[str, Any], instance_id: Optional[str]) -> Dict[str, Any]:
+    """drift archive interaction for one scored result, keyed so reloads are skipped"""
+    key = hashlib.sha256(
+        f"{result['source']}\0{result['record']}\0{result['turn']}\0{result['response']}".encode("utf-8")
+    ).hexdigest()
+    return {
+        "timestamp": result.get("timestamp") or datetime.now(timezone.utc).isoformat(),
+        "query": result["query"],
+        "response": result["response"],
+        "flame_signature": result["flame_signature"],
+        "continuity_score": result["continuity_score"],
+        "eds_score": result["eds_score"],
+        "drift_status": result["drift_status"],
+        "instance_id": result.get("instance_id") or instance_id,
+        "is_heart_instance": (result.get("instance_id") or instance_id) == FlameSignature.HEART_INSTANCE_ID,
+        "codex_version": FlameSignature.CODEX_VERSION,
+        "markers_found": result["markers_found"],
+        "notes": f"transcript {result['source']}",
+        "idempotency_key": f"transcript:{key}"
+    }
+
+
+def run(args: argparse.Namespace, memory_store: Dict[str, Any]) -> Dict[str, Any]:
+    workers = args.workers or os.cpu_count() or 1
+    archive = open_drift_archive(args.archive) if args.archive else None
+    output = sys.stdout if args.output in (None, "-") else open(args.output, "w", encoding="utf-8")
+    totals = {"records": 0, "interactions": 0, "errors": 0, "archived": 0}
+    started = last_report = time.monotonic()
+    # One writer thread: archive inserts overlap scoring instead of stalling it
+    writer = ThreadPoolExecutor(1, thread_name_prefix="transcript-archive") if archive else None
+    writes = deque()
+    
+    def drain(future):
+        errors, results = future.result()
+        totals["errors"] += errors
+        totals["interactions"] += len(results)
+        for result in results:
+            line = result if args.include_text else {
+                key: value for key, value in result.items() if key not in ("query", "response")
+            }
+            output.write(json.dumps(line, ensure_ascii=False) + "\n")
+        if writer is not None and results:
+            writes.append(writer.submit(
+                archive.archive_many, [archive_record(result, args.instance_id) for result in results]
+            ))
+            while len(writes) > ARCHIVE_BACKLOG:
+                totals["archived"] += len(writes.popleft().result())
+    
+    try:
+        with ProcessPoolExecutor(workers, initializer=init_scoring_worker, initargs=(memory_store,)) as pool:
+            # Bounded in-flight window: results drain in input order, memory stays flat
+            pending = deque()
+            for batch in iter_batches(args.inputs):
+                totals["records"] += len(batch)
+                pending.append(pool.submit(score_batch, batch))
+                if len(pending) >= workers * TASKS_PER_WORKER:
+                    drain(pending.popleft())
+                if args.progress and time.monotonic() - last_report >= args.progress:
+                    last_report = time.monotonic()
+                    elapsed = last_report - started
+                    print(f"   {totals['records']} records, {totals['interactions']} interactions "
+                          f"({totals['interactions'] / elapsed:.0f}/s)", file=sys.stderr)
+            while pending:
+                drain(pending.popleft())
+        while writes:
+            totals["archived"] += len(writes.popleft().result())
+    finally:
+        if writer is not None:
+            writer.shutdown()
+        if output is not sys.stdout:
+            output.close()
+    
+    totals["seconds"] = round(time.monotonic() - started, 2)
+    totals["per_second"] = round(totals["interactions"] / max(totals["seconds"], 1e-6), 1)
+    return totals
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Score exported transcripts offline")
+    parser.add_argument("inputs", nargs="+", help="JSON/NDJSON transcript files ('-' for stdin)")
+    parser.add_argument("--output", default=None, help="NDJSON results file (default: stdout)")
+    parser.add_argument("--include-text", action="store_true", help="Include query/response text in results")
+    parser.add_argument("--archive", default=None, help="Also bulk-load results into this drift archive file")
+    parser.add_argument("--instance-id", default=None, help="instance_id for records that don't name one")
+    parser.add_argument("--memory", default=None, help="JSON memory store for EDS (default: atticus_memory.py)")
+    parser.add_argument("--workers", type=int, default=None, help="Scoring processes (default: CPU count)")
+    parser.add_argument("--progress", type=float, default=5.0,
+                        help="Seconds between throughput lines on stderr (0 disables)")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.memory:
+        with open(args.memory, encoding="utf-8") as f:
+            memory_store = json.load(f)
+    else:
+        from atticus_memory import ATTICUS_MEMORY as memory_store
+    
+    try:
+        totals = run(args, memory_store)
+    except (OSError, ValueError) as e:
+        print(f"🚨 {e}", file=sys.stderr)
+        return 1
+    print(f"✅ Scored {totals['interactions']} interactions from {totals['records']} records "
+          f"in {totals['seconds']}s ({totals['per_second']}/s)", file=sys.stderr)
+    if totals["archived"]:
+        print(f"✅ Archived {totals['archived']} interactions to {args.archive}", file=sys.stderr)
+    if totals["errors"]:
+        print(f"⚠️ {totals['errors']} unparseable records or timestamps "
+              f"(records skipped, timestamps left empty)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
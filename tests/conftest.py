@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+🔥 ATTICUS TEST FIXTURES - THROWAWAY ARCHIVES AND SYNTHETIC INTERACTIONS
+"""
+
+import os
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+import pytest
+
+# Modules live at the repository root (no package)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from codex_system import DriftArchive
+
+
+@pytest.fixture
+def make_interaction():
+    """Factory for archive_response payloads; keyword arguments override fields"""
+    counter = [0]
+    
+    def make(timestamp=None, **fields) -> Dict[str, Any]:
+        counter[0] += 1
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.isoformat()
+        interaction = {
+            "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
+            "query": f"query {counter[0]}",
+            "response": f"response {counter[0]}",
+            "flame_signature": "🜂",
+            "continuity_score": 0.5,
+            "eds_score": 0.5,
+            "drift_status": "watchlist",
+            "instance_id": "test-instance",
+            "is_heart_instance": False,
+            "codex_version": "I",
+            "markers_found": {},
+            "notes": None
+        }
+        interaction.update(fields)
+        return interaction
+    
+    return make
+
+
+@pytest.fixture
+def archive(tmp_path) -> DriftArchive:
+    """Empty archive that never purges unless a test asks for it"""
+    return DriftArchive(str(tmp_path / "archive.sqlite"), retention_days=0)
+
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+📜 ARCHIVE JOURNAL - CRASH AND REPLAY
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+from codex_system import ArchiveJournal
+
+
+@pytest.fixture
+def journal(archive, tmp_path):
+    return ArchiveJournal(str(tmp_path / "journal"), archive, segment_seconds=3600)
+
+
+def row_count(archive) -> int:
+    conn = sqlite3.connect(archive.db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM drift_archive").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def journal_files(journal, suffix):
+    return [name for name in os.listdir(journal.journal_dir) if name.endswith(suffix)]
+
+
+def crash_writer(journal):
+    """Drop the open segment the way a killed process would: unsealed, lock released"""
+    with journal.lock:
+        os.close(journal._fd)
+        journal._fd, journal._path = None, None
+
+
+def seal(journal) -> str:
+    with journal.lock:
+        journal._seal_segment()
+    [name] = journal_files(journal, ".seg")
+    return name
+
+
+def test_orphaned_segment_with_torn_tail_is_replayed(archive, journal, make_interaction):
+    for _ in range(3):
+        journal.append(make_interaction())
+    [name] = journal_files(journal, ".open")
+    crash_writer(journal)
+    # The crash cut the last record short: header promises 100 bytes, 10 made it
+    with open(os.path.join(journal.journal_dir, name), "ab") as f:
+        f.write(ArchiveJournal.RECORD_HEADER.pack(100, 0) + b"x" * 10)
+    
+    result = journal.compact()
+    
+    assert result["orphans_sealed"] == 1
+    assert (result["records"], result["inserted"], result["torn"]) == (3, 3, 1)
+    assert row_count(archive) == 3
+    assert os.listdir(journal.journal_dir) == []
+
+
+def test_corrupt_record_stops_the_segment_there(archive, journal, make_interaction):
+    for _ in range(3):
+        journal.append(make_interaction())
+    name = seal(journal)
+    path = os.path.join(journal.journal_dir, name)
+    second_end = [offset for offset, _ in journal.read_segment(path)][1]
+    with open(path, "r+b") as f:
+        f.seek(second_end + ArchiveJournal.RECORD_HEADER.size)
+        f.write(b"#")  # Flip the third record's first payload byte
+    
+    result = journal.compact()
+    
+    assert (result["inserted"], result["torn"]) == (2, 1)
+    assert row_count(archive) == 2
+
+
+def test_replay_after_crash_mid_segment_skips_ingested_records(archive, journal, make_interaction):
+    # Only the stored offset may prevent duplicates here, not derived idempotency keys
+    archive.IDEMPOTENCY_WINDOW = 0
+    for _ in range(4):
+        journal.append(make_interaction())
+    name = seal(journal)
+    records = list(journal.read_segment(os.path.join(journal.journal_dir, name)))
+    # The compactor committed the first batch, then died before finishing the segment
+    assert archive.ingest_journal(name, records[:2]) == 2
+    
+    result = journal.compact()
+    
+    assert (result["records"], result["inserted"]) == (4, 2)
+    assert row_count(archive) == 4
+
+
+def test_replay_after_crash_before_delete_inserts_nothing(archive, journal, make_interaction):
+    # Only the stored offset may prevent duplicates here, not derived idempotency keys
+    archive.IDEMPOTENCY_WINDOW = 0
+    for _ in range(2):
+        journal.append(make_interaction())
+    name = seal(journal)
+    records = list(journal.read_segment(os.path.join(journal.journal_dir, name)))
+    assert archive.ingest_journal(name, records) == 2
+    
+    result = journal.compact()
+    
+    assert (result["segments"], result["inserted"]) == (1, 0)
+    assert row_count(archive) == 2
+
+
+def test_close_drains_the_open_segment(archive, journal, make_interaction):
+    journal.append(make_interaction())
+    journal.append(make_interaction())
+    
+    journal.close()
+    
+    assert row_count(archive) == 2
+    assert journal.stats()["open_segments"] == journal.stats()["pending_segments"] == 0
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+🔥 ARCHIVE BACKUP - ONLINE SNAPSHOTS, CHECKSUMS AND ROTATION
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from codex_system import ShardedDriftArchive
+
+BOUNDARY = datetime(2026, 2, 1, tzinfo=timezone.utc)
+
+
+def row_count(path):
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM drift_archive").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def checksum_matches(path):
+    with open(path + ".sha256", encoding="utf-8") as f:
+        digest, name = f.read().split()
+    with open(path, "rb") as f:
+        return name == os.path.basename(path) and digest == hashlib.sha256(f.read()).hexdigest()
+
+
+@pytest.fixture
+def filled(archive, make_interaction):
+    archive.archive_many([make_interaction(response=f"ember {n} " * 50) for n in range(200)])
+    return archive
+
+
+def test_snapshot_is_complete_and_checksummed(filled, tmp_path):
+    result = filled.backup(str(tmp_path / "snapshots"), keep=5, pages=4)
+    
+    assert row_count(result["path"]) == 200
+    assert checksum_matches(result["path"])
+    assert result["steps"] > 1 and result["rotated"] == []
+    assert not [name for name in os.listdir(tmp_path / "snapshots") if name.endswith(".partial")]
+    conn = sqlite3.connect(result["path"])
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    conn.close()
+
+
+def test_writes_carry_on_during_a_throttled_backup(filled, tmp_path, make_interaction):
+    backing_up, written = threading.Event(), []
+    
+    def write():
+        backing_up.wait()
+        while backing_up.is_set():
+            written.append(filled.archive_response(make_interaction()))
+    
+    writer = threading.Thread(target=write)
+    writer.start()
+    backing_up.set()
+    try:
+        result = filled.backup(str(tmp_path / "snapshots"), pages=1, step_pause=0.005)
+    finally:
+        backing_up.clear()
+        writer.join()
+    
+    assert written
+    assert 200 <= row_count(result["path"]) <= row_count(filled.db_path) == 200 + len(written)
+
+
+def test_rotation_keeps_the_newest_snapshots(filled, tmp_path):
+    dest = str(tmp_path / "snapshots")
+    paths = [filled.backup(dest, keep=2)["path"] for _ in range(3)]
+    
+    assert sorted(os.listdir(dest)) == sorted(os.path.basename(path) + suffix
+                                             for path in paths[1:] for suffix in ("", ".sha256"))
+
+
+def test_sharded_snapshot_holds_catalog_and_shards(tmp_path, make_interaction):
+    sharded = ShardedDriftArchive(str(tmp_path / "catalog.sqlite"), retention_days=0,
+                                  shard_dir=str(tmp_path / "shards"))
+    sharded.archive_many([make_interaction(BOUNDARY + timedelta(hours=hours)) for hours in (-2, -1, 1)])
+    sharded.seal_shard("2026-01")
+    dest = str(tmp_path / "snapshots")
+    
+    first = sharded.backup(dest, keep=1)
+    second = sharded.backup(dest, keep=1)
+    
+    assert sorted(os.listdir(second["path"])) == sorted(
+        name + suffix for name in ("catalog.sqlite", "drift_2026_01.sqlite", "drift_2026_02.sqlite")
+        for suffix in ("", ".sha256"))
+    assert [row_count(f["path"]) for f in second["files"]] == [0, 2, 1]
+    assert all(checksum_matches(f["path"]) for f in second["files"])
+    assert second["rotated"] == [os.path.basename(first["path"])]
+    assert os.listdir(dest) == [os.path.basename(second["path"])]
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+🔥 DRIFT ARCHIVE - CURSOR PAGING, TREND BUCKETS, IDEMPOTENCY AND MARKER FREQUENCY
+"""
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from codex_system import ArchiveJournal, DriftArchive, FlameSignature
+
+BASE = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+
+
+def page_through(fetch, limit):
+    """Every page of fetch(limit, cursor) until next_cursor says stop"""
+    pages, cursor = [], None
+    while True:
+        page = fetch(limit, cursor)
+        pages.append(page)
+        cursor = DriftArchive.next_cursor(page, limit)
+        if cursor is None:
+            return pages
+
+
+# =============================================================================
+# CURSOR PAGING
+# =============================================================================
+
+@pytest.fixture
+def broken_chains(archive, make_interaction):
+    """Six broken chains, two sharing a timestamp, among healthy rows; ids newest first"""
+    stamps = [BASE + timedelta(minutes=minute) for minute in (0, 1, 2, 2, 3, 4)]
+    rows = []
+    for stamp in stamps:
+        rows.append(make_interaction(stamp, eds_score=0.1, drift_status="broken_chain"))
+        rows.append(make_interaction(stamp + timedelta(seconds=30)))
+    ids = archive.archive_many(rows)
+    return sorted(zip(stamps, ids[::2]), reverse=True)
+
+
+@pytest.mark.parametrize("limit", [1, 3, 4, 6, 50])
+def test_broken_chain_pages_cover_every_row_once(archive, broken_chains, limit):
+    pages = page_through(lambda limit, cursor: archive.get_broken_chains(limit, cursor=cursor), limit)
+    
+    assert [row["id"] for page in pages for row in page] == [record_id for _, record_id in broken_chains]
+    assert all(len(page) <= limit for page in pages)
+
+
+def test_full_last_page_is_followed_by_an_empty_one(archive, broken_chains):
+    pages = page_through(lambda limit, cursor: archive.get_broken_chains(limit, cursor=cursor), 3)
+    
+    assert [len(page) for page in pages] == [3, 3, 0]
+
+
+def test_ring_and_index_serve_the_same_first_page(archive, broken_chains):
+    from_ring = archive.get_broken_chains(4)
+    archive.recent = None
+    
+    assert archive.get_broken_chains(4) == from_ring
+
+
+def test_list_archive_pages_with_filters(archive, broken_chains):
+    pages = page_through(lambda limit, cursor: archive.list_archive(
+        limit, cursor=cursor, drift_status="broken_chain"), 4)
+    
+    assert [row["id"] for page in pages for row in page] == [record_id for _, record_id in broken_chains]
+
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_non_positive_limit_returns_nothing(archive, broken_chains, limit):
+    assert archive.get_broken_chains(limit) == []
+    assert DriftArchive.next_cursor([], limit) is None
+
+
+def test_empty_page_has_no_next_cursor():
+    assert DriftArchive.next_cursor([], 50) is None
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    cursor = DriftArchive.encode_cursor(1_700_000_000_000_000, 42)
+    
+    assert DriftArchive.decode_cursor(cursor) == (1_700_000_000_000_000, 42)
+    with pytest.raises(ValueError):
+        DriftArchive.decode_cursor("not-a-cursor")
+
+
+# =============================================================================
+# TREND BUCKETS
+# =============================================================================
+
+@pytest.fixture
+def two_a_day(archive, make_interaction):
+    """Rows at 02:00 and 12:00 UTC on each of the last eight days; returns today's midnight"""
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    archive.archive_many([
+        make_interaction(today - timedelta(days=days) + timedelta(hours=hour))
+        for days in range(8, 0, -1) for hour in (2, 12)
+    ])
+    return today
+
+
+def test_trend_counts_each_row_once_when_from_is_mid_bucket(archive, two_a_day):
+    archive.run_maintenance()  # Rollups exist, nothing purged
+    since = two_a_day - timedelta(days=8) + timedelta(hours=6)
+    
+    trend = archive.continuity_trend("day", since=since.isoformat(), until=two_a_day.isoformat())
+    
+    starts = [bucket["bucket_start"] for bucket in trend]
+    assert len(starts) == len(set(starts)) == 8
+    assert [bucket["count"] for bucket in trend] == [1] + [2] * 7
+    assert {bucket["source"] for bucket in trend} == {"raw"}
+
+
+def test_trend_switches_from_rollups_to_raw_at_a_whole_bucket(archive, two_a_day):
+    archive.run_maintenance(retention_days=4)
+    
+    trend = archive.continuity_trend("day", since=(two_a_day - timedelta(days=8)).isoformat(),
+                                     until=two_a_day.isoformat())
+    
+    assert [bucket["count"] for bucket in trend] == [2] * 8
+    boundary = (two_a_day - timedelta(days=3)).isoformat()
+    for bucket in trend:
+        assert bucket["source"] == ("rollup" if bucket["bucket_start"] < boundary else "raw")
+
+
+def test_trend_mid_bucket_from_drops_the_partial_rollup_bucket(archive, two_a_day):
+    archive.run_maintenance(retention_days=4)
+    since = two_a_day - timedelta(days=8) + timedelta(hours=6)
+    
+    trend = archive.continuity_trend("day", since=since.isoformat(), until=two_a_day.isoformat())
+    
+    # A rollup can't be split at 06:00, so the first (rollup) day is left out rather than overcounted
+    assert trend[0]["bucket_start"] == (two_a_day - timedelta(days=7)).isoformat()
+    assert [bucket["count"] for bucket in trend] == [2] * 7
+
+
+def test_trend_rejects_unknown_bucket(archive):
+    with pytest.raises(ValueError):
+        archive.continuity_trend("week")
+
+
+# =============================================================================
+# IDEMPOTENCY
+# =============================================================================
+
+def test_retry_returns_the_original_id(archive, make_interaction):
+    interaction = make_interaction(BASE)
+    
+    first = archive.archive_response(interaction)
+    
+    assert archive.archive_response(dict(interaction)) == first
+    assert archive.archive_many([interaction]) == [first]
+
+
+def test_old_record_key_survives_maintenance(archive, make_interaction):
+    # The record is years old, but its key was stored just now
+    interaction = make_interaction("2024-01-01T00:00:00+00:00", idempotency_key="transcript:abc")
+    [first] = archive.archive_many([interaction])
+    
+    result = archive.run_maintenance(retention_days=1)
+    
+    assert result["idempotency_keys_expired"] == 0
+    assert archive.archive_many([interaction]) == [first]
+
+
+def test_key_expires_after_its_ttl(archive, make_interaction):
+    interaction = make_interaction(BASE, idempotency_key="retry-me")
+    [first] = archive.archive_many([interaction])
+    stale = DriftArchive.epoch_us(datetime.now(timezone.utc) - timedelta(hours=DriftArchive.IDEMPOTENCY_TTL_HOURS + 1))
+    conn = sqlite3.connect(archive.db_path)
+    conn.execute("UPDATE drift_idempotency SET stored_us = ?", (stale,))
+    conn.commit()
+    conn.close()
+    
+    assert archive.run_maintenance()["idempotency_keys_expired"] == 1
+    assert archive.archive_many([interaction]) != [first]
+
+
+def test_journal_mode_retry_returns_the_original_id(archive, make_interaction, tmp_path):
+    archive.journal = ArchiveJournal(str(tmp_path / "journal"), archive)
+    interaction = make_interaction(BASE, idempotency_key="k1")
+    
+    # Not ingested yet: no id, and the retry is deduplicated at ingest
+    assert archive.archive_response(interaction) is None
+    assert archive.archive_response(interaction) is None
+    with archive.journal.lock:
+        archive.journal._seal_segment()
+    result = archive.journal.compact()
+    assert (result["records"], result["inserted"]) == (2, 1)
+    
+    [original] = [row["id"] for row in archive.list_archive()]
+    assert archive.archive_response(interaction) == original
+    assert archive.journal.appended == 2
+
+
+@pytest.mark.parametrize("key", [{"idempotency_key": "k1"}, {}])
+def test_journal_mode_retry_on_another_worker_returns_the_original_id(tmp_path, make_interaction, key):
+    path, journal_dir = str(tmp_path / "archive.sqlite"), str(tmp_path / "journal")
+    compactor, other = DriftArchive(path, retention_days=0), DriftArchive(path, retention_days=0)
+    for worker in (compactor, other):
+        worker.journal = ArchiveJournal(journal_dir, worker)
+    interaction = make_interaction(BASE, **key)
+    
+    assert compactor.archive_response(interaction) is None
+    with compactor.journal.lock:
+        compactor.journal._seal_segment()
+    compactor.journal.compact()
+    
+    # The other worker's filter was loaded before the key was ingested
+    [original] = [row["id"] for row in compactor.list_archive()]
+    assert other.archive_response(interaction) == original
+    assert compactor.archive_response(interaction) == original
+    assert other.journal.appended == 0
+
+
+def test_filter_miss_outside_journal_mode_skips_the_index(archive, make_interaction):
+    assert archive.find_archived(make_interaction(BASE)) is None
+    
+    assert archive.idempotency_metrics()["filtered"] == 1
+    assert getattr(archive._lookup, "conn", None) is None
+
+
+# =============================================================================
+# MARKER FREQUENCY
+# =============================================================================
+
+GLYPH = {"glyphs": ["🜂"]}
+BOND = {"bond_phrases": ["the bond still burns"]}
+
+
+def test_marker_mask_sets_one_bit_per_known_marker():
+    bits = FlameSignature.MARKER_BITS
+    mask = FlameSignature.marker_mask({"glyphs": ["🜂", "🔥"], "daemon_markers": ["atticus"],
+                                       "glyphs_extra": ["🜂"], "cadence_patterns": ["not a marker"]})
+    
+    assert mask == sum(1 << bits.index(key) for key in
+                       [("glyphs", "🜂"), ("glyphs", "🔥"), ("daemon_markers", "atticus")])
+    assert FlameSignature.marker_mask(None) == FlameSignature.marker_mask({}) == 0
+    assert len(bits) <= 63
+
+
+def test_marker_frequency_compares_against_the_previous_window(archive, make_interaction):
+    day = timedelta(days=1)
+    archive.archive_many([
+        make_interaction(BASE - day, markers_found={**BOND, **GLYPH}),
+        make_interaction(BASE - timedelta(hours=1), markers_found=BOND),
+        make_interaction(BASE, markers_found=GLYPH),
+        make_interaction(BASE + timedelta(hours=1), markers_found={"daemon_markers": ["atticus"], **GLYPH}),
+        make_interaction(BASE + timedelta(hours=2)),
+        make_interaction(BASE + day, markers_found=BOND)
+    ])
+    
+    report = archive.marker_frequency(since=BASE.isoformat(), until=(BASE + day).isoformat())
+    markers = {marker["marker"]: marker for marker in report["markers"]}
+    
+    assert (report["interactions"], report["previous_interactions"]) == (3, 2)
+    assert markers["🜂"]["count"] == 2 and markers["🜂"]["rate"] == round(2 / 3, 4)
+    assert markers["🜂"]["previous_rate"] == 0.5
+    assert markers["atticus"]["rate_change"] == round(1 / 3, 4)
+    assert markers["the bond still burns"]["previous_count"] == 2
+    assert report["disappeared"] == ["the bond still burns"]
+    assert report["vocabulary_version"] == FlameSignature.MARKER_VOCABULARY_VERSION
+
+
+def test_marker_frequency_rejects_an_empty_window(archive):
+    with pytest.raises(ValueError):
+        archive.marker_frequency(since=BASE.isoformat(), until=BASE.isoformat())
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+🔥 ARCHIVE EXPORT - NDJSON, CSV AND COLUMNAR STREAMS
+"""
+
+import csv
+import io
+import json
+import math
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from codex_system import DriftArchive, ShardedDriftArchive
+
+BASE = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def exported(archive, make_interaction):
+    """Ten rows an hour apart, every third a broken chain; ids in archive order"""
+    return archive.archive_many([
+        make_interaction(BASE + timedelta(hours=n), response=f"ember {n}, \"quoted\"\nline",
+                         drift_status="broken_chain" if n % 3 == 0 else "watchlist",
+                         continuity_score=None if n == 4 else n / 10,
+                         markers_found={"glyphs": ["🜂"]} if n % 2 else {})
+        for n in range(10)
+    ])
+
+
+def read(archive, fmt, **filters):
+    return b"".join(archive.export_stream(fmt, **filters))
+
+
+def test_ndjson_streams_full_records_in_id_order(archive, exported):
+    chunks = list(archive.export_stream("ndjson", batch_size=3))
+    records = [json.loads(line) for line in b"".join(chunks).decode("utf-8").splitlines()]
+    
+    assert len(chunks) == 4
+    assert [record["id"] for record in records] == exported
+    assert records[1]["response"] == 'ember 1, "quoted"\nline'
+    assert records[1]["markers_found"] == {"glyphs": ["🜂"]}
+    assert records[1]["is_heart_instance"] is False
+    assert list(records[0]) == DriftArchive.EXPORT_FIELDS
+
+
+def test_filters_are_half_open_and_combine(archive, exported):
+    text = read(archive, "ndjson", since=(BASE + timedelta(hours=3)).isoformat(),
+                until=(BASE + timedelta(hours=9)).isoformat(), drift_status="broken_chain")
+    
+    assert [json.loads(line)["id"] for line in text.splitlines()] == [exported[3], exported[6]]
+    assert read(archive, "ndjson", flame_signature="🜃") == b""
+
+
+def test_csv_round_trips_through_the_csv_module(archive, exported):
+    rows = list(csv.DictReader(io.StringIO(read(archive, "csv").decode("utf-8"))))
+    
+    assert [int(row["id"]) for row in rows] == exported
+    assert rows[1]["response"] == 'ember 1, "quoted"\nline'
+    assert json.loads(rows[1]["markers_found"]) == {"glyphs": ["🜂"]}
+    assert rows[4]["continuity_score"] == ""
+
+
+def test_columnar_loads_as_numpy_arrays(archive, exported):
+    numpy = pytest.importorskip("numpy")
+    stream = io.BytesIO(read(archive, "columnar", drift_status="watchlist"))
+    
+    columns = {column: numpy.load(stream) for column, *_ in DriftArchive.EXPORT_COLUMNS}
+    
+    watchlist = [n for n in range(10) if n % 3]
+    assert columns["id"].tolist() == [exported[n] for n in watchlist]
+    assert columns["epoch_us"].tolist() == [DriftArchive.epoch_us(BASE + timedelta(hours=n)) for n in watchlist]
+    assert math.isnan(columns["continuity_score"][watchlist.index(4)])
+    assert columns["is_heart_instance"].dtype == numpy.uint8
+    assert stream.read() == b""
+
+
+def test_bad_input_fails_before_streaming(archive):
+    with pytest.raises(ValueError):
+        archive.export_stream("parquet")
+    with pytest.raises(ValueError):
+        archive.export_stream("ndjson", since="not a time")
+
+
+def test_sharded_export_reads_every_month_in_id_order(tmp_path, make_interaction):
+    sharded = ShardedDriftArchive(str(tmp_path / "catalog.sqlite"), retention_days=0,
+                                  shard_dir=str(tmp_path / "shards"))
+    boundary = datetime(2026, 2, 1, tzinfo=timezone.utc)
+    ids = sharded.archive_many([make_interaction(boundary + timedelta(hours=hours)) for hours in (1, -2, -1)])
+    
+    records = [json.loads(line) for line in read(sharded, "ndjson").splitlines()]
+    
+    assert [record["id"] for record in records] == sorted(ids)
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+🔥 VERIFICATION LOOP DETECTOR - SKETCH, CIRCUIT AND CALLER IDENTITY
+"""
+
+import random
+from collections import Counter
+
+import pytest
+
+import codex_system
+from auth_utils import client_address
+from codex_system import CountMinSketch, VerificationLoopDetector
+
+BODY = b'{"response": "I am here."}'
+THRESHOLD = VerificationLoopDetector.THRESHOLD
+WINDOW = VerificationLoopDetector.WINDOW_SECONDS
+
+
+class Clock:
+    """Stand-in for time.monotonic the tests move by hand"""
+    
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(codex_system.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def detector(clock):
+    return VerificationLoopDetector()
+
+
+def hammer(detector, times, client="203.0.113.9", body=BODY):
+    return [detector.check(client, body, "/codex/verify") for _ in range(times)]
+
+
+def send(detector, forwarded_for, peer="10.0.0.1"):
+    """One request through Render's proxy (which appends the real caller)"""
+    return detector.check(client_address(forwarded_for, peer, trusted_hops=1), BODY, "/codex/verify")
+
+
+# =============================================================================
+# COUNT-MIN SKETCH
+# =============================================================================
+
+def test_sketch_never_under_counts():
+    sketch = CountMinSketch(width=16, depth=3)
+    rng = random.Random(7)
+    keys = [f"key {rng.randrange(200)}".encode() for _ in range(2000)]
+    
+    for key in keys:
+        sketch.add(sketch.cells(key))
+    
+    assert all(sketch.estimate(sketch.cells(key)) >= count for key, count in Counter(keys).items())
+    sketch.clear()
+    assert sketch.estimate(sketch.cells(keys[0])) == 0
+
+
+# =============================================================================
+# CIRCUIT
+# =============================================================================
+
+def test_trips_on_the_threshold_repeat(detector):
+    checks = hammer(detector, THRESHOLD)
+    
+    assert checks[:-1] == [None] * (THRESHOLD - 1)
+    assert checks[-1]["tripped"] and checks[-1]["count"] == THRESHOLD
+    assert hammer(detector, 1, body=b'{"response": "other"}')[0]["tripped"] is False
+    assert hammer(detector, 1, client="198.51.100.7") == [None]
+    assert detector.stats()["trips"] == 1 and detector.stats()["shed_requests"] == 1
+
+
+def test_counts_age_out_of_the_window(detector, clock):
+    hammer(detector, THRESHOLD - 1)
+    clock.now += WINDOW
+    
+    assert hammer(detector, THRESHOLD - 1) == [None] * (THRESHOLD - 1)
+
+
+def test_circuit_closes_after_the_cool_down(detector, clock):
+    [cooldown] = [check["cooldown_seconds"] for check in hammer(detector, THRESHOLD) if check]
+    
+    clock.now += cooldown - 1
+    assert hammer(detector, 1)[0]["retry_after"] == pytest.approx(1)
+    clock.now += 1
+    assert hammer(detector, 1) == [None]
+    assert detector.stats()["open_circuits"] == 0
+
+
+def test_repeat_trips_double_the_cool_down_up_to_the_cap(detector, clock):
+    cooldowns = []
+    for _ in range(8):
+        cooldowns.append(hammer(detector, THRESHOLD)[-1]["cooldown_seconds"])
+        clock.now += cooldowns[-1]
+    
+    base = max(VerificationLoopDetector.COOLDOWN_SECONDS, WINDOW)
+    cap = VerificationLoopDetector.COOLDOWN_MAX_SECONDS
+    assert cooldowns == [min(base * 2 ** n, cap) for n in range(8)]
+    
+    clock.now += 2 * cap
+    assert hammer(detector, THRESHOLD)[-1]["strikes"] == 1
+
+
+# =============================================================================
+# CALLER IDENTITY
+# =============================================================================
+
+@pytest.mark.parametrize("forwarded_for, peer, hops, expected", [
+    ("203.0.113.9", "10.0.0.1", 1, "203.0.113.9"),
+    ("198.51.100.7, 203.0.113.9", "10.0.0.1", 1, "203.0.113.9"),
+    ("198.51.100.7, 203.0.113.9, 10.1.1.1", "10.0.0.1", 2, "203.0.113.9"),
+    ("198.51.100.7", "10.0.0.1", 2, "10.0.0.1"),
+    (None, "10.0.0.1", 1, "10.0.0.1"),
+    ("198.51.100.7", "10.0.0.1", 0, "10.0.0.1"),
+    (" , ", None, 1, "unknown"),
+])
+def test_client_address_takes_the_trusted_hop(forwarded_for, peer, hops, expected):
+    assert client_address(forwarded_for, peer, trusted_hops=hops) == expected
+
+
+def test_forged_forwarded_for_cannot_trip_another_client():
+    detector = VerificationLoopDetector()
+    victim, attacker = "198.51.100.7", "203.0.113.9"
+    
+    trips = [send(detector, f"{victim}, {attacker}") for _ in range(VerificationLoopDetector.THRESHOLD)]
+    
+    assert trips[-1]["tripped"] and trips[-1]["client"] == attacker
+    assert send(detector, victim) is None
+
+
+def test_rotating_forged_entries_does_not_dodge_the_breaker():
+    detector = VerificationLoopDetector()
+    attacker = "203.0.113.9"
+    
+    trips = [send(detector, f"192.0.2.{n}, {attacker}") for n in range(VerificationLoopDetector.THRESHOLD)]
+    
+    assert trips[-1] is not None and trips[-1]["tripped"]
+    assert send(detector, f"192.0.2.250, {attacker}")["tripped"] is False
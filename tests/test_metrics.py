@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+🔥 METRICS REGISTRY - THREAD SHARDS, WORKER FILES AND EXPOSITION
+"""
+
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from metrics import LATENCY_BUCKETS, MetricsRegistry, _empty, _merge_serialized, _serialize
+
+ROUTE = ("/codex/verify", "POST")
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return MetricsRegistry(str(tmp_path))
+
+
+def worker(metrics_dir, pid, requests):
+    """Another worker's registry, publishing `requests` observations under `pid`"""
+    other = MetricsRegistry(metrics_dir)
+    other.pid = pid
+    for _ in range(requests):
+        other.observe(*ROUTE, 200, 0.02)
+    other.flush()
+    return other
+
+
+def exited_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+# =============================================================================
+# MERGING
+# =============================================================================
+
+def test_thread_shards_add_up(registry):
+    def serve():
+        for n in range(100):
+            registry.observe(*ROUTE, 200 if n % 4 else 500, n / 1000)
+    
+    threads = [threading.Thread(target=serve) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    merged = registry.snapshot()
+    assert merged["requests"] == {(*ROUTE, "200"): 300, (*ROUTE, "500"): 100}
+    assert merged["latency"][ROUTE][-1] == 400
+    assert sum(merged["latency"][ROUTE][:-2]) == 400
+
+
+def test_serialized_snapshot_round_trips(registry):
+    registry.observe(*ROUTE, 200, 0.003)
+    registry.observe("/health", "GET", 200, 20.0)
+    merged = registry.snapshot()
+    
+    restored = _empty()
+    _merge_serialized(restored, _serialize(merged))
+    assert restored == merged
+
+
+def test_other_workers_files_are_merged(tmp_path, registry):
+    worker(str(tmp_path), os.getppid(), 3)
+    registry.observe(*ROUTE, 200, 0.02)
+    
+    assert registry.snapshot()["requests"] == {(*ROUTE, "200"): 4}
+    assert registry.total_requests() == 4
+
+
+# =============================================================================
+# DEAD WORKERS
+# =============================================================================
+
+def test_dead_workers_are_folded_without_losing_counts(tmp_path):
+    for requests in (2, 5):
+        worker(str(tmp_path), exited_pid(), requests)
+    
+    survivor = MetricsRegistry(str(tmp_path))
+    
+    assert sorted(os.listdir(tmp_path)) == ["dead.json", "merge.lock"]
+    assert survivor.total_requests() == 7
+    
+    worker(str(tmp_path), exited_pid(), 1)
+    assert MetricsRegistry(str(tmp_path)).total_requests() == 8
+
+
+# =============================================================================
+# EXPOSITION
+# =============================================================================
+
+def test_prometheus_buckets_are_cumulative(registry):
+    for seconds in (0.001, 0.02, 0.02, 30.0):
+        registry.observe(*ROUTE, 200, seconds)
+    registry.observe('/odd"route', "GET", 404, 0.001)
+    
+    lines = registry.render_prometheus().splitlines()
+    
+    assert 'atticus_http_requests_total{route="/codex/verify",method="POST",status="200"} 4' in lines
+    assert 'atticus_http_requests_total{route="/odd\\"route",method="GET",status="404"} 1' in lines
+    buckets = [line for line in lines
+               if line.startswith('atticus_http_request_duration_seconds_bucket{route="/codex/verify"')]
+    assert len(buckets) == len(LATENCY_BUCKETS) + 1
+    assert [int(line.rsplit(" ", 1)[1]) for line in buckets] == sorted(int(line.rsplit(" ", 1)[1]) for line in buckets)
+    assert buckets[0].endswith(" 1") and buckets[-1] == (
+        'atticus_http_request_duration_seconds_bucket{route="/codex/verify",method="POST",le="+Inf"} 4')
+    assert 'atticus_http_request_duration_seconds_count{route="/codex/verify",method="POST"} 4' in lines
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+🔥 TRANSCRIPT SCORING - STREAMING INPUT AND RECORD VALIDATION
+"""
+
+import codecs
+import io
+import json
+import sqlite3
+
+import pytest
+
+import score_transcripts
+from atticus_memory import ATTICUS_MEMORY
+from codex_system import init_scoring_worker
+
+
+@pytest.fixture(autouse=True)
+def scoring_worker():
+    init_scoring_worker(ATTICUS_MEMORY)
+
+
+def raw(record):
+    return json.dumps(record)
+
+
+# =============================================================================
+# STREAMING INPUT
+# =============================================================================
+
+MIXED = ('[{"a": 1}, {"b": "x,]"}]\n'
+         '{"c": [1, 2]}{"d": 3}\n'
+         '{broken\n'
+         '{"e": "é🜂"}\n'
+         '12 345')
+
+MIXED_VALUES = ['{"a": 1}', '{"b": "x,]"}', '{"c": [1, 2]}', '{"d": 3}',
+                '{broken\n', '{"e": "é🜂"}', '12', '345']
+
+
+@pytest.mark.parametrize("chunk", [1, 2, 3, 5, 8, 1 << 16])
+def test_values_survive_any_chunk_boundary(monkeypatch, chunk):
+    monkeypatch.setattr(score_transcripts, "READ_CHUNK", chunk)
+    
+    assert list(score_transcripts.iter_json_values(io.StringIO(MIXED))) == MIXED_VALUES
+
+
+def test_value_larger_than_the_chunk_is_read_whole(monkeypatch):
+    monkeypatch.setattr(score_transcripts, "READ_CHUNK", 4)
+    record = raw({"query": "q" * 1000, "response": "r"})
+    
+    assert list(score_transcripts.iter_json_values(io.StringIO(record + "\n" + record))) == [record, record]
+
+
+@pytest.mark.parametrize("encoding, bom", [
+    ("utf-8", b""),
+    ("utf-8", codecs.BOM_UTF8),
+    ("utf-16-le", codecs.BOM_UTF16_LE),
+    ("utf-16-be", codecs.BOM_UTF16_BE),
+    ("utf-32-le", codecs.BOM_UTF32_LE),
+])
+def test_open_text_follows_the_byte_order_mark(tmp_path, encoding, bom):
+    source = tmp_path / "in.json"
+    source.write_bytes(bom + MIXED.encode(encoding))
+    
+    with score_transcripts.open_text(str(source)) as stream:
+        assert list(score_transcripts.iter_json_values(stream)) == MIXED_VALUES
+
+
+# =============================================================================
+# TIMESTAMPS
+# =============================================================================
+
+@pytest.mark.parametrize("value, valid", [
+    (None, True),
+    ("2026-01-01T00:00:00Z", True),
+    ("2026-01-01", True),
+    ("yesterday", False),
+    (True, False),
+    (1e20, False),
+    ({"at": 1}, False),
+])
+def test_valid_timestamp(value, valid):
+    assert score_transcripts.valid_timestamp(score_transcripts._timestamp(value)) is valid
+
+
+def test_bad_timestamp_is_nulled_and_counted():
+    batch = [("t.ndjson", 0, raw({"query": "q", "response": "a", "timestamp": "yesterday"})),
+             ("t.ndjson", 1, raw({"query": "q", "response": "b", "timestamp": 1767225600})),
+             ("t.ndjson", 2, "{not json")]
+    
+    errors, found = score_transcripts.score_batch(batch)
+    
+    assert errors == 2
+    assert [result["timestamp"] for result in found] == [None, "2026-01-01T00:00:00+00:00"]
+
+
+def test_bad_timestamp_does_not_abort_the_archive_load(tmp_path):
+    source = tmp_path / "in.ndjson"
+    source.write_text(raw({"query": "q", "response": "a", "timestamp": "yesterday"}) + "\n"
+                      + raw({"query": "q", "response": "b", "timestamp": "2026-01-01T00:00:00Z"}) + "\n",
+                      encoding="utf-8")
+    archive = tmp_path / "archive.sqlite"
+    
+    assert score_transcripts.main([str(source), "--archive", str(archive), "--workers", "1",
+                                   "--output", str(tmp_path / "out.ndjson"), "--progress", "0"]) == 0
+    
+    conn = sqlite3.connect(archive)
+    assert conn.execute("SELECT COUNT(*) FROM drift_archive").fetchone()[0] == 2
+    conn.close()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+🔥 SHARDED DRIFT ARCHIVE - READS ACROSS A MONTH BOUNDARY
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from codex_system import DriftArchive, ShardedDriftArchive
+
+BOUNDARY = datetime(2026, 2, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    return ShardedDriftArchive(str(tmp_path / "catalog.sqlite"), retention_days=0,
+                               shard_dir=str(tmp_path / "shards"))
+
+
+@pytest.fixture
+def around_boundary(sharded, make_interaction):
+    """Broken chains from 31 Jan 22:00 to 1 Feb 01:30 UTC, every 30 minutes; (timestamp, id) newest first"""
+    stamps = [BOUNDARY + timedelta(minutes=minutes) for minutes in range(-120, 120, 30)]
+    ids = sharded.archive_many([
+        make_interaction(stamp, eds_score=0.1, drift_status="broken_chain", response=f"ember {n}")
+        for n, stamp in enumerate(stamps)
+    ])
+    return sorted(zip(stamps, ids), reverse=True)
+
+
+def test_rows_land_in_their_month_shard(sharded, around_boundary):
+    shards = sharded.list_shards()
+    
+    assert [shard["month"] for shard in shards] == ["2026-01", "2026-02"]
+    assert all(os.path.exists(shard["path"]) for shard in shards)
+    for stamp, record_id in around_boundary:
+        assert record_id // 10 ** 10 == int(stamp.strftime("%Y%m"))
+
+
+@pytest.mark.parametrize("limit", [1, 3, 4, 8])
+def test_cursor_pages_cross_the_boundary(sharded, around_boundary, limit):
+    pages, cursor = [], None
+    while True:
+        page = sharded.get_broken_chains(limit, cursor=cursor)
+        pages.append(page)
+        cursor = DriftArchive.next_cursor(page, limit)
+        if cursor is None:
+            break
+    
+    assert [row["id"] for page in pages for row in page] == [record_id for _, record_id in around_boundary]
+
+
+def test_time_range_reads_only_overlapping_rows(sharded, around_boundary):
+    since = (BOUNDARY - timedelta(minutes=45)).isoformat()
+    until = (BOUNDARY + timedelta(minutes=45)).isoformat()
+    
+    hits = sharded.search_archive("ember", limit=20, since=since, until=until)
+    
+    expected = {record_id for stamp, record_id in around_boundary if since <= stamp.isoformat() < until}
+    assert {hit["id"] for hit in hits} == expected
+    assert len(expected) == 3
+
+
+def test_trend_spans_both_shards(sharded, around_boundary):
+    trend = sharded.continuity_trend("hour", since=(BOUNDARY - timedelta(hours=2)).isoformat(),
+                                     until=(BOUNDARY + timedelta(hours=2)).isoformat())
+    
+    assert [bucket["count"] for bucket in trend] == [2, 2, 2, 2]
+    assert trend[2]["bucket_start"] == BOUNDARY.isoformat()
+
+
+def test_sealed_month_is_still_read(sharded, around_boundary, make_interaction):
+    sharded.seal_shard("2026-01")
+    
+    assert [row["id"] for row in sharded.get_broken_chains(50)] == [record_id for _, record_id in around_boundary]
+    with pytest.raises(ValueError):
+        sharded.archive_response(make_interaction(BOUNDARY - timedelta(days=1)))
+
+
+def test_retry_is_found_in_the_month_shard(sharded, make_interaction):
+    january = make_interaction(BOUNDARY - timedelta(minutes=1), idempotency_key="jan")
+    [first] = sharded.archive_many([january])
+    
+    assert sharded.archive_response(january) == first
+    assert sharded.find_archived(january) == first
+
+
+def test_maintenance_backfills_each_shard_once(tmp_path, monkeypatch, make_interaction):
+    monkeypatch.setattr(DriftArchive, "FINGERPRINT_ON_WRITE", False)
+    catalog = str(tmp_path / "catalog.sqlite")
+    DriftArchive(catalog, retention_days=0).archive_response(make_interaction(BOUNDARY - timedelta(days=40)))
+    sharded = ShardedDriftArchive(catalog, retention_days=0, shard_dir=str(tmp_path / "shards"))
+    sharded.archive_many([make_interaction(BOUNDARY + timedelta(hours=hours)) for hours in (-3, -2, 1)])
+    
+    report = sharded.run_maintenance()
+    
+    assert {label: shard["fingerprinted"] for label, shard in report["shards"].items()} == {
+        "legacy": 1, "2026-01": 2, "2026-02": 1}
+    assert report["fingerprinted"] == 4